@@ -44,16 +44,22 @@ from .utils.range_estimations import RangeEstimation
 from .utils.virtual_heights import VHModels
 from .utils.conversions import dmap2dict
 from .utils.plotting import (MapParams, TimeSeriesParams, check_data_type,
-    time2datetime, find_record, determine_embargo, add_embargo)
+    time2datetime, find_record, find_record_window, record_timestamps,
+    determine_embargo, add_embargo)
+from .utils.fitacf_frame import FitacfFrame
+from .utils.range_time import build_range_time_grid
 from .utils.general_utils import GeneralUtils
 from .utils.superdarn_radars import RadarID, SuperDARNRadars
 from .utils.superdarn_cpid import SuperDARNCpids
-from .utils.superdarn_radars import Hemisphere, read_hdw_file, get_hdw_files
-from .utils.scan import find_records_by_datetime, find_records_by_scan
+from .utils.superdarn_radars import (Hemisphere, read_hdw_file, get_hdw_files,
+                                     build_hdw_index, read_hdw_history)
+from .utils.scan import (find_records_by_datetime, find_records_by_scan,
+    scan_offsets)
 from .utils.geo import geocentric_coordinates, calculate_azimuth
-from .utils.coordinates import Coords
-from .utils.terminator import terminator
-from .utils.recalculate_elevation import recalculate_elevation
+from .utils.coordinates import Coords, FOVCache
+from .utils.terminator import terminator, antisolar_positions, night_mask
+from .utils.recalculate_elevation import (recalculate_elevation,
+                                          calibrate_tdiff)
 from .utils.filters import Boxcar
 from .utils.detrend import Detrend
 
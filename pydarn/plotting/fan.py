@@ -29,6 +29,8 @@
 # 2026-04-20: CJM - Add options for remove_iono_scatter and remove_ground_scatter
 # 2026-02-24: CJM - Added the option of plot_tight and corresponding
 #                   private method
+# 2026-10-16: Ball and stick drawn as one scatter and one LineCollection
+# 2026-10-16: get_gate_azm takes arrays, stick azimuths from FOVCache
 #
 # Disclaimer:
 # pyDARN is under the LGPL v3 license found in the root directory LICENSE.md
@@ -50,6 +52,7 @@ import numpy as np
 import warnings
 
 from matplotlib import ticker, cm, colors, axes
+from matplotlib.collections import LineCollection
 from typing import List
 
 # Third party libraries
@@ -57,9 +60,11 @@ import aacgmv2
 
 from pydarn import (PyDARNColormaps, partial_record_warning,
                     time2datetime, plot_exceptions, SuperDARNRadars, RadarID,
-                    calculate_azimuth, Projs, Coords,
+                    Projs, Coords,
                     find_records_by_datetime, find_records_by_scan,
-                    determine_embargo, add_embargo)
+                    determine_embargo, add_embargo, FitacfFrame, FOVCache)
+from pydarn.utils.coordinates import gate_azimuth
+from pydarn.utils.plotting import cached_record_index
 
 
 class Fan:
@@ -103,7 +108,7 @@ class Fan:
 
         Parameters
         -----------
-            dmap_data: List[dict]
+            dmap_data: List[dict] or FitacfFrame
                 Named list of dictionaries obtained from SDarn_read
             ax: axes.Axes
                 Pre-defined axis object to pass in, must currently be
@@ -215,7 +220,11 @@ class Fan:
         if channel != 'all':
             # Get the first channel used in case of no data in given channel
             opt_channel = dmap_data[0]['channel']
-            dmap_data = [rec for rec in dmap_data if rec['channel'] == channel]
+            # the channel's records are cached so the scan index of
+            # them is only built once when stepping through the scans
+            dmap_data = cached_record_index(
+                dmap_data, 'channel {}'.format(channel),
+                lambda data: Fan.__select_channel(data, channel))
             # If no records exist, advise user that the channel is not used
             if not dmap_data:
                 raise plot_exceptions.NoChannelError(channel, opt_channel)
@@ -265,6 +274,11 @@ class Fan:
         beam_corners_lats, beam_corners_lons =\
             coords(stid=RadarID(dmap_data[0]['stid']), rsep=rsep, frang=frang,
                    gates=ranges, date=date, **kwargs)
+        if ball_and_stick and parameter == 'v':
+            # azimuth of the radar from each gate for the sticks
+            gate_azms = FOVCache.gate_azimuths(
+                coords, stid=RadarID(dmap_data[0]['stid']), rsep=rsep,
+                frang=frang, gates=ranges, date=date, **kwargs)
 
         fan_shape = beam_corners_lons.shape
         if ranges[0] < ranges[1] - fan_shape[0]:
@@ -378,88 +392,95 @@ class Fan:
                               zorder=2)
         else:
             # Get center of each gate instead of edges
-            fan_shape = thetas.shape
-            for i in range(0, fan_shape[0]-1):
-                for j in range(0, fan_shape[1]-1):
-                    t_center = (thetas[i, j] + thetas[i+1, j]
-                                + thetas[i, j+1] + thetas[i+1, j+1]) / 4
-                    r_center = (rs[i, j] + rs[i+1, j]
-                                + rs[i, j+1] + rs[i+1, j+1]) / 4
-                    if scan[i, j] != 0.0:
-                        col = cmap((scan[i, j] - zmin) / (zmax-zmin))
-                        # Plot balls!
-                        ax.scatter(t_center, r_center, color=col, s=1.0,
-                                   transform=transform, zorder=3.0)
-                        # Stick only needed for velocity data
-                        if parameter == 'v':
-                            # Get azimuth in correct coord system
-                            if projs == Projs.POLAR:
-                                lat = r_center
-                                lon = np.degrees(t_center)
-                            else:
-                                lat = r_center
-                                lon = t_center
-                            azm = Fan.get_gate_azm(lon, lat, stid,
-                                                   coords, date)
-
-                            # Make sure each coordinate is in correct
-                            # units again
-                            thetas_calc = np.radians(lon)
-                            rs_calc = lat
-
-                            hemisphere = SuperDARNRadars.radars[stid]\
-                                                        .hemisphere
-
-                            # Find the end point of the stick to plot
-                            # Angle to rotate each vector
-                            alpha = thetas_calc
-
-                            # Convert to Cartesian
-                            start_pos_x = (90 - abs(rs_calc)) \
-                                * np.cos(thetas_calc)
-                            start_pos_y = (90 - abs(rs_calc)) \
-                                * np.sin(thetas_calc)
-
-                            # Results LOS vector in x and y
-                            los_x = -scan[i, j] * np.cos(
-                                    np.radians(-azm * hemisphere.value))
-                            los_y = -scan[i, j] * np.sin(
-                                    np.radians(-azm * hemisphere.value))
-
-                            # Rotate vector into same ref frame
-                            vec_x = (los_x * np.cos(alpha)) \
-                                - (los_y * np.sin(alpha))
-                            vec_y = (los_x * np.sin(alpha)) \
-                                + (los_y * np.cos(alpha))
-
-                            # New vector end points
-                            end_pos_x = start_pos_x\
-                                + (vec_x * hemisphere.value / len_factor)
-                            end_pos_y = start_pos_y\
-                                + (vec_y * hemisphere.value / len_factor)
-                            # Convert back to polar for plotting
-                            end_rs = 90 - (np.sqrt(end_pos_x**2
-                                                   + end_pos_y**2))
-                            end_thetas = np.arctan2(end_pos_y, end_pos_x)
-                            end_rs = end_rs * hemisphere.value
-
-                            # Convert to degrees for geo/mag plots
-                            if projs != Projs.POLAR:
-                                end_thetas = np.degrees(end_thetas)
-                            # Plot sticks!
-                            ax.plot([t_center, end_thetas],
-                                    [r_center, end_rs],
-                                    color=col, zorder=3.0, linewidth=0.5,
-                                    transform=transform)
-
-                    # Plot ground scatter balls (no sticks)
-                    if groundscatter and grndsct[i, j] != 0.0:
-                        if remove_ground_scatter:
-                            ax.scatter(t_center, r_center, c='w', s=1.0,
-                                       transform=transform, zorder=3.0)
-                        else:
-                            ax.scatter(t_center, r_center, c='grey', s=1.0,
-                                       transform=transform, zorder=3.0)
+            t_center = (thetas[:-1, :-1] + thetas[1:, :-1] +
+                        thetas[:-1, 1:] + thetas[1:, 1:]) / 4
+            r_center = (rs[:-1, :-1] + rs[1:, :-1] +
+                        rs[:-1, 1:] + rs[1:, 1:]) / 4
+            cells = (slice(0, t_center.shape[0]), slice(0, t_center.shape[1]))
+            echoes = scan[cells] != 0.0
+            echo_data = scan[cells][echoes]
+            t_echo = t_center[echoes]
+            r_echo = r_center[echoes]
+            col = cmap((echo_data - zmin) / (zmax-zmin))
+            # Plot balls! all in a single scatter, ground scatter balls
+            # (no sticks) are drawn over the ball of their own gate and
+            # under the balls of the following gates
+            ball_cells = [np.flatnonzero(echoes)]
+            ball_colors = [col]
+            if groundscatter:
+                ground = np.flatnonzero(grndsct[cells] != 0.0)
+                if remove_ground_scatter:
+                    ground_color = 'w'
+                else:
+                    ground_color = 'grey'
+                ball_cells.append(ground)
+                ball_colors.append(np.tile(colors.to_rgba(ground_color),
+                                           (len(ground), 1)))
+            ball_cells = np.concatenate(ball_cells)
+            order = np.argsort(ball_cells, kind='stable')
+            ax.scatter(t_center.ravel()[ball_cells[order]],
+                       r_center.ravel()[ball_cells[order]],
+                       color=np.concatenate(ball_colors)[order], s=1.0,
+                       transform=transform, zorder=3.0)
+            # Stick only needed for velocity data
+            if parameter == 'v':
+                # Get azimuth in correct coord system
+                if projs == Projs.POLAR:
+                    lat = r_echo
+                    lon = np.degrees(t_echo)
+                else:
+                    lat = r_echo
+                    lon = t_echo
+                if beam is not None:
+                    gate_azms = gate_azms[:, beam:beam+1]
+                azm = gate_azms[cells][echoes]
+
+                # Make sure each coordinate is in correct
+                # units again
+                thetas_calc = np.radians(lon)
+                rs_calc = lat
+
+                hemisphere = SuperDARNRadars.radars[stid].hemisphere
+
+                # Find the end point of the stick to plot
+                # Angle to rotate each vector
+                alpha = thetas_calc
+
+                # Convert to Cartesian
+                start_pos_x = (90 - abs(rs_calc)) * np.cos(thetas_calc)
+                start_pos_y = (90 - abs(rs_calc)) * np.sin(thetas_calc)
+
+                # Results LOS vector in x and y
+                los_x = -echo_data * np.cos(
+                        np.radians(-azm * hemisphere.value))
+                los_y = -echo_data * np.sin(
+                        np.radians(-azm * hemisphere.value))
+
+                # Rotate vector into same ref frame
+                vec_x = (los_x * np.cos(alpha)) - (los_y * np.sin(alpha))
+                vec_y = (los_x * np.sin(alpha)) + (los_y * np.cos(alpha))
+
+                # New vector end points
+                end_pos_x = start_pos_x\
+                    + (vec_x * hemisphere.value / len_factor)
+                end_pos_y = start_pos_y\
+                    + (vec_y * hemisphere.value / len_factor)
+                # Convert back to polar for plotting
+                end_rs = 90 - (np.sqrt(end_pos_x**2 + end_pos_y**2))
+                end_thetas = np.arctan2(end_pos_y, end_pos_x)
+                end_rs = end_rs * hemisphere.value
+
+                # Convert to degrees for geo/mag plots
+                if projs != Projs.POLAR:
+                    end_thetas = np.degrees(end_thetas)
+                # Plot sticks! all as a single collection of segments
+                sticks = np.stack([np.column_stack([t_echo, r_echo]),
+                                   np.column_stack([end_thetas, end_rs])],
+                                  axis=1)
+                ax.add_collection(LineCollection(sticks, colors=col,
+                                                 zorder=3.0, linewidth=0.5,
+                                                 capstyle='projecting',
+                                                 transform=transform))
 
         # plot the groundscatter as grey fill
         if groundscatter and not ball_and_stick:
@@ -989,11 +1010,16 @@ class Fan:
         gets the azimuth of the gate, requires some changes depending on
         coordinates before using calculate_azimuth
 
+        theta and r can be arrays of gate positions, the radar position is
+        then converted once for all the gates. For the gates of a
+        field-of-view see FOVCache.gate_azimuths, which caches the azimuths
+        per radar, coordinate system and date with the FOV tables.
+
         Parameters
         ----------
-            theta: float
+            theta: float or np.ndarray
                 longitude
-            r: float
+            r: float or np.ndarray
                 latitude
             stid: RadarID
                 station id of radar
@@ -1004,25 +1030,11 @@ class Fan:
 
         Returns
         -------
-            azm: float
+            azm: float or np.ndarray
                 azimuth direction of radar from gate in coordinate system
                 given
         """
-        # Get position of radar in geographic from hdw files
-        radlat = SuperDARNRadars.radars[stid].hardware_info.geographic.lat
-        radlon = SuperDARNRadars.radars[stid].hardware_info.geographic.lon
-        # Convert radar position to correct coordinate system
-        if coords == Coords.AACGM_MLT or coords == Coords.AACGM:
-            geomag_radar = aacgmv2.get_aacgm_coord(radlat, radlon, 250, date)
-            radlat = geomag_radar[0]
-            radlon = geomag_radar[1]
-            if coords == Coords.AACGM_MLT:
-                mltshift = geomag_radar[1] -\
-                        (aacgmv2.convert_mlt(geomag_radar[1], date) * 15)
-                radlon = geomag_radar[1] - mltshift[0]
-        # Call calculate azimuth function from geo
-        azm = calculate_azimuth(r, theta, 300, radlat, radlon, 300)
-        return azm
+        return gate_azimuth(r, theta, stid, coords, date)
 
     @staticmethod
     def plot_radar_position(stid: RadarID, ax: axes.Axes,
@@ -1139,6 +1151,26 @@ class Fan:
                 transform=transform, c=line_color)
         return
 
+    @staticmethod
+    def __select_channel(dmap_data: List[dict], channel: int):
+        """
+        Returns the records of dmap_data on the given channel
+
+        Parameters
+        -----------
+            dmap_data: List[dict] or FitacfFrame
+                records to select from
+            channel: int
+                channel number to select
+
+        Returns
+        -------
+            the records on the channel, as the same type as dmap_data
+        """
+        if isinstance(dmap_data, FitacfFrame):
+            return dmap_data[dmap_data.select(channel=channel)]
+        return [rec for rec in dmap_data if rec['channel'] == channel]
+
     @staticmethod
     def __add_title__(first_timestamp: dt.datetime,
                       end_timestamp: dt.datetime):
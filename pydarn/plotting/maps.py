@@ -14,6 +14,10 @@
 # 2023-03-14: CJM - Added true vector option
 # 2023-06-28: CJM - Refactored return values
 # 2024-07-11: CJM - Added potential time series plot
+# 2026-10-16: Evaluate potentials from a vectorized spherical harmonic basis
+# 2026-10-16: Cache the potential basis of recently used grids
+# 2026-10-16: Fitted velocities from a precomputed electric field operator
+# 2026-10-16: Vectors drawn as one LineCollection with a vectorized HMB limit
 #
 # Disclaimer:
 # pyDARN is under the LGPL v3 license found in the root directory LICENSE.md
@@ -36,8 +40,10 @@ import matplotlib.pyplot as plt
 import numpy as np
 import warnings
 
+from collections import OrderedDict
 from enum import Enum
 from matplotlib import ticker, cm, colors
+from matplotlib.collections import LineCollection
 from scipy import special
 from typing import List
 
@@ -47,10 +53,19 @@ import aacgmv2
 
 from pydarn import (PyDARNColormaps, plot_exceptions, RadarID,
                     standard_warning_format, Re, Hemisphere,
-                    time2datetime, find_record, Fan, Projs,
-                    MapParams, TimeSeriesParams)
+                    time2datetime, find_record, record_timestamps, Fan,
+                    Projs, MapParams, TimeSeriesParams)
 warnings.formatwarning = standard_warning_format
 
+# potential basis of the most recently used grids, keyed by the grid
+# positions, fit order and lower latitude boundary (see
+# Maps.cached_potential_basis). A basis of the default potential grid is
+# about 6 MB.
+_BASIS_CACHE_SIZE = 8
+_basis_cache = OrderedDict()
+# electric field operators of each fit order (see Maps.efield_operator)
+_efield_operators = {}
+
 
 class Maps:
     """
@@ -340,60 +355,31 @@ class Maps:
 
             end_mlats = end_mlats * hemisphere.value
 
+            # Vectors of the fitted velocities are only plotted above the
+            # HMB, the closest HMB value in longitude of each vector sets
+            # its lat limit for plotting
+            if parameter in [MapParams.FITTED_VELOCITY,
+                             MapParams.TRUE_VELOCITY]:
+                lat_limit = cls.hmb_lat_limits(
+                    dmap_data[record]['boundary.mlat'],
+                    dmap_data[record]['boundary.mlon'], mlons[:-1], date)
+                above_hmb = np.abs(mlats[:-1]) >= np.abs(lat_limit)
+            else:
+                above_hmb = np.ones(len(v_mag) - 1, dtype=bool)
+
             # Plot the vector socks (final vector is the reference
-            # vector to be plotted later if required)
+            # vector to be plotted later if required) as a single
+            # collection of line segments
+            segments = np.stack([np.column_stack([mlons, mlats]),
+                                 np.column_stack([end_mlons, end_mlats])],
+                                axis=1)[:-1][above_hmb]
             if color_vectors is True:
-                for i in range(len(v_mag) - 1):
-                    if parameter in [MapParams.FITTED_VELOCITY,
-                                     MapParams.TRUE_VELOCITY]:
-                        # Shift HMB lons to MLT
-                        shifted_mlts = \
-                            dmap_data[record]['boundary.mlon'][0] - \
-                            (aacgmv2.convert_mlt(
-                                dmap_data[record]['boundary.mlon'][0],
-                                date) * 15)
-                        hmblons = (dmap_data[record]['boundary.mlon'] -
-                                   shifted_mlts) % 360
-                        # Find where the closest HMB value is, set equivalent
-                        # latitude as the lat limit for plotting
-                        rounded_mlon = np.degrees(mlons[i]) % 360
-                        ind = (np.abs(hmblons - rounded_mlon)).argmin()
-                        lat_limit = dmap_data[record]['boundary.mlat'][ind]
-                        if abs(mlats[i]) >= abs(lat_limit):
-                            ax.plot([mlons[i], end_mlons[i]],
-                                     [mlats[i], end_mlats[i]],
-                                     c=cmap(norm(v_mag[i])),
-                                     linewidth=0.5, zorder=5.0)
-                    else:
-                        ax.plot([mlons[i], end_mlons[i]],
-                                 [mlats[i], end_mlats[i]],
-                                 c=cmap(norm(v_mag[i])),
-                                 linewidth=0.5, zorder=5.0)
+                vector_colors = cmap(norm(v_mag[:-1][above_hmb]))
             else:
-                for i in range(len(v_mag) - 1):
-                    if parameter in [MapParams.FITTED_VELOCITY,
-                                     MapParams.TRUE_VELOCITY]:
-                        # Shift HMB lons to MLT
-                        shifted_mlts = \
-                            dmap_data[record]['boundary.mlon'][0] - \
-                            (aacgmv2.convert_mlt(
-                                dmap_data[record]['boundary.mlon'][0],
-                                date) * 15)
-                        hmblons = (dmap_data[record]['boundary.mlon'] -
-                                   shifted_mlts) % 360
-                        # Find where the closest HMB value is, set equivalent
-                        # latitude as the lat limit for plotting
-                        rounded_mlon = np.degrees(mlons[i]) % 360
-                        ind = (np.abs(hmblons - rounded_mlon)).argmin()
-                        lat_limit = dmap_data[record]['boundary.mlat'][ind]
-                        if abs(mlats[i]) >= abs(lat_limit):
-                            ax.plot([mlons[i], end_mlons[i]],
-                                     [mlats[i], end_mlats[i]], c='#292929',
-                                     linewidth=0.5, zorder=5.0)
-                    else:
-                        ax.plot([mlons[i], end_mlons[i]],
-                                 [mlats[i], end_mlats[i]], c='#292929',
-                                 linewidth=0.5, zorder=5.0)
+                vector_colors = '#292929'
+            ax.add_collection(LineCollection(segments, colors=vector_colors,
+                                             linewidth=0.5, zorder=5.0,
+                                             capstyle='projecting'))
 
         # Plot the sock start dots and reference vector if known
         if color_vectors is True:
@@ -417,24 +403,11 @@ class Maps:
                                 vmin=zmin, vmax=zmax,  cmap=cmap, zorder=5.0)
             elif parameter in [MapParams.FITTED_VELOCITY,
                                MapParams.TRUE_VELOCITY]:
-                # Shift HMB lons to MLT
-                shifted_mlts = dmap_data[record]['boundary.mlon'][0] - \
-                        (aacgmv2.convert_mlt(
-                            dmap_data[record]['boundary.mlon'][0], date) * 15)
-                hmblons = (dmap_data[record]['boundary.mlon'] -
-                           shifted_mlts) % 360
-                # Find where the closest HMB value is, set equivalent
-                # latitude as the lat limit for plotting
-                for m, mlon in enumerate(mlons[:-1]):
-                    rounded_mlon = np.degrees(mlon) % 360
-                    ind = (np.abs(hmblons - rounded_mlon)).argmin()
-                    lat_limit = dmap_data[record]['boundary.mlat'][ind]
-                    if abs(mlats[m]) >= abs(lat_limit):
-                        ax.scatter(mlon, mlats[m], color=cmap(norm(v_mag[m])),
-                                    s=2.0, zorder=5.0, clip_on=True)
-                    else:
-                        ax.scatter(mlon, mlats[m], c='#DDDDDD', s=2.0,
-                                    zorder=5.0, clip_on=True)
+                # Dots below the HMB are greyed out
+                dot_colors = cmap(norm(v_mag[:-1]))
+                dot_colors[~above_hmb] = colors.to_rgba('#DDDDDD')
+                ax.scatter(mlons[:-1], mlats[:-1], color=dot_colors, s=2.0,
+                           zorder=5.0, clip_on=True)
                 if reference_vector > 0:
                     ax.scatter(mlons[-1], mlats[-1],
                                 color=cmap(norm(v_mag[-1])),
@@ -470,24 +443,10 @@ class Maps:
                                 zorder=5.0)
             elif parameter in [MapParams.FITTED_VELOCITY,
                                MapParams.TRUE_VELOCITY]:
-                # Shift HMB lons to MLT
-                shifted_mlts = dmap_data[record]['boundary.mlon'][0] - \
-                        (aacgmv2.convert_mlt(
-                            dmap_data[record]['boundary.mlon'][0], date) * 15)
-                hmblons = (dmap_data[record]['boundary.mlon'] -
-                           shifted_mlts) % 360
-                # Find where the closest HMB value is, set equivalent
-                # latitude as the lat limit for plotting
-                for m, mlon in enumerate(mlons[:-1]):
-                    rounded_mlon = np.degrees(mlon) % 360
-                    ind = (np.abs(hmblons - rounded_mlon)).argmin()
-                    lat_limit = dmap_data[record]['boundary.mlat'][ind]
-                    if abs(mlats[m]) >= abs(lat_limit):
-                        ax.scatter(mlon, mlats[m], c='#292929', s=2.0,
-                                    zorder=5.0, clip_on=True)
-                    else:
-                        ax.scatter(mlon, mlats[m], c='#DDDDDD', s=2.0,
-                                    zorder=5.0, clip_on=True)
+                # Dots below the HMB are greyed out
+                dot_colors = np.where(above_hmb, '#292929', '#DDDDDD')
+                ax.scatter(mlons[:-1], mlats[:-1], c=dot_colors, s=2.0,
+                           zorder=5.0, clip_on=True)
                 if reference_vector > 0:
                     ax.scatter(mlons[-1], mlats[-1], c='#292929', s=2.0,
                                 zorder=5.0, clip_on=False)
@@ -624,6 +583,184 @@ class Maps:
         return (m == 0 and el**2) or ((el != 0)
                                       and (m != 0) and el**2 + 2 * m - 1) or 0
 
+    @classmethod
+    def potential_basis(cls, theta: np.ndarray, phi: np.ndarray,
+                        theta_max: float, fit_order: int = 6):
+        """
+        Evaluates the spherical harmonic basis of the potential fit at
+        all the given positions at once
+
+        The associated Legendre polynomials are computed for every
+        position in a single call and multiplied by tables of cos(m phi)
+        and sin(m phi), so the potential at the positions is the matrix
+        product of the basis with the fit coefficients
+        (see evaluate_potential).
+
+        Parameters
+        ----------
+            theta: np.ndarray
+                colatitudes of the positions in radians
+            phi: np.ndarray
+                longitudes of the positions in radians
+            theta_max: float
+                colatitude of the lower latitude boundary of the fit
+                in radians (negative for the Southern hemisphere)
+            fit_order: int
+                order of the fit
+                default: 6
+
+        Returns
+        -------
+            basis: np.ndarray
+                (positions x (fit_order + 1)**2) array, column
+                index_legendre(el, m) holds P_el^m cos(m phi) and, for
+                m > 0, the next column holds P_el^m sin(m phi)
+        """
+        theta = np.asarray(theta, dtype=float).ravel()
+        phi = np.asarray(phi, dtype=float).ravel()
+
+        # Adjusted/Normalised values (runs 0 - pi)
+        alpha = np.pi / theta_max
+        x = np.cos(alpha * theta)
+
+        # Legendre Polys of all the positions, indexed [el, m, position]
+        plm = special.assoc_legendre_p_all(fit_order, fit_order, x)[0]
+        orders = np.arange(fit_order + 1)
+        cos_mphi = np.cos(np.outer(orders, phi))
+        sin_mphi = np.sin(np.outer(orders, phi))
+
+        basis = np.zeros((len(x), (fit_order + 1)**2))
+        for m in orders:
+            for el in range(m, fit_order + 1):
+                k = cls.index_legendre(el, m)
+                if m == 0:
+                    basis[:, k] = plm[el, 0]
+                else:
+                    basis[:, k] = plm[el, m] * cos_mphi[m]
+                    basis[:, k + 1] = plm[el, m] * sin_mphi[m]
+        return basis
+
+    @classmethod
+    def cached_potential_basis(cls, theta: np.ndarray, phi: np.ndarray,
+                               theta_max: float, fit_order: int = 6):
+        """
+        Returns the spherical harmonic basis of the potential fit (see
+        potential_basis), caching it so records sharing the same positions,
+        fit order and lower latitude boundary (latmin and hemisphere) only
+        compute it once. The returned basis is read-only.
+
+        Parameters
+        ----------
+            theta: np.ndarray
+                colatitudes of the positions in radians
+            phi: np.ndarray
+                longitudes of the positions in radians
+            theta_max: float
+                colatitude of the lower latitude boundary of the fit
+                in radians (negative for the Southern hemisphere)
+            fit_order: int
+                order of the fit
+                default: 6
+
+        Returns
+        -------
+            basis: np.ndarray
+                (positions x (fit_order + 1)**2) array
+        """
+        theta = np.ascontiguousarray(theta, dtype=float).ravel()
+        phi = np.ascontiguousarray(phi, dtype=float).ravel()
+        key = (float(theta_max), int(fit_order), theta.tobytes(),
+               phi.tobytes())
+        basis = _basis_cache.get(key)
+        if basis is not None:
+            _basis_cache.move_to_end(key)
+            return basis
+
+        basis = cls.potential_basis(theta, phi, theta_max, fit_order)
+        basis.flags.writeable = False
+        _basis_cache[key] = basis
+        if len(_basis_cache) > _BASIS_CACHE_SIZE:
+            _basis_cache.popitem(last=False)
+        return basis
+
+    @classmethod
+    def clear_basis_cache(cls):
+        """
+        Empties the cache of potential bases (see cached_potential_basis)
+        """
+        _basis_cache.clear()
+
+    @classmethod
+    def efield_operator(cls, fit_order: int = 6):
+        """
+        Returns the linear operator converting the potential fit
+        coefficients into the coefficients of the electric field, over the
+        same spherical harmonic basis (see potential_basis).
+
+        The operator only depends on the fit order and is computed once
+        per fit order.
+
+        Parameters
+        ----------
+            fit_order: int
+                order of the fit
+                default: 6
+
+        Returns
+        -------
+            operator: np.ndarray
+                read-only (3 x K x K) array, K = (fit_order + 1)**2.
+                With c the fit coefficients, operator[0] @ c and
+                operator[1] @ c are the coefficients of the theta component
+                to be scaled by alpha cot(alpha theta) / Re and
+                alpha / sin(alpha theta) / Re, and operator[2] @ c the
+                coefficients of the phi component to be scaled by
+                1 / (Re sin(theta))
+        """
+        operator = _efield_operators.get(fit_order)
+        if operator is not None:
+            return operator
+
+        k_max = (fit_order + 1)**2
+        operator = np.zeros((3, k_max, k_max))
+        for m in range(fit_order + 1):
+            for el in range(m, fit_order + 1):
+                k = cls.index_legendre(el, m)
+                # cos(m phi) and, for m > 0, sin(m phi) coefficients
+                for k_trig in range(k, k + 1 + (m > 0)):
+                    operator[0, k_trig, k_trig] = -el
+                    if el < fit_order:
+                        k1 = cls.index_legendre(el + 1, m) + k_trig - k
+                        operator[1, k_trig, k1] = el + 1 + m
+                if m > 0:
+                    operator[2, k, k + 1] = -m
+                    operator[2, k + 1, k] = m
+        operator.flags.writeable = False
+        _efield_operators[fit_order] = operator
+        return operator
+
+    @classmethod
+    def evaluate_potential(cls, basis: np.ndarray,
+                           fit_coefficient: np.ndarray):
+        """
+        Evaluates the potential from a spherical harmonic basis
+        (see potential_basis) and the fit coefficients
+
+        Parameters
+        ----------
+            basis: np.ndarray
+                (positions x number of coefficients) basis array
+            fit_coefficient: np.ndarray
+                Value of the mapfile coefficients (from record key ['N+2'])
+
+        Returns
+        -------
+            v: np.ndarray
+                potential at each position in V
+        """
+        coeff_fit_flat = np.asarray(fit_coefficient, dtype=float).flatten()
+        return basis @ coeff_fit_flat[:basis.shape[1]]
+
     @classmethod
     def calculated_true_velocities(cls, v_los: list, a_los: list,
                                    v_fit: list, a_fit: list):
@@ -702,135 +839,45 @@ class Maps:
         # convert earth radius to meters
         Re_meters = Re * 1000.0
         # theta values in radians
-        thetas = np.radians(90.0 - abs(mlats))
+        mlats = np.asarray(mlats, dtype=float)
+        thetas = np.radians(90.0 - np.abs(mlats))
         thetas_max = np.radians(90.0 - abs(lat_min))
 
         # Angle to "rotate" each vector by to get into same
         # reference frame Controlled by longitude, or "mltitude"
         alpha = np.pi / thetas_max
         thetas_prime = alpha * thetas
-        x = np.cos(thetas_prime)
-
-        # i is the index of the list
-        # x_i is the element of x at ith index
-        for i, x_i in enumerate(x):
-            temp_poly = special.assoc_legendre_p_all(fit_order, fit_order, x_i)
-            temp_poly = ((temp_poly[0].T).tolist()[0:fit_order+1],)
-            if i == 0:
-                legendre_poly = np.append([temp_poly[0]], [temp_poly[0]],
-                                          axis=0)
-            else:
-                legendre_poly = np.append(legendre_poly, [temp_poly[0]],
-                                          axis=0)
-        legendre_poly = np.delete(legendre_poly, 0, 0)
-        phi = mlons
-
-        # now do the index legender part,
-        # We are doing Associated Legendre Polynomials but
-        # for each polynomial we have two coefficients one
-        # for cos(phi) and the other for sin(phi),
-        # so we do spherical harmonics for a real valued function using
-        # sin(phi) and cos(phi) rather than exp(i*phi).
-        # we place an inner function to copying code
-
-        # max index value
-        k_max = cls.index_legendre(fit_order, fit_order)
-
-        # set up arrays and small stuff for the E field
-        # coefficients calculation
-        thetas_ecoeffs = np.zeros((k_max + 2, len(thetas)))
-        phi_ecoeffs = np.zeros((k_max + 2, len(thetas)))
-
-        q_prime = np.array(np.where(thetas_prime != 0.0))
-        q_prime = q_prime[0]
-        q = np.array(np.where(thetas != 0.0))
-        q = q[0]
-
-        # finally get to converting coefficients for the potential into
-        # coefficients for elec. Field
-        fit_coefficient_flat = fit_coefficient.flatten()
-        for m in range(fit_order + 1):
-            for el in range(m, fit_order + 1):
-                k3 = cls.index_legendre(el, m)
-                k4 = cls.index_legendre(el, m)
-
-                if k3 >= 0:
-                    thetas_ecoeffs[k4, q_prime] =\
-                            thetas_ecoeffs[k4, q_prime] -\
-                            fit_coefficient_flat[k3] * alpha * el *\
-                            np.cos(thetas_prime[q_prime]) / \
-                            np.sin(thetas_prime[q_prime]) / Re_meters
-                    phi_ecoeffs[k4, q] = phi_ecoeffs[k4, q] - \
-                        fit_coefficient_flat[k3 + 1] * m /\
-                        np.sin(thetas[q]) / Re_meters
-                    phi_ecoeffs[k4 + 1, q] = phi_ecoeffs[k4 + 1, q] + \
-                        fit_coefficient_flat[k3] * m /\
-                        np.sin(thetas[q]) / Re_meters
-
-                if el < fit_order:
-                    k1 = cls.index_legendre(el+1, m)
-                else:
-                    k1 = -1
-
-                k2 = cls.index_legendre(el, m)
-
-                if k1 >= 0:
-                    thetas_ecoeffs[k2, q_prime] =\
-                        thetas_ecoeffs[k2, q_prime] + \
-                        fit_coefficient_flat[k1] * alpha * (el + 1 + m) / \
-                        np.sin(thetas_prime[q_prime]) / Re_meters
-
-                if m > 0:
-                    if k3 >= 0:
-                        k3 = k3 + 1
-                    k4 = k4 + 1
-
-                    if k1 >= 0:
-                        k1 = k1 + 1
-                    k2 = k2 + 1
-
-                    if k3 >= 0:
-                        thetas_ecoeffs[k4, q_prime] =\
-                                thetas_ecoeffs[k4, q_prime] \
-                                - fit_coefficient_flat[k3] * alpha * el * \
-                                np.cos(thetas_prime[q_prime]) / \
-                                np.sin(thetas_prime[q_prime]) / Re_meters
-
-                    if k1 >= 0:
-                        thetas_ecoeffs[k2, q_prime] = \
-                            thetas_ecoeffs[k2, q_prime] \
-                            + fit_coefficient_flat[k1] * alpha *\
-                            (el + 1 + m) / np.sin(thetas_prime[q_prime]) /\
-                            Re_meters
+        phi = np.asarray(mlons, dtype=float)
+
+        # The potential is a sum of Associated Legendre Polynomials, and
+        # for each polynomial we have two coefficients one for cos(phi) and
+        # the other for sin(phi), so we do spherical harmonics for a real
+        # valued function using sin(phi) and cos(phi) rather than
+        # exp(i*phi). Its gradient, the E field, is a sum over the same
+        # basis with the coefficients transformed by efield_operator,
+        # scaled by factors depending on the position.
+        basis = cls.potential_basis(thetas, phi, thetas_max, fit_order)
+        k_max = basis.shape[1]
+        fit_coefficient_flat = np.asarray(fit_coefficient,
+                                          dtype=float).flatten()[:k_max]
+        ecoeffs = cls.efield_operator(fit_order) @ fit_coefficient_flat
+        ecomps = (basis @ ecoeffs.T).T.reshape((3,) + thetas.shape)
+
+        # position factors, left as 0 at the pole
+        cot_prime = np.zeros(thetas.shape)
+        csc_prime = np.zeros(thetas.shape)
+        csc = np.zeros(thetas.shape)
+        q_prime = thetas_prime != 0.0
+        q = thetas != 0.0
+        cot_prime[q_prime] = np.cos(thetas_prime[q_prime]) / \
+            np.sin(thetas_prime[q_prime])
+        csc_prime[q_prime] = 1.0 / np.sin(thetas_prime[q_prime])
+        csc[q] = 1.0 / np.sin(thetas[q])
 
         # Calculate the Electric field positions
-        thetas_ecomp = np.zeros(thetas.shape)
-        phi_ecomp = np.zeros(thetas.shape)
-
-        for m in range(fit_order + 1):
-            for el in range(m, fit_order + 1):
-                k = cls.index_legendre(el, m)
-                # Now in the IDL code we use
-                # legendre_poly[:,l,m] instead of
-                # legendre_poly[:,m,l] like here, this is
-                # because we have a different
-                # organization of legendre_poly due to the
-                # way scipy.special.lpmn
-                # stores values in arrays...
-                if m == 0:
-                    thetas_ecomp = thetas_ecomp + thetas_ecoeffs[k, :] * \
-                            legendre_poly[:, m, el]
-                    phi_ecomp = phi_ecomp + phi_ecoeffs[k, :] * \
-                        legendre_poly[:, m, el]
-                else:
-                    thetas_ecomp = thetas_ecomp + thetas_ecoeffs[k, :] * \
-                        legendre_poly[:, m, el] * np.cos(m * phi) + \
-                        thetas_ecoeffs[k+1, :] * legendre_poly[:, m, el] * \
-                        np.sin(m * phi)
-                    phi_ecomp = phi_ecomp + phi_ecoeffs[k, :] * \
-                        legendre_poly[:, m, el] * np.cos(m * phi) + \
-                        phi_ecoeffs[k+1, :] * legendre_poly[:, m, el] * \
-                        np.sin(m * phi)
+        thetas_ecomp = alpha * (ecomps[0] * cot_prime +
+                                ecomps[1] * csc_prime) / Re_meters
+        phi_ecomp = ecomps[2] * csc / Re_meters
 
         # Store the two components of Efield into a single array
         E_field_fit = np.append([thetas_ecomp], [phi_ecomp], axis=0)
@@ -931,6 +978,44 @@ class Maps:
         plt.plot(mlon, mlats, c=line_color, zorder=4.0, **kwargs)
         return mlon, mlats
 
+    @classmethod
+    def hmb_lat_limits(cls, boundary_mlats: np.ndarray,
+                       boundary_mlons: np.ndarray, mlons: np.ndarray,
+                       date: object):
+        """
+        Finds the latitude of the Heppner-Maynard Boundary point closest
+        in longitude to each position
+
+        Parameters
+        ----------
+            boundary_mlats: Array[float]
+                Magnetic Latitude of the boundary in degrees
+                (from record key ['boundary.mlat'])
+            boundary_mlons: Array[float]
+                Magnetic Longitude of the boundary in degrees
+                (from record key ['boundary.mlon'])
+            mlons: Array[float]
+                Magnetic Longitude of the positions in radians, shifted to
+                MLT
+            date: datetime object
+                Date from record
+
+        Returns
+        -------
+            lat_limit: np.ndarray
+                latitude of the boundary at each position in degrees
+        """
+        boundary_mlons = np.asarray(boundary_mlons, dtype=float)
+        # Shift HMB lons to MLT
+        shifted_mlts = boundary_mlons[0] - \
+            (aacgmv2.convert_mlt(boundary_mlons[0], date) * 15)
+        hmblons = (boundary_mlons - shifted_mlts) % 360
+        # Find where the closest HMB value is for all the positions at once
+        rounded_mlons = np.degrees(np.asarray(mlons, dtype=float)) % 360
+        ind = np.abs(hmblons[np.newaxis, :] -
+                     rounded_mlons[:, np.newaxis]).argmin(axis=1)
+        return np.asarray(boundary_mlats)[ind]
+
     @classmethod
     def plot_imf_dial(cls, ax: matplotlib.axes.Axes, by: float = 0, bz: float = 0,
                       bt: float = 0, delay: float = 0):
@@ -1029,65 +1114,31 @@ class Maps:
         lon_step = 2
         num_lats = int((90.0 - lowlat) / lat_step) + 1
         num_lons = int(360.0 / lon_step) + 1
-        lat_arr = np.array(range(num_lats)) * lat_step + lowlat
-        lon_arr = np.array(range(num_lons)) * lon_step
-
-        # Set up Grid
-        grid_arr = np.zeros((2, num_lats * num_lons))
-        count1 = 0
-        for lons in lon_arr:
-            for lats in lat_arr:
-                grid_arr[0, count1] = lats
-                grid_arr[1, count1] = lons
-                count1 += 1
+        lat_arr = np.arange(num_lats, dtype=float) * lat_step + lowlat
+        lon_arr = np.arange(num_lons, dtype=float) * lon_step
 
-        # Convert grid vals to spherical coords
-        theta = np.radians(90.0 - np.abs(grid_arr[0, :]))
-        phi = np.radians(grid_arr[1, :])
+        # Set up Grid, longitude is the outer and latitude the inner axis
+        mlon_center, mlat_center = np.meshgrid(lon_arr, lat_arr,
+                                               indexing='ij')
 
-        # Adjusted/Normalised values (runs 0 - pi)
-        alpha = np.pi / theta_max
-        x = np.cos(alpha*theta)
-        # Legendre Polys
-        for j, xj in enumerate(x):
-            plm_tmp = special.assoc_legendre_p_all(fit_order, fit_order, xj)
-            plm_tmp = ((plm_tmp[0].T).tolist()[0:fit_order+1],)
-            if j == 0:
-                plm_fit = np.append([plm_tmp[0]], [plm_tmp[0]], axis=0)
-            else:
-                plm_fit = np.append(plm_fit, [plm_tmp[0]], axis=0)
-        # Remove first element as it is duplicated to start off the array
-        plm_fit = np.delete(plm_fit, 0, 0)
+        # Convert grid vals to spherical coords
+        theta = np.radians(90.0 - np.abs(mlat_center.ravel()))
+        phi = np.radians(mlon_center.ravel())
 
         # Eval the potential
-        lmax = plm_fit.shape
-        lmax = lmax[1]
-        v = np.zeros(phi.shape)
-
-        coeff_fit_flat = fit_coefficient.flatten()
-        for m in range(lmax):
-            for el in range(m, lmax):
-                k = cls.index_legendre(el, m)
-                if m == 0:
-                    v = v + coeff_fit_flat[k] * plm_fit[:, 0, el]
-                else:
-                    v = v + coeff_fit_flat[k] * np.cos(m * phi) \
-                          * plm_fit[:, m, el] + coeff_fit_flat[k+1] \
-                          * np.sin(m * phi) * plm_fit[:, m, el]
-
-        pot_arr = np.zeros((num_lons, num_lats))
-        pot_arr = np.reshape(v, pot_arr.shape) / 1000.0
+        basis = cls.cached_potential_basis(theta, phi, theta_max,
+                                           fit_order)
+        v = cls.evaluate_potential(basis, fit_coefficient)
+        pot_arr = np.reshape(v, (num_lons, num_lats)) / 1000.0
 
         # TODO: Account for lon_shift
         # TODO: Code for lat shift! (both rarely non-0 though)
         # grid_arr[1,:] = (grid_arr[1,:] + lon_shift)
 
-        mlat_center = grid_arr[0, :].reshape((num_lons, num_lats))
         # Set everything below the latmin as 0
         ind = np.where(abs(mlat_center) < abs(lat_min))
         pot_arr[ind] = 0
 
-        mlon_center = grid_arr[1, :].reshape((num_lons, num_lats))
         # Invert for Southern maps
         mlat_center = mlat_center * hemisphere.value
 
@@ -1132,12 +1183,11 @@ class Maps:
             v: List[float]
                 list of potentials at given position(s) in kV
         '''
-        # Check input is in correct format and lengths
-        if not isinstance(mlat, list):
-            mlat = [mlat]
-        if not isinstance(mlon, list):
-            mlon = [mlon]
-        if not len(mlat) == len(mlon):
+        # Check input is in correct format and lengths, single positions
+        # are evaluated as a list of one
+        mlat = np.atleast_1d(np.asarray(mlat, dtype=float))
+        mlon = np.atleast_1d(np.asarray(mlon, dtype=float))
+        if not mlat.shape == mlon.shape:
             raise ValueError('mlat and mlon must be the same length.')
 
         # Lowest latitude to calculate potential to
@@ -1147,36 +1197,10 @@ class Maps:
         theta = np.radians(90.0 - np.abs(mlat))
         phi = np.radians(mlon)
 
-        # Adjusted/Normalised values (runs 0 - pi)
-        alpha = np.pi / theta_max
-        x = np.cos(alpha * theta)
-
-        # Legendre Polys
-        for j, xj in enumerate(x):
-            plm_tmp = special.assoc_legendre_p_all(fit_order, fit_order, xj)
-            plm_tmp = ((plm_tmp[0].T).tolist()[0:fit_order+1],)
-            if j == 0:
-                plm_fit = np.append([plm_tmp[0]], [plm_tmp[0]], axis=0)
-            else:
-                plm_fit = np.append(plm_fit, [plm_tmp[0]], axis=0)
-        # Remove first element as it is duplicated to start off the array
-        plm_fit = np.delete(plm_fit, 0, 0)
-
         # Eval the potential
-        lmax = plm_fit.shape
-        lmax = lmax[1]
-        v = np.zeros(phi.shape)
-
-        coeff_fit_flat = fit_coefficient.flatten()
-        for m in range(lmax):
-            for el in range(m, lmax):
-                k = cls.index_legendre(el, m)
-                if m == 0:
-                    v = v + coeff_fit_flat[k] * plm_fit[:, 0, el]
-                else:
-                    v = v + coeff_fit_flat[k] * np.cos(m * phi) \
-                        * plm_fit[:, m, el] + coeff_fit_flat[k + 1] \
-                        * np.sin(m * phi) * plm_fit[:, m, el]
+        basis = cls.cached_potential_basis(theta, phi, theta_max,
+                                           fit_order)
+        v = cls.evaluate_potential(basis, fit_coefficient).reshape(mlat.shape)
 
         # Convert from V to kV
         v /= 1000
@@ -1376,36 +1400,12 @@ class Maps:
         -------
         Returns the closet record to the passed time
         """
-        # recursively identify the index of the list
-        # where the time is closest to the passed time
-        def find_nearest_time(dmap_data: List[dict], start_time: dt.datetime,
-                              start_index: int, end_index: int):
-            # base case
-            if start_index == end_index:
-                return start_index
-            # recursive case
-            else:
-                # find the middle index
-                mid_index = int((start_index + end_index)/2)
-                # if the time at the middle index is
-                # greater than the passed time
-                if time2datetime(dmap_data[mid_index]) > start_time:
-                    # search the lower half of the list
-                    return find_nearest_time(dmap_data, start_time,
-                                             start_index, mid_index)
-                # if the time at the middle index
-                # is less than the passed time
-                elif time2datetime(dmap_data[mid_index]) < start_time:
-                    # search the upper half of the list
-                    return find_nearest_time(dmap_data, start_time,
-                                             mid_index + 1, end_index)
-                # if the time at the middle index is equal to the passed time
-                else:
-                    # return the middle index
-                    return mid_index
-
-        return find_nearest_time(dmap_data,
-                                 start_time, 0, len(dmap_data) - 1)
+        # binary search the cached time stamps for the first record at or
+        # after the passed time
+        timestamps = record_timestamps(dmap_data)
+        index = np.searchsorted(timestamps, np.datetime64(start_time, 'us'),
+                                side='left')
+        return int(min(index, len(dmap_data) - 1))
 
     @classmethod
     def plot_time_series(cls, dmap_data: List[dict],
@@ -1454,7 +1454,6 @@ class Maps:
         # based on the parameter, plot the data
         if parameter == TimeSeriesParams.NUM_VECTORS:
             datalist = []
-            timelist = []
             for records in range(start_record, end_record):
                 # append the dimension of numv for each record
                 # we can just uexse any of the keys with dimensionality numv
@@ -1463,8 +1462,9 @@ class Maps:
                     datalist.append(len(dmap_data[records]['vector.mlat']))
                 except KeyError:
                     datalist.append(np.nan)
-                # now get the associated time data point per record
-                timelist.append(time2datetime(dmap_data[records]))
+            # now get the associated time data point per record
+            timelist = \
+                record_timestamps(dmap_data)[start_record:end_record].tolist()
             plt.plot(timelist, datalist, **kwargs)
             plt.ylabel('Number of Vectors')
             plt.xlabel('Time (UTC)')
@@ -1489,7 +1489,6 @@ class Maps:
                               "potential_position = [-110, 78]")
             else:
                 datalist = []
-                timelist = []
                 for records in range(start_record, end_record):
                     # Calculate potential
                     pot = cls.calculate_potentials_pos(
@@ -1502,7 +1501,8 @@ class Maps:
                             dmap_data[records]['fit.order'],
                             Hemisphere(dmap_data[records]['hemisphere']))
                     datalist.append(pot)
-                    timelist.append(time2datetime(dmap_data[records]))
+                timelist = record_timestamps(
+                    dmap_data)[start_record:end_record].tolist()
                 plt.plot(timelist, datalist, **kwargs)
                 plt.ylabel('Potential (kV)')
                 plt.xlabel('Time (UTC)')
@@ -1511,10 +1511,10 @@ class Maps:
                           str(end_time))
         elif parameter is not None:
             datalist = []
-            timelist = []
             for records in range(start_record, end_record):
                 datalist.append(dmap_data[records][parameter.value])
-                timelist.append(time2datetime(dmap_data[records]))
+            timelist = \
+                record_timestamps(dmap_data)[start_record:end_record].tolist()
             plt.plot(timelist, datalist, **kwargs)
             plt.ylabel(parameter.value)
             plt.xlabel('Time (UTC)')
@@ -14,6 +14,8 @@
 # 2023-10-14 Carley Martin added embargoed data method
 # 2026-04-20 Carley Martin added options for remove_iono_scatter 
 #            and remove_ground_scatter
+# 2026-10-16 range-time and coord-time plots use build_range_time_grid
+# 2026-10-16 nightshade masks are computed for all times with night_mask
 #
 # Disclaimer:
 # pyDARN is under the LGPL v3 license found in the root directory LICENSE.md
@@ -31,7 +33,6 @@ Range-Time Parameter (aka Intensity) plots
 """
 import copy
 
-import cartopy.geodesic
 import matplotlib.pyplot as plt
 import numpy as np
 import warnings
@@ -44,7 +45,9 @@ from pydarn import (RangeEstimation, check_data_type, Coords,
                     time2datetime, rtp_exceptions, plot_exceptions,
                     SuperDARNCpids, SuperDARNRadars, RadarID,
                     standard_warning_format, PyDARNColormaps,
-                    determine_embargo, add_embargo, terminator as calc_terminator)
+                    determine_embargo, add_embargo, night_mask,
+                    build_range_time_grid, record_timestamps,
+                    find_record_window)
 from pydarn.utils.coordinates import gate2geographic_location
 
 warnings.formatwarning = standard_warning_format
@@ -288,18 +291,10 @@ class RTP:
         y_max = max(record['nrang'] for record in cls.dmap_data)
         range_gates = np.arange(0, y_max+1, 1)
 
-        # z: parameter data mapped into the color mesh
-        z = np.zeros((1, y_max)) * np.nan
-
-        # x: time date data
-        x = []
-
         # If remove_ground scatter is chosen, set gs to white
         if remove_ground_scatter:
             groundscatter = 'w'
 
-        # We cannot simply use numpy's built in min and max function
-        # because of the groundscatter value :(
         # These flags indicate if zmin and zmax should change
         set_zmin = True
         set_zmax = True
@@ -310,108 +305,16 @@ class RTP:
             zmax = cls.dmap_data[index_first_match][parameter][0]
             set_zmax = False
 
-        for dmap_record in cls.dmap_data:
-            # get time difference to test if there is some gap data
-            rec_time = time2datetime(dmap_record)
-            diff_time = 0.0
-            if rec_time > end_time:
-                break
-            if x != []:
-                # 60.0 seconds in a minute
-                delta_diff_time = abs(rec_time - x[-1])
-                diff_time = delta_diff_time.seconds/60.0
-                # Abs added above as some files have data out of order
-                # abs stops the code from hanging and plotting over a day
-                # of white space, but user needs to be warned that the
-                # output may be incorrect
-                if (rec_time - x[-1]) < timedelta(0):
-                    # warnings are turned off for summary plots so
-                    # for now print to console
-                    # May be repeated, but will show what records are out
-                    # of time order by doing so to help user
-                    warnings.warn("Please be aware that the data for"
-                                  " timestamp {} contains a record that is not"
-                                  " in time order. As such the plot of the"
-                                  " data may not be correct, you can solve"
-                                  " this by sorting the data stream by date"
-                                  " before plotting.".format(rec_time))
-
-            # separation roughly 2 minutes
-            if diff_time > 2.0:
-                # if there is gap data (no data recorded past 2 minutes)
-                # then fill it in with white space
-                for _ in range(0, int(np.floor(diff_time/2.0))):
-                    x.append(x[-1] + timedelta(0, 120))
-                    i = len(x) - 1  # offset since we start at 0 not 1
-                    if i > 0:
-                        z = np.insert(z, len(z), np.zeros([1, y_max]) * np.nan,
-                                      axis=0)
-            # Get data for the provided beam number
-            if (beam_num == 'all' or dmap_record['bmnum'] == beam_num) and\
-               (channel == 'all' or
-                    dmap_record['channel'] == channel):
-                if start_time <= rec_time:
-                    # construct the x-axis array
-                    # Numpy datetime is used because it properly formats on the
-                    # x-axis
-                    x.append(rec_time)
-                    # I do this to avoid having an extra loop to just count how
-                    # many records contain the beam number
-                    i = len(x) - 1  # offset since we start at 0 not 1
-
-                    # insert a new column into the z_data
-                    if i > 0:
-                        z = np.insert(z, len(z), np.zeros((1, y_max)) * np.nan,
-                                      axis=0)
-                    try:
-                        if len(dmap_record[parameter]) == dmap_record['nrang']:
-                            good_gates = range(len(dmap_record[parameter]))
-                            # Get slist and amend gflg with extra 0's and replace
-                            # This section is only for pwr0 parameter
-                            groundflag = []
-                            for k in good_gates:
-                                if k in dmap_record['slist']:
-                                    gflg_idx = [sl for sl, x in 
-                                                enumerate(dmap_record['slist'])
-                                                if x == k]
-                                    groundflag.append(dmap_record['gflg']
-                                                      [gflg_idx])
-                                else:
-                                    groundflag.append(0)
-                            dmap_record['gflg'] = groundflag
-                        else:
-                            good_gates = dmap_record['slist']
-
-                        # get the range gates that have "good" data in it
-                        for j in range(len(good_gates)):
-                            # if it is groundscatter store a very
-                            # low number in that cell
-                            if groundscatter and\
-                               dmap_record['gflg'][j] == 1:
-                                # chosen value from davitpy to make the
-                                # groundscatter a different color
-                                # from the color map
-                                z[i][good_gates[j]] = -1000000
-                            # otherwise store parameter value
-                            # TODO: refactor and clean up this code
-                            elif dmap_record['gflg'][j] == 0 and\
-                                remove_iono_scatter:
-                                z[i][good_gates[j]] = -1000000
-                            elif cls.__filter_data_check(dmap_record,
-                                                         plot_filter, j):
-                                z[i][good_gates[j]] = \
-                                        dmap_record[parameter][j]
-                                # calculate min and max value
-                                if not set_zmin and\
-                                   z[i][good_gates[j]] < zmin:
-                                    zmin = z[i][good_gates[j]]
-                                if not set_zmax and \
-                                   z[i][good_gates[j]] > zmax:
-                                    zmax = z[i][good_gates[j]]
-                    # a KeyError may be thrown because slist is not created
-                    # due to bad quality data.
-                    except KeyError:
-                        continue
+        # x: time date data
+        # z: parameter data mapped into the color mesh
+        x, z, data_zmin, data_zmax = \
+            cls.__grid_data(parameter, beam_num, channel, start_time,
+                            end_time, plot_filter, groundscatter,
+                            remove_iono_scatter)
+        if not set_zmin and data_zmin < zmin:
+            zmin = data_zmin
+        if not set_zmax and data_zmax > zmax:
+            zmax = data_zmax
 
         x.append(end_time)
         # Check if there is any data to plot
@@ -505,22 +408,15 @@ class RTP:
         if nightshade:
             height = 300  # km
 
-            # [num_ranges, 2] holding the [lat, lon] for each range gate
+            # [lat, lon] of each range gate
             radar_id = RadarID(cls.dmap_data[0]["stid"])
-            geographic_points = np.array([
-                gate2geographic_location(radar_id, beam_num, height, center=True, range_gate=rg)
-                for rg in range_gates
-            ])
-            # switch to [lon, lat] for compatibility with cartopy geodesic calculations
-            geographic_points = np.flip(geographic_points, axis=1)
-
-            # [num_times, num_ranges] indicating if the cell is in darkness at that time
-            is_night = np.zeros_like(time_axis, dtype=np.int8)
-            geodesic = cartopy.geodesic.Geodesic()
-            for i, t in enumerate(x):
-                anti_point, arc_ang, _ = calc_terminator(t, height)
-                distance_to_antisolar_point = geodesic.inverse(anti_point, geographic_points)[:, 0] / 1000.0  # convert to km
-                is_night[:, i] = distance_to_antisolar_point < arc_ang
+            gate_lats, gate_lons = \
+                gate2geographic_location(radar_id, beam_num, height,
+                                         center=True, range_gate=range_gates)
+
+            # [num_ranges, num_times] indicating if the cell is in darkness at that time
+            is_night = night_mask(x, gate_lats, gate_lons,
+                                  height).T.astype(np.int8)
             ax.pcolormesh(time_axis, y_axis, is_night,
                           cmap=colors.ListedColormap(['white', 'gray']),
                           zorder=0.5,
@@ -756,13 +652,13 @@ class RTP:
         # plot CPID
         if parameter == 'cp':
             old_cpid = None
-            for dmap_record in cls.dmap_data:
+            rec_times = record_timestamps(cls.dmap_data).tolist()
+            for dmap_record, rec_time in zip(cls.dmap_data, rec_times):
                 # TODO: this check could be a function call
-                x.append(time2datetime(dmap_record))
+                x.append(rec_time)
 
                 if (dmap_record['bmnum'] == beam_num or beam_num == 'all') and\
                    (dmap_record['channel'] == channel or channel == 'all'):
-                    rec_time = time2datetime(dmap_record)
                     if start_time <= rec_time and rec_time <= end_time:
                         if old_cpid != dmap_record['cp'] or old_cpid is None:
                             ax.axvline(x=rec_time, color='black')
@@ -811,41 +707,43 @@ class RTP:
             # to get rid of y-axis numbers
             ax.set_yticks([])
         else:
-            for dmap_record in cls.dmap_data:
-                # TODO: this check could be a function call
-                rec_time = time2datetime(dmap_record)
-                if start_time <= rec_time and rec_time <= end_time:
-                    if (dmap_record['bmnum'] == beam_num or
-                        beam_num == 'all') and \
-                       (channel == dmap_record['channel'] or channel == 'all'):
-                        # construct the x-axis array
-                        x.append(rec_time)
-                        try:
-                            if parameter == 'tfreq':
-                                # Convert kHz to MHz by dividing by 1000
-                                y.append(dmap_record[parameter]/1000)
-                            elif isinstance(dmap_record[parameter],
-                                            np.ndarray):
-                                if gate in dmap_record['slist']:
-                                    for i in range(len(dmap_record['slist'])):
-                                        if dmap_record['slist'][i] == gate:
-                                            break
-                                    y.append(dmap_record[parameter][i])
-                                else:
-                                    y.append(np.ma.masked)
+            # only the records within the time window are looked at
+            rec_times = record_timestamps(cls.dmap_data).tolist()
+            for rec_num in find_record_window(cls.dmap_data, start_time,
+                                              end_time):
+                dmap_record = cls.dmap_data[rec_num]
+                rec_time = rec_times[rec_num]
+                if (dmap_record['bmnum'] == beam_num or
+                    beam_num == 'all') and \
+                   (channel == dmap_record['channel'] or channel == 'all'):
+                    # construct the x-axis array
+                    x.append(rec_time)
+                    try:
+                        if parameter == 'tfreq':
+                            # Convert kHz to MHz by dividing by 1000
+                            y.append(dmap_record[parameter]/1000)
+                        elif isinstance(dmap_record[parameter],
+                                        np.ndarray):
+                            if gate in dmap_record['slist']:
+                                for i in range(len(dmap_record['slist'])):
+                                    if dmap_record['slist'][i] == gate:
+                                        break
+                                y.append(dmap_record[parameter][i])
                             else:
-                                y.append(dmap_record[parameter])
-                        except KeyError:
-                            y.append(np.ma.masked)
-                    # else plot missing data
-                    elif len(x) > 0:
-                        diff_time = rec_time - x[-1]
-                        # if the time difference is greater than 2 minutes
-                        # meaning no data was collected for that time period
-                        # then plot nothing.
-                        if diff_time.total_seconds() > 2.0 * 60.0:
-                            x.append(rec_time)
-                            y.append(np.nan)  # for masking the data
+                                y.append(np.ma.masked)
+                        else:
+                            y.append(dmap_record[parameter])
+                    except KeyError:
+                        y.append(np.ma.masked)
+                # else plot missing data
+                elif len(x) > 0:
+                    diff_time = rec_time - x[-1]
+                    # if the time difference is greater than 2 minutes
+                    # meaning no data was collected for that time period
+                    # then plot nothing.
+                    if diff_time.total_seconds() > 2.0 * 60.0:
+                        x.append(rec_time)
+                        y.append(np.nan)  # for masking the data
             # Check if there is any data to plot
             if np.all(np.isnan(y)) or len(x) == 0:
                 raise plot_exceptions.\
@@ -1484,55 +1382,67 @@ class RTP:
         return title_format
 
     @classmethod
-    # TODO: could parallelize this method
-    def __filter_data_check(cls, dmap_record: dict,
-                            settings: dict, j: int) -> bool:
+    def __grid_data(cls, parameter: str, beam_num: int, channel: int,
+                    start_time: datetime, end_time: datetime,
+                    settings: dict, groundscatter: bool,
+                    remove_iono_scatter: bool) -> tuple:
         """
-        checks for data that does not meet the criteria of the filtered
-        settings
+        Grids the parameter into a (time x range gate) array and marks the
+        scatter that should be drawn separately
 
         Parameters
         ----------
-        dmap_record : dict
-            dictionary of the dmap record fields
+        parameter : str
+            key name of the parameter to grid
+        beam_num : int
+            beam number of the data to grid
+        channel : int or str
+            channel of the data to grid
+        start_time : datetime
+            start time of the data to grid
+        end_time : datetime
+            end time of the data to grid
         settings : dict
-            dictionary of the settings list
-        j : int
-            index on the slist or range gate to check the array values
+            dictionary of the filter settings
+        groundscatter : bool or str
+            if set, ground scatter is marked
+        remove_iono_scatter : bool
+            if set, ionospheric scatter is marked
 
         Returns
         -------
-        pass_flg : bool
-            boolean indicating if the dmap_record passes all filter checks
+        x : List[datetime]
+            time of each row of z
+        z : np.ndarray
+            (time x range gate) array of the parameter values
+        zmin : float
+            minimum of the parameter values that are not marked,
+            inf if there are none
+        zmax : float
+            maximum of the parameter values that are not marked,
+            -inf if there are none
         """
-        pass_flg = True
-        for key, value in settings['min_array_filter'].items():
-            if dmap_record[key][j] < value:
-                pass_flg = False
-                break
-        for key, value in settings['max_array_filter'].items():
-            if dmap_record[key][j] > value:
-                pass_flg = False
-                break
-
-        for key, value in settings['min_scalar_filter'].items():
-            if dmap_record[key] < value:
-                pass_flg = False
-                break
-
-        for key, value in settings['max_scalar_filter'].items():
-            if dmap_record[key] > value:
-                pass_flg = False
-                break
-
-        for key, value in settings['equal_scalar_filter'].items():
-            if dmap_record[key] != value:
-                pass_flg = False
-                break
-
-        return pass_flg
-
+        x, _, z, gflg = build_range_time_grid(cls.dmap_data, parameter,
+                                              beam_num=beam_num,
+                                              channel=channel,
+                                              start_time=start_time,
+                                              end_time=end_time,
+                                              filter_settings=settings)
+        marked = np.zeros(z.shape, dtype=bool)
+        if groundscatter:
+            marked |= gflg == 1
+        if remove_iono_scatter:
+            marked |= gflg == 0
+        # chosen value from davitpy to make the marked scatter a
+        # different color from the color map
+        z[marked] = -1000000
 
+        # We cannot simply use numpy's built in min and max function
+        # because of the groundscatter value :(
+        values = z[~marked & ~np.isnan(z)]
+        if values.size == 0:
+            return x, z, np.inf, -np.inf
+        return x, z, np.min(values), np.max(values)
 
     @classmethod
     def plot_coord_time(cls, dmap_data: List[dict], parameter: str = 'v',
@@ -1755,19 +1665,10 @@ class RTP:
         y_max = max(record['nrang'] for record in cls.dmap_data)
         range_gates = np.arange(0, y_max, 1)
 
-        # z: parameter data mapped into the color mesh
-        z = np.zeros((1, y_max)) * np.nan
-
-        # x: time date data
-        x = []
-
         # If remove_ground scatter is chosen, set gs to white
         if remove_ground_scatter:
             groundscatter = 'w'
 
-        # We cannot simply use numpy's built in min and max function
-        # because of the groundscatter value :(
-
         # These flags indicate if zmin and zmax should change
         set_zmin = True
         set_zmax = True
@@ -1778,96 +1679,17 @@ class RTP:
             zmax = cls.dmap_data[index_first_match][parameter][0]
             set_zmax = False
 
-        for dmap_record in cls.dmap_data:
-            # get time difference to test if there is some gap data
-            rec_time = time2datetime(dmap_record)
-            diff_time = 0.0
-            if rec_time > end_time:
-                break
-            if x != []:
-                # 60.0 seconds in a minute
-                delta_diff_time = abs(rec_time - x[-1])
-                diff_time = delta_diff_time.seconds/60.0
-                # Abs added above as some files have data out of order
-                # abs stops the code from hanging and plotting over a day
-                # of white space, but user needs to be warned that the
-                # output may be incorrect
-                if (rec_time - x[-1]) < timedelta(0):
-                    # warnings are turned off for summary plots so
-                    # for now print to console
-                    # May be repeated, but will show what records are out
-                    # of time order by doing so to help user
-                    print("Please be aware that the data for timestamp {}"
-                          " contains a record that is not"
-                          " in time order. As such the plot of the"
-                          " data may not be correct, you can solve"
-                          " this by sorting the data stream by date"
-                          " before plotting.".format(rec_time))
-
-
-            # separation roughly 2 minutes
-            if diff_time > 2.0:
-                # if there is gap data (no data recorded past 2 minutes)
-                # then fill it in with white space
-                for _ in range(0, int(np.floor(diff_time/2.0))):
-                    x.append(x[-1] + timedelta(0, 120))
-                    i = len(x) - 1  # offset since we start at 0 not 1
-                    if i > 0:
-                        z = np.insert(z, len(z), np.zeros([1, y_max]) * np.nan,
-                                      axis=0)
-            # Get data for the provided beam number
-            if (beam_num == 'all' or dmap_record['bmnum'] == beam_num) and\
-               (channel == 'all' or
-                    dmap_record['channel'] == channel):
-                if start_time <= rec_time:
-                    # construct the x-axis array
-                    # Numpy datetime is used because it properly formats on the
-                    # x-axis
-                    x.append(rec_time)
-                    # I do this to avoid having an extra loop to just count how
-                    # many records contain the beam number
-                    i = len(x) - 1  # offset since we start at 0 not 1
-
-                    # insert a new column into the z_data
-                    if i > 0:
-                        z = np.insert(z, len(z), np.zeros((1, y_max)) * np.nan,
-                                      axis=0)
-                    try:
-                        if len(dmap_record[parameter]) == dmap_record['nrang']:
-                            good_gates = range(len(dmap_record[parameter]))
-                        else:
-                            good_gates = dmap_record['slist']
-
-                        # get the range gates that have "good" data in it
-                        for j in range(len(good_gates)):
-                            # if it is groundscatter store a very
-                            # low number in that cell
-                            if groundscatter and\
-                               dmap_record['gflg'][j] == 1:
-                                # chosen value from davitpy to make the
-                                # groundscatter a different color
-                                # from the color map
-                                z[i][good_gates[j]] = -1000000
-                            elif dmap_record['gflg'][j] == 0 and\
-                                remove_iono_scatter:
-                                z[i][good_gates[j]] = -1000000
-                            # otherwise store parameter value
-                            # TODO: refactor and clean up this code
-                            elif cls.__filter_data_check(dmap_record,
-                                                         plot_filter, j):
-                                z[i][good_gates[j]] = \
-                                        dmap_record[parameter][j]
-                                # calculate min and max value
-                                if not set_zmin and\
-                                   z[i][good_gates[j]] < zmin:
-                                    zmin = z[i][good_gates[j]]
-                                if not set_zmax and \
-                                   z[i][good_gates[j]] > zmax:
-                                    zmax = z[i][good_gates[j]]
-                    # a KeyError may be thrown because slist is not created
-                    # due to bad quality data.
-                    except KeyError:
-                        continue
+        # x: time date data
+        # z: parameter data mapped into the color mesh
+        x, z, data_zmin, data_zmax = \
+            cls.__grid_data(parameter, beam_num, channel, start_time,
+                            end_time, plot_filter, groundscatter,
+                            remove_iono_scatter)
+        if not set_zmin and data_zmin < zmin:
+            zmin = data_zmin
+        if not set_zmax and data_zmax > zmax:
+            zmax = data_zmax
+
         x.append(end_time)
         # Check if there is any data to plot
         if np.all(np.isnan(z)):
@@ -2003,22 +1825,14 @@ class RTP:
         if nightshade:
             height = 300  # km
 
-            # [num_ranges, 2] holding the [lat, lon] for each range gate
+            # [lat, lon] of each range gate
             radar_id = RadarID(cls.dmap_data[0]["stid"])
-            geographic_points = np.array([
-                gate2geographic_location(radar_id, beam_num, height, center=True, range_gate=rg)
-                for rg in range_gates
-            ])
-            # switch to [lon, lat] for compatibility with cartopy geodesic calculations
-            geographic_points = np.flip(geographic_points, axis=1)
-
-            # [num_times, num_ranges] indicating if the cell is in darkness at that time
-            is_night = np.zeros((len(range_gates), time_axis.shape[1]), dtype=bool)
-            geodesic = cartopy.geodesic.Geodesic()
-            for i, t in enumerate(x):
-                anti_point, arc_ang, _ = calc_terminator(t, height)
-                distance_to_antisolar_point = geodesic.inverse(anti_point, geographic_points)[:, 0] / 1000.0  # convert to km
-                is_night[:, i] = distance_to_antisolar_point < arc_ang
+            gate_lats, gate_lons = \
+                gate2geographic_location(radar_id, beam_num, height,
+                                         center=True, range_gate=range_gates)
+
+            # [num_ranges, num_times] indicating if the cell is in darkness at that time
+            is_night = night_mask(x, gate_lats, gate_lons, height).T
             ax.pcolormesh(time_axis, y_axis, is_night[:, :-1],
                           cmap=colors.ListedColormap(['white', 'gray']),
                           shading='auto',
@@ -14,6 +14,12 @@
 # 2022-03-10 MTS added 4 new methods to generate coordinates for the various
 #                enums
 # 2023-08-26 CJM corrected calculations to use bmoff and removed abs()
+# 2026-10-16 added FOVCache to cache the field-of-view coordinate tables
+# 2026-10-16 geo_coordinates calculates all the gates and beams in one
+#            array call of gate2geographic_location
+# 2026-10-16 aacgm_coordinates converts all the corners in one aacgmv2 call
+# 2026-10-16 added gate_azimuth and FOVCache.gate_azimuths for the azimuths
+#            of arrays of gates
 #
 
 """
@@ -22,13 +28,19 @@ plotting
 """
 import datetime as dt
 import enum
+import hashlib
 import numpy as np
+import os
+import warnings
+
+from collections import OrderedDict
 
 import aacgmv2
 
 import pydarn
-from pydarn import (geocentric_coordinates, SuperDARNRadars, RangeEstimation,
-                    radar_exceptions, Re, RadarID)
+from pydarn import (geocentric_coordinates, calculate_azimuth,
+                    SuperDARNRadars, RangeEstimation, radar_exceptions, Re,
+                    RadarID)
 
 
 def geo_coordinates(stid: RadarID, beams: int = None,
@@ -50,16 +62,14 @@ def geo_coordinates(stid: RadarID, beams: int = None,
     # Plus 1 is due to the fact fov files index at 1 so in the plotting
     # of the boundary there is a subtraction of 1 to offset this as python
     # converts to index of 0 which my code already accounts for
-    beam_corners_lats = np.zeros((gates[1]-gates[0]+1, beams+1))
-    beam_corners_lons = np.zeros((gates[1]-gates[0]+1, beams+1))
-
-    for beam in range(0, beams+1):
-        for gate in range(gates[0], gates[1]+1):
-            lat, lon = gate2geographic_location(stid=stid, beam=beam,
-                                                range_gate=gate, height=300,
-                                                **kwargs)
-            beam_corners_lats[gate-gates[0], beam] = lat
-            beam_corners_lons[gate-gates[0], beam] = lon
+    # The (gates x beams) corners are calculated together by broadcasting
+    # a column of gates against a row of beams
+    range_gates = np.arange(gates[0], gates[1]+1)[:, np.newaxis]
+    beam_corners_lats, beam_corners_lons = \
+        gate2geographic_location(stid=stid,
+                                 beam=np.arange(0, beams+1)[np.newaxis, :],
+                                 range_gate=range_gates, height=300,
+                                 **kwargs)
     if include_invalid:
         return beam_corners_lats, beam_corners_lons
     else:
@@ -76,23 +86,18 @@ def aacgm_coordinates(stid: pydarn.RadarID, beams: int = None, gates: tuple = No
     if beams is None:
         beams = SuperDARNRadars.radars[stid].hardware_info.beams
 
-    # Plus 1 is due to the fact fov files index at 1 so in the plotting
-    # of the boundary there is a subtraction of 1 to offset this as python
-    # converts to index of 0 which my code already accounts for
-    beam_corners_lats = np.zeros((gates[1]-gates[0]+1, beams+1))
-    beam_corners_lons = np.zeros((gates[1]-gates[0]+1, beams+1))
-
-    for beam in range(0, beams+1):
-        for gate in range(gates[0], gates[1]+1):
-            lat, lon = gate2geographic_location(stid=stid, beam=beam,
-                                                range_gate=gate, height=300,
-                                                **kwargs)
-            geomag = np.array(aacgmv2.get_aacgm_coord(glat=lat,
-                                                      glon=lon,
-                                                      height=250,
-                                                      dtime=date))
-            beam_corners_lats[gate-gates[0], beam] = geomag[0]
-            beam_corners_lons[gate-gates[0], beam] = geomag[1]
+    if callable(date):
+        date = date()
+    geo_lats, geo_lons = geo_coordinates(stid=stid, beams=beams, gates=gates,
+                                         include_invalid=True, **kwargs)
+    # all the corners are converted in one call, this is the same
+    # conversion get_aacgm_coord does without calculating the MLT of
+    # each corner
+    mlats, mlons, _ = \
+        aacgmv2.convert_latlon_arr(geo_lats.ravel(), geo_lons.ravel(),
+                                   250, date, method_code='G2A|ALLOWTRACE')
+    beam_corners_lats = np.reshape(mlats, geo_lats.shape)
+    beam_corners_lons = np.reshape(mlons, geo_lats.shape)
     if include_invalid:
         return beam_corners_lats, beam_corners_lons
     else:
@@ -115,6 +120,72 @@ def convert2MLT(lons: float, date: object, **kwargs):
     return beam_corners_mlts
 
 
+def radar_coordinates(stid: RadarID, coords, date: dt.datetime):
+    """
+    Returns the position of a radar in a coordinate system
+
+    Parameters
+    ----------
+        stid: RadarID
+            station id of the radar
+        coords: Coords
+            coordinate system of the position
+        date: datetime
+            date of the position, used by the AACGM coordinate systems
+
+    Returns
+    -------
+        radlat: float
+            latitude of the radar [deg]
+        radlon: float
+            longitude [deg] (or MLT shifted longitude for Coords.AACGM_MLT)
+            of the radar
+    """
+    # Get position of radar in geographic from hdw files
+    radlat = SuperDARNRadars.radars[stid].hardware_info.geographic.lat
+    radlon = SuperDARNRadars.radars[stid].hardware_info.geographic.lon
+    # Convert radar position to correct coordinate system
+    if coords == Coords.AACGM_MLT or coords == Coords.AACGM:
+        geomag_radar = aacgmv2.get_aacgm_coord(radlat, radlon, 250, date)
+        radlat = geomag_radar[0]
+        radlon = geomag_radar[1]
+        if coords == Coords.AACGM_MLT:
+            mltshift = geomag_radar[1] -\
+                    (aacgmv2.convert_mlt(geomag_radar[1], date) * 15)
+            radlon = geomag_radar[1] - mltshift[0]
+    return radlat, radlon
+
+
+def gate_azimuth(lats: np.ndarray, lons: np.ndarray, stid: RadarID, coords,
+                 date: dt.datetime):
+    """
+    Calculates the azimuth of the radar from each of the given gate
+    positions in one call
+
+    Parameters
+    ----------
+        lats: float or np.ndarray
+            latitudes of the gates [deg]
+        lons: float or np.ndarray
+            longitudes of the gates [deg] in the coordinate system
+        stid: RadarID
+            station id of the radar
+        coords: Coords
+            coordinate system of the gate positions
+        date: datetime
+            date of the data
+
+    Returns
+    -------
+        azm: float or np.ndarray
+            azimuth direction of the radar from each gate [deg]
+    """
+    radlat, radlon = radar_coordinates(stid, coords, date)
+    return calculate_azimuth(np.asarray(lats, dtype=float),
+                             np.asarray(lons, dtype=float), 300,
+                             radlat, radlon, 300)
+
+
 def gate2geographic_location(stid: pydarn.RadarID, beam: int, height: float = None,
                              elv_angle: float = 0.0, center: bool = False,
                              range_estimation: RangeEstimation =
@@ -123,17 +194,24 @@ def gate2geographic_location(stid: pydarn.RadarID, beam: int, height: float = No
     determines the geographic cell position for a given range gate and beam
     Notes: From RPosGeo line 335
 
+    beam, range_gate, elv_angle and height can be numpy arrays, they are
+    broadcast against each other, e.g. a column of range gates and a row
+    of beams gives the (range gate x beam) positions of a field of view.
+
     parameters
     ----------
         stid: pydarn.RadarID
             station id of the radar to use
-        beam: int
+        beam: int or np.ndarray
             beam number (indexing at 0)
+        range_gate: int or np.ndarray
+            range gate number (indexing at 0), passed to range_estimation
+            with the other keyword arguments
         height: float
             transmutation height [km]
             default: none
             if none then it uses elevation angle
-        elv_angle: float
+        elv_angle: float or np.ndarray
             elevation angle in [deg]
             default: 0
         center: bool
@@ -144,9 +222,9 @@ def gate2geographic_location(stid: pydarn.RadarID, beam: int, height: float = No
 
     returns
     -------
-        lat: float
+        lat: float or np.ndarray
             latitude of the range gate in geographic coordinates [deg]
-        lon: float
+        lon: float or np.ndarray
             longitude of the range gate in geographic coordinates [deg]
     """
     # centre of the field of view
@@ -177,7 +255,7 @@ def gate2geographic_location(stid: pydarn.RadarID, beam: int, height: float = No
         beam_edge = -beam_sep * 0.5
 
     # psi [rad] in the angle from the boresight
-    psi = beam_sep * (beam - offset) + beam_edge + bmoff
+    psi = beam_sep * (np.asarray(beam) - offset) + beam_edge + bmoff
     # Calculate the slant range [km]
     if range_estimation == RangeEstimation.RANGE_GATE:
         raise radar_exceptions.RangeEstimationError("Range gates cannot be "
@@ -227,4 +305,250 @@ class Coords(enum.Enum):
 
     # Need this to make the functions callable
     def __call__(self, *args, **kwargs):
-        return self.value[0](*args, **kwargs)
+        if args:
+            return self.value[0](*args, **kwargs)
+        return FOVCache.coordinates(self, **kwargs)
+
+
+class FOVCache():
+    """
+    Least recently used cache of the field-of-view coordinate tables
+    (beam corner latitudes and longitudes) returned by Coords.
+
+    The tables are keyed by the coordinate system, radar, hardware file
+    epoch, beams, gates and the keyword arguments used to calculate them
+    (rsep, frang, range_estimation, height, ...). AACGM tables are also
+    keyed by the date rounded down to date_resolution and are calculated
+    at that date, AACGM_MLT tables shift the cached AACGM table to MLT at
+    the exact date. The azimuths of the radar from the gate centres
+    (see gate_azimuths) are cached alongside the tables.
+
+    Attributes
+    ----------
+        max_size: int
+            number of tables kept in memory
+            default: 32
+        cache_dir: str
+            directory to also store the tables in as .npz files so they
+            persist between sessions
+            default: None, tables are only kept in memory
+        date_resolution: datetime.timedelta
+            resolution of the dates AACGM tables are cached for, with
+            1 day the corners are off by up to ~2e-4 deg in latitude and
+            ~0.01 deg in longitude (under 30 m) late in the day and the
+            gate azimuths by up to ~0.03 deg
+            default: 1 day
+    """
+    max_size = 32
+    cache_dir = None
+    date_resolution = dt.timedelta(days=1)
+    _tables = OrderedDict()
+
+    @classmethod
+    def coordinates(cls, coords: Coords, **kwargs):
+        """
+        Returns the beam corner latitudes and longitudes of coords for the
+        given keyword arguments, calculating them on a cache miss
+
+        Parameters
+        ----------
+            coords: Coords
+                coordinate system of the table
+            kwargs:
+                keyword arguments of the coords function,
+                see geo_coordinates and aacgm_coordinates
+
+        Returns
+        -------
+            beam_corners_lats: np.ndarray
+                (gates x beams) array of the beam corner latitudes [deg]
+            beam_corners_lons: np.ndarray
+                (gates x beams) array of the beam corner longitudes [deg]
+                or MLT for Coords.AACGM_MLT
+        """
+        if callable(kwargs.get('date')):
+            kwargs['date'] = kwargs['date']()
+        if coords == Coords.AACGM_MLT:
+            beam_corners_lats, beam_corners_lons = \
+                cls.coordinates(Coords.AACGM, **kwargs)
+            return beam_corners_lats, convert2MLT(beam_corners_lons,
+                                                  **kwargs)
+
+        kwargs = cls.__table_kwargs(coords, kwargs)
+        tables = cls.__cached(coords, kwargs,
+                              lambda: coords.value[0](**kwargs))
+        # copies so the cached tables can not be modified by the caller
+        return tables[0].copy(), tables[1].copy()
+
+    @classmethod
+    def gate_azimuths(cls, coords: Coords, **kwargs):
+        """
+        Returns the azimuth of the radar from the centre of each gate of
+        the field-of-view table of coords (see coordinates), calculating
+        them on a cache miss
+
+        The azimuths only depend on the geometry of the field-of-view, so
+        they are cached with the same keys as the tables. For AACGM the
+        radar position is taken at the same rounded date as the table, see
+        date_resolution for the error this makes. Coords.AACGM_MLT
+        uses the azimuths of the Coords.AACGM table as shifting to MLT
+        rotates the gates and the radar by the same longitude.
+
+        Parameters
+        ----------
+            coords: Coords
+                coordinate system of the table
+            kwargs:
+                keyword arguments of the coords function,
+                see geo_coordinates and aacgm_coordinates
+
+        Returns
+        -------
+            gate_azms: np.ndarray
+                (gates - 1 x beams - 1) array of the azimuth [deg] of the
+                radar from the centre of each gate
+        """
+        if callable(kwargs.get('date')):
+            kwargs['date'] = kwargs['date']()
+        if coords == Coords.AACGM_MLT:
+            coords = Coords.AACGM
+        kwargs = cls.__table_kwargs(coords, kwargs)
+
+        def compute():
+            lats, lons = cls.__cached(coords, kwargs,
+                                      lambda: coords.value[0](**kwargs))
+            # Get center of each gate instead of edges
+            center_lats = (lats[:-1, :-1] + lats[1:, :-1] +
+                           lats[:-1, 1:] + lats[1:, 1:]) / 4
+            center_lons = (lons[:-1, :-1] + lons[1:, :-1] +
+                           lons[:-1, 1:] + lons[1:, 1:]) / 4
+            return (gate_azimuth(center_lats, center_lons, kwargs['stid'],
+                                 coords, kwargs.get('date')), )
+
+        gate_azms = cls.__cached(coords, kwargs, compute,
+                                 suffix=('gate_azimuths',))
+        return gate_azms[0].copy()
+
+    @classmethod
+    def __table_kwargs(cls, coords: Coords, kwargs: dict) -> dict:
+        """
+        Fills in the default gates and beams of the radar and, for AACGM
+        tables, rounds the date down to date_resolution
+        """
+        stid = kwargs['stid']
+        if kwargs.get('gates') is None:
+            kwargs['gates'] = [0, SuperDARNRadars.radars[stid].range_gate_45]
+        if kwargs.get('beams') is None:
+            kwargs['beams'] = SuperDARNRadars.radars[stid].hardware_info.beams
+        date = kwargs.pop('date', None)
+        if coords == Coords.AACGM:
+            if date is None:
+                date = dt.datetime.now()
+            if cls.date_resolution:
+                # round down to the start of the date_resolution bucket
+                date = date - (date - dt.datetime(date.year, 1, 1)) %\
+                    cls.date_resolution
+            kwargs['date'] = date
+        return kwargs
+
+    @classmethod
+    def __cached(cls, coords: Coords, kwargs: dict, compute,
+                 suffix: tuple = ()) -> tuple:
+        """
+        Returns the cached arrays for the keyword arguments, calling
+        compute on a cache miss. Arrays other than the field-of-view
+        tables are marked by a key suffix and only kept in memory.
+        """
+        try:
+            key = cls.__key(coords, kwargs)
+        except TypeError:
+            # keyword arguments that can not be keyed, e.g. objects,
+            # are not cached
+            return compute()
+        key = key + suffix
+
+        if key in cls._tables:
+            cls._tables.move_to_end(key)
+            return cls._tables[key]
+        tables = None if suffix else cls.__load(key)
+        if tables is None:
+            tables = compute()
+            if not suffix:
+                cls.__save(key, tables)
+        cls._tables[key] = tables
+        while len(cls._tables) > cls.max_size:
+            cls._tables.popitem(last=False)
+        return tables
+
+    @classmethod
+    def clear(cls):
+        """
+        Empties the in memory cache, .npz files in cache_dir are kept
+        """
+        cls._tables.clear()
+
+    @classmethod
+    def __key(cls, coords: Coords, kwargs: dict) -> tuple:
+        """
+        Returns the hashable cache key of a table, raises a TypeError if a
+        keyword argument can not be keyed
+        """
+        epoch = SuperDARNRadars.radars[kwargs['stid']].hardware_info.date
+        return (coords.name, _key_value(epoch)) +\
+            tuple(sorted((name, _key_value(value))
+                         for name, value in kwargs.items()))
+
+    @classmethod
+    def __filename(cls, key: tuple) -> str:
+        """
+        Returns the .npz file name of a table in cache_dir
+        """
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(cls.cache_dir, 'fov_{}.npz'.format(digest))
+
+    @classmethod
+    def __load(cls, key: tuple):
+        """
+        Loads a table from cache_dir, returns None if it is not there
+        """
+        if cls.cache_dir is None:
+            return None
+        filename = cls.__filename(key)
+        if not os.path.exists(filename):
+            return None
+        try:
+            with np.load(filename) as tables:
+                return tables['lats'], tables['lons']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def __save(cls, key: tuple, tables: tuple):
+        """
+        Saves a table to cache_dir if it is set
+        """
+        if cls.cache_dir is None:
+            return
+        try:
+            os.makedirs(cls.cache_dir, exist_ok=True)
+            np.savez(cls.__filename(key), lats=tables[0], lons=tables[1])
+        except OSError as err:
+            warnings.warn("Could not save the field-of-view table to {}:"
+                          " {}".format(cls.cache_dir, err))
+
+
+def _key_value(value):
+    """
+    Converts a keyword argument value to a hashable value with a repr that
+    is the same between sessions, raises a TypeError if it can not
+    """
+    if isinstance(value, enum.Enum):
+        return '{}.{}'.format(type(value).__name__, value.name)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return tuple(_key_value(item) for item in value)
+    if value is None or isinstance(value, (bool, int, float, str,
+                                           dt.datetime)):
+        return value
+    raise TypeError("{} can not be used as a cache key".format(type(value)))
@@ -1,8 +1,7 @@
 import copy
-import datetime as dt
 import numpy as np
 import warnings
-from pydarn import SuperDARNRadars, RadarID
+from pydarn import SuperDARNRadars, RadarID, FitacfFrame, record_timestamps
 from scipy.signal import savgol_filter
 from typing import List
 
@@ -167,14 +166,19 @@ class Detrend:
 
         Parameters
         -----------
-        fitacf_data: List[dict]
+        fitacf_data: List[dict] or FitacfFrame
             List of dictionaries where each dictionary contains a fitacf record (from pydarn.read_fitacf())
         parameter: str
             The parameter to be detrended
             Default: 'both' (Velocity and SNR)
             Options: 'both', 'v', 'p_l'
         window_length: int
-            Length of the detrending low-pass filter in seconds
+            Length of the detrending low-pass filter in seconds.
+            For 'mean' the running mean of each record is taken over the
+            records of the beam within window_length / 2 seconds either
+            side of it, so gaps and changes of the sampling rate are
+            accounted for. For 'savgol' the window is converted to a number
+            of records from the sampling interval of the beam.
         detrend_type: str
             Type of detrending to be used
             Default: 'mean' - subtract a running mean of window_length
@@ -189,9 +193,20 @@ class Detrend:
         fitacf_data_detrended: List[dict]
             Copy of input dmap data with detrended data substituted
         """
-
-        # Make a copy of the fitacf for the detrended data to be substituted into
-        fitacf_data_detrended = copy.deepcopy(fitacf_data)
+        if isinstance(fitacf_data, FitacfFrame):
+            fitacf_data = fitacf_data.to_records()
+
+        # Make a copy of the fitacf for the detrended data to be substituted into,
+        # records only hold scalars and arrays so only the arrays are copied
+        fitacf_data_detrended = []
+        for rec in fitacf_data:
+            rec_copy = dict(rec)
+            for key, value in rec_copy.items():
+                if isinstance(value, np.ndarray):
+                    rec_copy[key] = value.copy()
+                elif not isinstance(value, (int, float, str)):
+                    rec_copy[key] = copy.deepcopy(value)
+            fitacf_data_detrended.append(rec_copy)
 
         # Max beams and range gates for this data
         no_beams = SuperDARNRadars.radars[RadarID(fitacf_data[0]['stid'])].hardware_info.beams
@@ -199,14 +214,11 @@ class Detrend:
 
         # Grab slist and time lists for all records. "None" indicates no data for that record.
         slists = [rec.get('slist') for rec in fitacf_data]
-        rec_times =  [dt.datetime(rec.get('time.yr'),
-                                  rec.get('time.mo'),
-                                  rec.get('time.dy'),
-                                  rec.get('time.hr'),
-                                  rec.get('time.mt'),
-                                  rec.get('time.sc'),
-                                  rec.get('time.us'))
-                      for rec in fitacf_data]
+        timestamps = record_timestamps(fitacf_data)
+        rec_times = timestamps.tolist()
+        # Seconds since the first record, for the time windows of the running mean
+        rec_seconds = (timestamps - timestamps[0]) / np.timedelta64(1, 's')
+        bmnums = np.array([rec.get('bmnum', -1) for rec in fitacf_data])
 
         # Handle parameter choice(s)
         params = []
@@ -215,69 +227,200 @@ class Detrend:
         if parameter == 'both' or parameter == 'p_l':
             params.append('p_l')
 
-        # Grab the data to be detrended
-        values = []
-        for param in params:
-            values.append([rec.get(param) for rec in fitacf_data])
-
         # Iterate over beams
         for bmnum in range(0, no_beams):
 
-            # Get all the slists and times for each record on this beam
-            this_beam_indexes = [i for i, d in enumerate(fitacf_data) if d.get("bmnum") == bmnum]
-            this_beam_slists = [slists[i]for i in this_beam_indexes]
-            this_beam_times = [rec_times[i]for i in this_beam_indexes]
-
-            # Calculate the interval between samples in seconds
-            time_delta = (this_beam_times[1] - this_beam_times[0]).total_seconds()
-
-            # Convert window length from seconds to number of records (k)
-            # We use an odd number for k to make centering cleaner
-            k = int(window_length / time_delta)
-            if k % 2 == 0:
-                k += 1
-            half_k = k // 2
+            # Get the records and times for this beam
+            this_beam_indexes = np.flatnonzero(bmnums == bmnum)
+            this_beam_times = [rec_times[i] for i in this_beam_indexes]
             n_times = len(this_beam_times)
+            if n_times == 0:
+                continue
 
-            # Get the velocities and/or the powers for this beam
-            this_beam_values = []
-            for value in values:
-                this_beam_values.append([s for rec, s in zip(fitacf_data, value) if rec.get('bmnum') == bmnum])
-
-            # Iterate over range gates
-            all_range_detrends = []
-            for rangnum in range(0, no_rang):
-                indexes = [
-                    (np.where(sublist == rangnum)[0][0] if rangnum in sublist else None)
-                    if sublist is not None else None
-                    for sublist in this_beam_slists
-                ]
-
-                detrended_timeseries = []
-                for this_beam_value in this_beam_values:
-                    timeseries = [
-                        sublist[idx] if (sublist is not None and idx is not None) else None
-                        for sublist, idx in zip(this_beam_value, indexes)
-                    ]
-
-                    # Running mean detrend
-                    if detrend_type == 'mean':
-                        detrended = Detrend.detrend_running_mean(timeseries, half_k, n_times)
-                    elif detrend_type == 'savgol':
-                        detrended = Detrend.detrend_savgol(timeseries, half_k, **kwargs)
+            if detrend_type == 'savgol':
+                # Calculate the interval between samples in seconds
+                time_delta = (this_beam_times[1] - this_beam_times[0]).total_seconds()
+
+                # Convert window length from seconds to number of records (k)
+                # We use an odd number for k to make centering cleaner
+                k = int(window_length / time_delta)
+                if k % 2 == 0:
+                    k += 1
+                half_k = k // 2
+
+            for param in params:
+                # Scatter the beam's data into a (time x range gate) array,
+                # only the first value of a range gate in slist is used
+                rows, gates, data = [], [], []
+                for row, i in enumerate(this_beam_indexes):
+                    if slists[i] is not None and param in fitacf_data[i]:
+                        rows.append(np.full(len(slists[i]), row))
+                        gates.append(np.asarray(slists[i], dtype=int))
+                        data.append(fitacf_data[i][param])
+                timeseries = np.full((n_times, no_rang), np.nan)
+                found = np.zeros(timeseries.shape, dtype=bool)
+                if rows:
+                    rows = np.concatenate(rows)
+                    gates = np.concatenate(gates)
+                    data = np.concatenate(data)
+                    valid = (gates >= 0) & (gates < no_rang)
+                    cells, first = np.unique(rows[valid] * no_rang + gates[valid],
+                                             return_index=True)
+                    timeseries.flat[cells] = data[valid][first]
+                    found.flat[cells] = True
+
+                # Detrend all the range gates at once along the time axis
+                if detrend_type == 'mean':
+                    detrended = cls.__running_mean_matrix(
+                        timeseries, found, rec_seconds[this_beam_indexes],
+                        window_length / 2)
+                elif detrend_type == 'savgol':
+                    # NaN values are treated as gaps by the filter
+                    found &= ~np.isnan(timeseries)
+                    detrended = cls.__savgol_matrix(timeseries, found, half_k,
+                                                    **kwargs)
+                else:
+                    raise NameError('No valid detrending type specified')
+
+                # Insert values into copied dmap List[dict]
+                for row, i in enumerate(this_beam_indexes):
+                    if not found[row].any():
+                        fitacf_data_detrended[i][param] = np.array([])
+                    elif detrend_type == 'mean':
+                        fitacf_data_detrended[i][param] = \
+                            detrended[row, found[row]].astype(fitacf_data[i][param].dtype)
                     else:
-                        raise NameError('No valid detrending type specified')
+                        fitacf_data_detrended[i][param] = detrended[row, found[row]]
 
-                    # Collect detrended timeseries for all parameters
-                    detrended_timeseries.append(detrended)
+        return fitacf_data_detrended
 
-                # Collect detrended timeseries for all beams List[List]
-                all_range_detrends.append(detrended_timeseries)
+    @classmethod
+    def __running_mean_matrix(cls, timeseries: np.ndarray, found: np.ndarray,
+                              times: np.ndarray, half_window: float):
+        """
+        Detrend each column of a (time x range gate) array with a running
+        mean over the values within half_window of each time. The windows
+        are found on the actual times of the rows, so irregular sampling
+        and data gaps are handled without resampling the data.
 
-            # Insert values into copied dmap List[dict]
-            for beam_order, fitacf_index in enumerate(this_beam_indexes):
-                for param_no, param in enumerate(params):
-                    this_beam_detrended = [sublist[param_no][beam_order] for sublist in all_range_detrends]
-                    fitacf_data_detrended[fitacf_index][param] = np.array([x for x in this_beam_detrended if x is not None])
+        Parameters
+        -----------
+        timeseries: np.ndarray
+            (time x range gate) array of the data
+        found: np.ndarray
+            (time x range gate) boolean array, True where there is data
+        times: np.ndarray
+            time of each row in seconds
+        half_window: float
+            Half the length of the running mean window in seconds
 
-        return fitacf_data_detrended
+        Returns
+        -------
+        detrended: np.ndarray
+            Detrended (time x range gate) array, NaN where there is no data
+        """
+        n_times = timeseries.shape[0]
+        # The cumulative sums are taken in time order
+        order = np.argsort(times, kind='stable')
+        sorted_times = times[order]
+        timeseries = timeseries[order]
+        found = found[order]
+
+        # Sums and counts of the values in each window from cumulative sums,
+        # NaN values are counted apart so they only spoil their own windows
+        nans = found & np.isnan(timeseries)
+        sums = np.zeros((n_times + 1, timeseries.shape[1]))
+        counts = np.zeros((n_times + 1, timeseries.shape[1]))
+        nan_counts = np.zeros((n_times + 1, timeseries.shape[1]))
+        np.cumsum(np.where(found & ~nans, timeseries, 0), axis=0, out=sums[1:])
+        np.cumsum(found, axis=0, out=counts[1:])
+        np.cumsum(nans, axis=0, out=nan_counts[1:])
+
+        # Window boundaries of each row, the windows are truncated at the
+        # edges of the data - beware of edge effects
+        start = np.searchsorted(sorted_times, sorted_times - half_window,
+                                side='left')
+        end = np.searchsorted(sorted_times, sorted_times + half_window,
+                              side='right')
+        window_counts = counts[end] - counts[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            running_mean = (sums[end] - sums[start]) / window_counts
+        running_mean[nan_counts[end] > nan_counts[start]] = np.nan
+        detrended = np.empty(timeseries.shape)
+        detrended[order] = timeseries - running_mean
+        return detrended
+
+    @classmethod
+    def __savgol_matrix(cls, timeseries: np.ndarray, found: np.ndarray,
+                        half_k: int, **kwargs):
+        """
+        Detrend each column of a (time x range gate) array with a
+        Savitsky-Golay filter, as detrend_savgol does for a single timeseries
+
+        Parameters
+        -----------
+        timeseries: np.ndarray
+            (time x range gate) array of the data
+        found: np.ndarray
+            (time x range gate) boolean array, True where there is data
+        half_k: int
+            Half the window size for the running mean window
+        **kwargs:
+            Optional inputs for detrending using scipy's `savgol_filter()`
+
+        Returns
+        -------
+        detrended: np.ndarray
+            Detrended (time x range gate) array, NaN where there is no data
+        """
+        n_times = timeseries.shape[0]
+        has_data = found.any(axis=0)
+        if not has_data.any():
+            return timeseries
+
+        # Linearly interpolate over the gaps so the filter can work,
+        # gaps at the edges take the nearest value
+        # Will result in anomalous velocities/SNR's if data is sparse
+        indexes = np.broadcast_to(np.arange(n_times)[:, np.newaxis],
+                                  timeseries.shape)
+        previous = np.maximum.accumulate(np.where(found, indexes, -1), axis=0)
+        following = np.minimum.accumulate(np.where(found, indexes, n_times)[::-1],
+                                          axis=0)[::-1]
+        first = np.argmax(found, axis=0)
+        last = n_times - 1 - np.argmax(found[::-1], axis=0)
+        previous = np.where(previous < 0, first, previous)
+        following = np.where(following >= n_times, last, following)
+        columns = np.arange(timeseries.shape[1])
+        y_previous = timeseries[previous, columns]
+        y_following = timeseries[following, columns]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            slope = (y_following - y_previous) / (following - previous)
+            y_interp = np.where(following > previous,
+                                slope * (indexes - previous) + y_previous,
+                                y_previous)
+        y_interp = np.where(found, timeseries, y_interp)
+        # columns without data are filtered as zeros and masked afterwards
+        y_interp[:, ~has_data] = 0
+
+        # Generate filter series
+        window_len = (half_k * 2) + 1
+
+        if window_len > n_times:
+            warnings.warn("Length of data required to fit polynomial for " \
+                          "Savitsky-Golay filter exceeds available data. Reduce " \
+                          "window length or supply longer time-frame of data.",
+                          UserWarning)
+
+        kwargs.setdefault('polyorder', 2)
+
+        if window_len <= kwargs['polyorder']:
+            warnings.warn("Polynomial order for Savitsky-Golay filter exceeds " \
+                          "the length of the window of data required. Reduce " \
+                          "polynomial order or supply longer time-frame of data.",
+                          UserWarning)
+
+        background = savgol_filter(y_interp, window_length=window_len, axis=0,
+                                   **kwargs)
+
+        # Detrend and restore the original gaps
+        return np.where(found, y_interp - background, np.nan)
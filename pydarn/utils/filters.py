@@ -3,6 +3,11 @@
 #
 # Modifications:
 # 20230202 - CJM: Integrate code into pyDARN
+# 20261016 - vectorized the boxcar median filter over dense scan volumes
+# 20261016 - run_filter filters in a process pool when cpus > 1
+# 20261016 - added stream_filter to filter records scan by scan
+# 20261016 - records matched to filtered beams by time, beam and channel
+# 20261016 - Gate, Beam and Scan hold their parameters in __slots__
 #
 # Disclaimer:
 # pyDARN is under the LGPL v3 license found in the root directory LICENSE.md
@@ -18,20 +23,119 @@
 
 import copy
 import datetime as dt
+import itertools
 import numpy as np
 import warnings
 
-from pydarn import standard_warning_format
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from pydarn import standard_warning_format, FitacfFrame
 
 warnings.formatwarning = standard_warning_format
 
-class Gate(object):
+# sets a slot of the filter objects without going through their __setattr__
+_set_slot = object.__setattr__
+
+class _Field(object):
+    """Descriptor reading a parameter of a gate or beam from its list of
+    values, avoiding the slower __getattr__ look up"""
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return obj._values[obj._fields[self.name]]
+        except KeyError:
+            raise AttributeError(self.name) from None
+
+
+class _Parameters(object):
+    """Base class holding the parameters of a gate or beam as a list of
+    values and a dictionary of the position of each parameter in the list,
+    rather than each object having its own attribute dictionary. Objects
+    with the same parameters can share the dictionary of positions.
+
+    The parameters read most often are declared as _Field descriptors in
+    the class bodies, any other parameter (e.g. noise.sky) is read through
+    __getattr__.
+
+    Methods
+    -------
+    items
+    """
+    __slots__ = ("_fields", "_values")
+
+    def __init__(self):
+        """ Initialize the instance """
+        _set_slot(self, "_fields", {})
+        _set_slot(self, "_values", [])
+        return
+
+    def __getattr__(self, name):
+        # only called when name is not a slot or a declared parameter
+        if name in _Parameters.__slots__:
+            raise AttributeError(name)
+        try:
+            return self._values[self._fields[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        if name in _Parameters.__slots__:
+            _set_slot(self, name, value)
+            return
+        index = self._fields.get(name)
+        if index is None:
+            # new parameter, the (possibly shared) dictionary is copied first
+            self._fields = dict(self._fields)
+            self._fields[name] = len(self._values)
+            self._values.append(value)
+        else:
+            self._values[index] = value
+
+    def _set_values(self, fields, values):
+        """
+        Set all the parameters from the dictionary of their positions and
+        the list of their values
+        """
+        _set_slot(self, "_fields", fields)
+        _set_slot(self, "_values", values)
+        return
+
+    def items(self):
+        """List of the (name, value) of the parameters, in the order
+        they were set"""
+        return [(name, self._values[i]) for name, i in self._fields.items()]
+
+
+def _positions(names):
+    """
+    Dictionary of the position of each parameter name, a repeated name
+    takes its last position
+    """
+    return {name: i for i, name in enumerate(names)}
+
+
+class Gate(_Parameters):
     """Class object to hold each range cell value
 
     Methods
     -------
     NA
     """
+    __slots__ = ()
+    v = _Field("v")
+    w_l = _Field("w_l")
+    gflg = _Field("gflg")
+    p_l = _Field("p_l")
+    v_e = _Field("v_e")
+    elv = _Field("elv")
+
     def __init__(self, bm, i, params=["v", "w_l", "gflg", "p_l", "v_e", "elv"],
                  gflg_type=-1):
         """
@@ -48,31 +152,45 @@ class Gate(object):
         -------
         NA
         """
-        for p in params:
-            if len(getattr(bm, p)) > i:
-                setattr(self, p, getattr(bm, p)[i])
-            else:
-                setattr(self, p, np.nan)
+        names = list(params)
+        values = [getattr(bm, p)[i] if len(getattr(bm, p)) > i else np.nan
+                  for p in params]
         if gflg_type >= 0 and len(getattr(bm, "gsflg")[gflg_type]) > 0:
-            setattr(self, "gflg", getattr(bm, "gsflg")[gflg_type][i])
+            names.append("gflg")
+            values.append(getattr(bm, "gsflg")[gflg_type][i])
+        self._set_values(_positions(names), values)
         return
 
 
-class Beam(object):
+class Beam(_Parameters):
     """Class to hold one radar beam
 
     Methods
     -------
     set
     copy
+    items
     """
-    def __init__(self):
-        """ Initialize the instance """
-        return
+    __slots__ = ()
+    bmnum = _Field("bmnum")
+    channel = _Field("channel")
+    tfreq = _Field("tfreq")
+    scan = _Field("scan")
+    nrang = _Field("nrang")
+    cp = _Field("cp")
+    time = _Field("time")
+    slist = _Field("slist")
+    v = _Field("v")
+    w_l = _Field("w_l")
+    gflg = _Field("gflg")
+    p_l = _Field("p_l")
+    v_e = _Field("v_e")
+    elv = _Field("elv")
 
     def set(self, time, d,
             s_params=["bmnum", "noise.sky", "tfreq", "scan", "nrang"],
-            v_params=["v", "w_l", "gflg", "p_l", "slist", "v_e", "elv"], k=None):
+            v_params=["v", "w_l", "gflg", "p_l", "slist", "v_e", "elv"], k=None,
+            fields=None):
         """
         Parameters
         ----------
@@ -84,28 +202,29 @@ class Beam(object):
             Other scalar params
         v_params : list
             Other vector params
+        fields : dict
+            Position of each of s_params, v_params and "time" in the list
+            of values, shared by the beams set with the same parameters
+            default: None, built from s_params and v_params
         """
-        for p in s_params:
-            if p in d.keys():
-                if p == "scan" and d[p] != 0:
-                    setattr(self, p, 1)
-                else:
-                    setattr(self, p, d[p]) if k is None else setattr(self, p,
-                                                                     d[p][k])
-            else:
-                setattr(self, p, None)
-        for p in v_params:
-            if p in d.keys():
-                setattr(self, p, d[p])
-            else:
-                setattr(self, p, [])
-        self.time = time
+        if k is None:
+            values = [d.get(p) for p in s_params]
+        else:
+            values = [d[p][k] if p in d else None for p in s_params]
+        if "scan" in s_params and d.get("scan", 0) != 0:
+            values = [1 if p == "scan" else value
+                      for p, value in zip(s_params, values)]
+        values += [d.get(p, []) for p in v_params]
+        values.append(time)
+        if fields is None:
+            fields = _positions([*s_params, *v_params, "time"])
+        self._set_values(fields, values)
         return
 
     def copy(self, bm):
         """Copy all parameters"""
-        for p in bm.__dict__.keys():
-            setattr(self, p, getattr(bm, p))
+        _set_slot(self, "_fields", bm._fields)
+        _set_slot(self, "_values", list(bm._values))
         return
 
 
@@ -116,6 +235,8 @@ class Scan(object):
     -------
     update_time
     """
+    __slots__ = ("beams", "stime", "etime", "scan_time")
+
     def __init__(self):
         """ Initialize the instance """
         self.beams = []
@@ -172,6 +293,8 @@ class FetchData(object):
             "mpinc",
         ]
         self.v_params = ["v", "w_l", "gflg", "p_l", "slist", "v_e", "elv"]
+        # positions of the parameters, shared by all the beams
+        self.fields = _positions([*self.s_params, *self.v_params, "time"])
         self.scans, self.beams = [], []
         return
 
@@ -188,6 +311,23 @@ class FetchData(object):
         -------
         NA
         """
+        for scan, _ in self.iter_scans():
+            self.beams.extend(scan.beams)
+            if by == "scan":
+                self.scans.append(scan)
+        return
+
+    def iter_scans(self):
+        """
+        Lazily group the beam sounds into scans, a new scan is started by
+        each beam sound with its scan flag set
+
+        Returns
+        -------
+        generator of (scan, records) tuples: the Scan object and the list
+        of beam sounds making up the scan, in order
+        """
+        sc, records = None, []
         for d in self.beam_sounds:
             time = dt.datetime(
                 d["time.yr"],
@@ -199,21 +339,18 @@ class FetchData(object):
                 d["time.us"]
             )
             bm = Beam()
-            bm.set(time, d, self.s_params, self.v_params)
-            self.beams.append(bm)
-        if by == "scan":
-            sc = Scan()
-            sc.beams.append(self.beams[0])
-            for _ix, d in enumerate(self.beams[1:]):
-                if d.scan == 1:
-                    sc.update_time()
-                    self.scans.append(sc)
-                    del sc
-                    sc = Scan()
-                    sc.beams.append(d)
-                else:
-                    sc.beams.append(d)
-            self.scans.append(sc)
+            bm.set(time, d, self.s_params, self.v_params,
+                   fields=self.fields)
+            if sc is None:
+                sc = Scan()
+            elif bm.scan == 1:
+                sc.update_time()
+                yield sc, records
+                sc, records = Scan(), []
+            sc.beams.append(bm)
+            records.append(d)
+        if sc is not None:
+            yield sc, records
         return
 
 
@@ -224,6 +361,7 @@ class Boxcar(object):
     -------
     format_data_for_pydarn
     run_filter
+    stream_filter
     __discard_repeating_beams__
     __do_filter__
     """
@@ -259,72 +397,128 @@ class Boxcar(object):
         self.gflg_type = gflg_type
         return
 
-    def format_data_for_pydarn(self, original_data):
+    def format_data_for_pydarn(self, original_data, filtered_only=False):
         """
         Place filtered data into original data structure for pyDARN
         only changing the data fields that were filtered
 
+        Each record is matched to the filtered beam sound of the same time,
+        beam number and channel through a dictionary of the filtered beam
+        sounds, if several match the last one is used.
+
         Parameters
         ----------
         original_data: List[Dict]
             List of SuperDARN fitacf data
+        filtered_only: bool
+            If True, only the records matching a filtered beam sound are
+            kept and the fields that were not filtered are shared with the
+            original records instead of being deep copied
+            default: False
 
         Returns
         -------
         NA
         """
+        frecs = {}
+        for frec in self.filtered_data["beam_sounds"]:
+            frecs[(frec['time'], frec['bmnum'], frec['channel'])] = frec
+        if filtered_only:
+            self.copied_data = []
+            for record in original_data:
+                frec = frecs.get(self.__record_key__(record))
+                if frec is not None:
+                    # shallow copy, only the filtered fields are replaced
+                    copied_record = dict(record)
+                    self.__replace_filtered__(copied_record, frec)
+                    self.copied_data.append(copied_record)
+            return
         # Deep copy original fitacf data
         self.copied_data = copy.deepcopy(original_data)
-        # For each record in the fitacf data, find matching time in
-        # filtered data, replace with the new filtered data
+        # For each record in the fitacf data, find the matching filtered
+        # beam sound, replace with the new filtered data
         for r, record in enumerate(original_data):
-            # Track to see if match is found or not
-            match_found = False
-            record_time = dt.datetime(record["time.yr"], record["time.mo"],
-                                      record["time.dy"], record["time.hr"],
-                                      record["time.mt"], record["time.sc"],
-                                      record["time.us"])
-            for frec in self.filtered_data["beam_sounds"]:
-                if record_time == frec['time']:
-                    match_found = True
-                    if not bool(frec['slist']):
-                        # If new data is empty remove it from dictionary
-                        self.copied_data[r].pop('slist', None)
-                        self.copied_data[r].pop('v', None)
-                        self.copied_data[r].pop('w_l', None)
-                        self.copied_data[r].pop('p_l', None)
-                        self.copied_data[r].pop('elv', None)
-                        self.copied_data[r].pop('gflg', None)
-                    else:
-                        # Replace the data with new filtered data if there is
-                        # new data to replace it
-                        self.copied_data[r]['slist'] = np.array(frec['slist'])
-                        self.copied_data[r]['v'] = np.array(frec['v'])
-                        self.copied_data[r]['w_l'] = np.array(frec['w_l'])
-                        self.copied_data[r]['p_l'] = np.array(frec['p_l'])
-                        self.copied_data[r]['elv'] = np.array(frec['elv'])
-                        self.copied_data[r]['gflg'] = np.array(frec['gflg'])
-            # If no match is found for the record, then
-            # empty the fields, new data needs to be empty
-            if not match_found:
-                self.copied_data[r].pop('slist', None)
-                self.copied_data[r].pop('v', None)
-                self.copied_data[r].pop('w_l', None)
-                self.copied_data[r].pop('elv', None)
-                self.copied_data[r].pop('gflg', None)
+            self.__replace_filtered__(self.copied_data[r],
+                                      frecs.get(self.__record_key__(record)))
         return
 
-    def run_filter(self, beam_sounds, cpus=1):
+    @staticmethod
+    def __record_key__(record):
+        """
+        Key matching a record to its filtered beam sound
+
+        Parameters
+        ----------
+        record: Dict
+            SuperDARN fitacf record
+
+        Returns
+        -------
+        tuple of the record's time, beam number and channel
+        """
+        record_time = dt.datetime(record["time.yr"], record["time.mo"],
+                                  record["time.dy"], record["time.hr"],
+                                  record["time.mt"], record["time.sc"],
+                                  record["time.us"])
+        return (record_time, record.get("bmnum"), record.get("channel"))
+
+    @staticmethod
+    def __replace_filtered__(record, frec):
+        """
+        Replace the filtered fields of a (copied) record with the
+        filtered beam sound matching it
+
+        Parameters
+        ----------
+        record: Dict
+            copy of the SuperDARN fitacf record, modified in place
+        frec: OrderedDict
+            filtered beam sound matching the record's time,
+            None if no match was found
+        """
+        if frec is None:
+            # If no match is found for the record, then
+            # empty the fields, new data needs to be empty
+            record.pop('slist', None)
+            record.pop('v', None)
+            record.pop('w_l', None)
+            record.pop('elv', None)
+            record.pop('gflg', None)
+        elif not bool(frec['slist']):
+            # If new data is empty remove it from dictionary
+            record.pop('slist', None)
+            record.pop('v', None)
+            record.pop('w_l', None)
+            record.pop('p_l', None)
+            record.pop('elv', None)
+            record.pop('gflg', None)
+        else:
+            # Replace the data with new filtered data if there is
+            # new data to replace it
+            record['slist'] = np.array(frec['slist'])
+            record['v'] = np.array(frec['v'])
+            record['w_l'] = np.array(frec['w_l'])
+            record['p_l'] = np.array(frec['p_l'])
+            record['elv'] = np.array(frec['elv'])
+            record['gflg'] = np.array(frec['gflg'])
+
+    def run_filter(self, beam_sounds, cpus=1, filtered_only=False):
         """
         Set data and convert to scan objects
 
         Parameters
         ----------
-        beam_sounds: List[Dict]
+        beam_sounds: List[Dict] or FitacfFrame
             List of SuperDARN fitacf data
         cpus: int
-            Number of cpus available/rdesired
-            to run in parallel (UNUSED)
+            Number of cpus available/desired to run in parallel,
+            more than 1 filters the scans in a pool of cpus processes
+            default: 1
+        filtered_only: bool
+            If True, only return the records that were filtered, sharing
+            their unfiltered fields with beam_sounds instead of deep
+            copying them
+            default: False
 
         Returns
         -------
@@ -332,48 +526,135 @@ class Boxcar(object):
             List of dictionaries that contain
             the new filtered data
         """
-        warnings.warn('The boxcar filter may take 5-10 minutes to filter a ' +
-                      'two hour FITACF file. For more information on this ' +
-                      'filter see the documentation at ' +
-                      'https://pydarn.readthedocs.io/en/main/') 
         warnings.warn('The boxcar filter may not be applicable to all data, '+
                       'for example, the boxcar filter should not be applied '+
                       'to twofsound data.')
+        if isinstance(beam_sounds, FitacfFrame):
+            beam_sounds = beam_sounds.to_records()
         fd = FetchData(beam_sounds)
         fd.parse_data()
         self.scan_stacks = [fd.scans[i - 1: i + 2]
                             for i in range(1, len(fd.scans) - 1)]
         self.filtered_data = {"scans": [], "beams": [], "beam_sounds": []}
         if cpus > 1:
-            # TODO: Parallel processing options
-            # ray.init(num_cpus=cpus)
-            # futures = [
-            #    self.bx.doFilter.remote(scan_stack, comb=comb,
-            #                            gflg_type=gflg_type)
-            #    for scan_stack in scan_stacks
-            # ]
-            # self.filtered_data["scans"] = ray.get(futures)
-            pass
+            # consecutive scan stacks share scans, so they are sent to the
+            # processes in chunks of consecutive stacks
+            chunk_size = max(1, int(np.ceil(len(self.scan_stacks) /
+                                            (cpus * 4))))
+            chunks = [self.scan_stacks[i: i + chunk_size]
+                      for i in range(0, len(self.scan_stacks), chunk_size)]
+            with ProcessPoolExecutor(max_workers=cpus) as executor:
+                # map returns the results in the order of the chunks
+                filtered_chunks = executor.map(
+                    _filter_scan_stacks, chunks,
+                    itertools.repeat((self.thresh, self.w, self.gflg_type)))
+                scans = [scan for filtered_chunk in filtered_chunks
+                         for scan in filtered_chunk]
         else:
-            from collections import OrderedDict
             scans = [
                 self.__do_filter__(scan_stack)
                 for scan_stack in self.scan_stacks
             ]
-            beams = []
-            for s in scans:
-                beams.extend(s.beams)
-            self.filtered_data["scans"] = scans
-            self.filtered_data["beams"] = beams
-            self.filtered_data["beam_sounds"] = [
-                OrderedDict([(k, getattr(b, k)) for k in b.__dict__.keys()])
-                for b in beams
-            ]
-            # Format the data for pyDARN plotting and return the new
-            # filtered version of the fitacf data
-            self.format_data_for_pydarn(beam_sounds)
+        beams = []
+        for s in scans:
+            beams.extend(s.beams)
+        self.filtered_data["scans"] = scans
+        self.filtered_data["beams"] = beams
+        self.filtered_data["beam_sounds"] = [OrderedDict(b.items())
+                                             for b in beams]
+        # Format the data for pyDARN plotting and return the new
+        # filtered version of the fitacf data
+        self.format_data_for_pydarn(beam_sounds, filtered_only)
         return self.copied_data
 
+    def stream_filter(self, beam_sounds, filtered_only=False):
+        """
+        Filter the data scan by scan as the beam sounds arrive, only a
+        sliding window of scans is held in memory
+
+        The filtered records are the same as the ones returned by
+        run_filter and are yielded in the same order. A
+        record is yielded once the scan after its own has been filtered,
+        as a record can match a filtered beam of a neighbouring scan.
+
+        Parameters
+        ----------
+        beam_sounds: iterable of Dict or FitacfFrame
+            SuperDARN fitacf records, e.g. a generator reading the records
+            of several files
+        filtered_only: bool
+            If True, only yield the records that were filtered, sharing
+            their unfiltered fields with beam_sounds instead of deep
+            copying them
+            default: False
+
+        Returns
+        -------
+        generator of Dict: copies of the records with the new filtered data
+        """
+        warnings.warn('The boxcar filter may not be applicable to all data, '+
+                      'for example, the boxcar filter should not be applied '+
+                      'to twofsound data.')
+        fd = FetchData(dict(d) if isinstance(beam_sounds, FitacfFrame)
+                       else d for d in beam_sounds)
+        # scan index to its (scan, records), filtered scan index to the
+        # filtered beam sounds
+        window, filtered = {}, {}
+        num_scans = 0
+        for k, scan_records in enumerate(fd.iter_scans()):
+            window[k] = scan_records
+            num_scans = k + 1
+            if k < 2:
+                continue
+            scan = self.__do_filter__([window[k - 2][0], window[k - 1][0],
+                                       window[k][0]])
+            filtered[k - 1] = [OrderedDict(b.items()) for b in scan.beams]
+            # scan k - 2 has all its neighbouring scans filtered
+            yield from self.__stream_scan__(window.pop(k - 2)[1],
+                                            filtered, k - 2, filtered_only)
+            filtered.pop(k - 3, None)
+        for k in range(max(num_scans - 2, 0), num_scans):
+            yield from self.__stream_scan__(window.pop(k)[1], filtered, k,
+                                            filtered_only)
+
+    def __stream_scan__(self, records, filtered, k, filtered_only):
+        """
+        Yield copies of the records of scan k with the new filtered data,
+        matching each record with the filtered beam sounds of the scans
+        k - 1, k and k + 1
+
+        Parameters
+        ----------
+        records: List[Dict]
+            SuperDARN fitacf records of scan k
+        filtered: dict
+            filtered scan index to the filtered beam sounds of that scan
+        k: int
+            index of the scan
+        filtered_only: bool
+            only yield the records that were filtered, see stream_filter
+
+        Returns
+        -------
+        generator of Dict: copies of the records with the new filtered data
+        """
+        # later filtered beam sounds win, like format_data_for_pydarn
+        frecs = {}
+        for i in (k - 1, k, k + 1):
+            for frec in filtered.get(i, []):
+                frecs[(frec['time'], frec['bmnum'], frec['channel'])] = frec
+        for record in records:
+            frec = frecs.get(self.__record_key__(record))
+            if filtered_only:
+                if frec is None:
+                    continue
+                # shallow copy, only the filtered fields are replaced
+                copied_record = dict(record)
+            else:
+                copied_record = copy.deepcopy(record)
+            self.__replace_filtered__(copied_record, frec)
+            yield copied_record
+
     def __discard_repeating_beams__(self, scan, ch=True):
         """
         Discard all more than one repeating beams
@@ -411,6 +692,11 @@ class Boxcar(object):
         Median filter based on the weight given by matrix (3X3X3) weight,
         and threshold based on thresh
 
+        The three scans are packed into dense (scan x beam x gate) volumes
+        and the weighted occupancy and weighted medians of every range
+        gate of the middle scan are calculated together from the 3x3x3
+        windows around them.
+
         Parameters
         ----------
         scans: Object
@@ -424,89 +710,239 @@ class Boxcar(object):
             Object containing SuperDARN scans
         """
         scans = [self.__discard_repeating_beams__(s) for s in scans]
-        if len(scans) == 3:
-            w = self.w
-            oscan = Scan()
-
-            for b in scans[1].beams:
-                bmnum = b.bmnum
-                beam = Beam()
-                beam.copy(b)
-
-                for key in beam.__dict__.keys():
-                    if type(getattr(beam, key)) is np.ndarray:
-                        setattr(beam, key, [])
-
-                for r in range(0, b.nrang):
-                    box = [[[None for j in range(3)]
-                            for k in range(3)] for n in range(3)]
-
-                    # Iterate through time
-                    for j in range(0, 3):
-                        # Iterate through beam
-                        for k in range(-1, 2):
-                            # Iterate through gate
-                            for n in range(-1, 2):
-                                # Get the scan we are working on
-                                s = scans[j]
-                                if s is None:
-                                    continue
-                                # Get the beam we are working on
-                                if s is None:
-                                    continue
-                                # Get the beam we are working on
-                                tbm = None
-                                for bm in s.beams:
-                                    if bm.bmnum == bmnum + k:
-                                        tbm = bm
-                                if tbm is None:
-                                    continue
-                                # Check if target gate number is in the beam
-                                if r + n in tbm.slist:
-                                    ind = np.array(tbm.slist).tolist()\
-                                            .index(r + n)
-                                    box[j][k + 1][n + 1] = Gate(
-                                        tbm, ind, gflg_type=self.gflg_type
-                                    )
-                                else:
-                                    box[j][k + 1][n + 1] = 0
-                    pts = 0.0
-                    tot = 0.0
-                    v, w_l, p_l, elv, gfx = \
-                        list(), list(), list(), list(), list()
-
-                    # Iterate through time
-                    for j in range(0, 3):
-                        # Iterate through beam
-                        for k in range(0, 3):
-                            # Iterate through gate
-                            for n in range(0, 3):
-                                bx = box[j][k][n]
-                                if bx is None:
-                                    continue
-                                wt = w[j][k][n]
-                                tot += wt
-                                if bx != 0:
-                                    pts += wt
-                                    for m in range(0, wt):
-                                        v.append(bx.v)
-                                        w_l.append(bx.w_l)
-                                        p_l.append(bx.p_l)
-                                        elv.append(bx.elv)
-                                        gfx = bx.gflg
-                    # Check if we meet the threshold
-                    if pts / tot >= self.thresh:
-                        beam.slist.append(r)
-                        beam.v.append(np.median(v))
-                        beam.w_l.append(np.median(w_l))
-                        beam.p_l.append(np.median(p_l))
-                        beam.elv.append(np.median(elv))
-                        beam.gflg.append(gfx)
-                oscan.beams.append(beam)
-
-            if len(oscan.beams) > 0:
-                oscan.update_time()
-                sorted(oscan.beams, key=lambda bm: bm.bmnum)
-        else:
-            oscan = Scan()
+        oscan = Scan()
+        if len(scans) != 3 or len(scans[1].beams) == 0:
+            return oscan
+        w = np.asarray(self.w).reshape(27)
+        volume = self.__pack_scans__(scans, params_to_run_filter + ["gflg"])
+
+        # (beam, gate) window of each range gate of the middle scan beams
+        # the volume is padded with one beam and one gate on each side
+        nrangs = [b.nrang for b in scans[1].beams]
+        cell_beams = np.repeat(np.arange(len(nrangs)), nrangs)
+        cell_gates = np.concatenate([np.arange(nrang) for nrang in nrangs]
+                                    ).astype(int)
+        cell_bmnums = np.array([b.bmnum for b in scans[1].beams]
+                               )[cell_beams] - volume["low_bmnum"] - 1
+        scan_ix = np.arange(3)[:, None, None]
+        beam_ix = cell_bmnums[:, None, None, None] + \
+            np.arange(3)[None, None, :, None]
+        gate_ix = cell_gates[:, None, None, None] + \
+            np.arange(3)[None, None, None, :]
+        # windows are ordered by (scan, beam, gate) like the weights
+        found = volume["found"][scan_ix[None], beam_ix, gate_ix]\
+            .reshape(-1, 27)
+        present = np.broadcast_to(
+            volume["present"][scan_ix[None, :, :, 0], beam_ix[..., 0]],
+            (len(cell_gates), 3, 3))
+        tot = (present[:, :, :, None] * w.reshape(3, 3, 3)).reshape(-1, 27)\
+            .sum(axis=1)
+        weights = np.where(found, w, 0)
+        pts = weights.sum(axis=1)
+        # Check if we meet the threshold
+        passed = (pts / tot >= self.thresh) & (pts > 0)
+
+        weights = weights[passed]
+        pts = pts[passed]
+        passed_beams = cell_beams[passed]
+        flat_ix = (scan_ix[None], beam_ix[passed], gate_ix[passed])
+        medians = {}
+        for p in params_to_run_filter:
+            values = volume["values"][p][flat_ix].reshape(-1, 27)
+            codes = volume["codes"][p][flat_ix].reshape(-1, 27)
+            medians[p] = self.__weighted_median__(values, codes, weights, pts,
+                                                  volume["dtypes"][p])
+        # ground scatter flag of the last gate found in the window
+        last = 26 - np.argmax(weights[:, ::-1] > 0, axis=1)
+        rows = np.arange(len(last))
+        gflg = volume["values"]["gflg"][flat_ix].reshape(-1, 27)[rows, last]
+        gflg_codes = \
+            volume["codes"]["gflg"][flat_ix].reshape(-1, 27)[rows, last]
+
+        for i, b in enumerate(scans[1].beams):
+            beam = Beam()
+            beam.copy(b)
+
+            for key, value in beam.items():
+                if type(value) is np.ndarray:
+                    setattr(beam, key, [])
+
+            in_beam = passed_beams == i
+            beam.slist = cell_gates[passed][in_beam].tolist()
+            for p in params_to_run_filter:
+                setattr(beam, p, list(self.__as_dtype__(
+                    medians[p][0][in_beam], medians[p][1][in_beam],
+                    volume["dtypes"][p])))
+            beam.gflg = list(self.__as_dtype__(gflg[in_beam],
+                                               1 << gflg_codes[in_beam],
+                                               volume["dtypes"]["gflg"]))
+            oscan.beams.append(beam)
+
+        oscan.update_time()
         return oscan
+
+    def __pack_scans__(self, scans, params):
+        """
+        Packs three scans into dense (scan x beam x gate) arrays, padded
+        with one beam and one range gate on each side
+
+        Parameters
+        ----------
+        scans: list
+            three Scan objects without repeating beams
+        params: list
+            parameters to pack
+
+        Returns
+        -------
+        volume: dict
+            present: (scan x beam) True where the scan has the beam
+            found: (scan x beam x gate) True where the beam has the gate
+            values: parameter to (scan x beam x gate) float values,
+                NaN where there is no value
+            codes: parameter to (scan x beam x gate) index of the dtype
+                of each value in dtypes, 0 (float64) where the beam has
+                the gate but not the value
+            dtypes: parameter to list of the dtypes of the values
+            low_bmnum: beam number of the first (padding) beam
+        """
+        beams = [bm for s in scans for bm in s.beams]
+        bmnums = [bm.bmnum for bm in beams]
+        low_bmnum = min(bmnums) - 1
+        max_gate = max(max(int(np.max(bm.slist)) for bm in beams),
+                       max(bm.nrang for bm in scans[1].beams))
+        shape = (3, max(bmnums) - low_bmnum + 2, max_gate + 3)
+        present = np.zeros(shape[:2], dtype=bool)
+        found = np.zeros(shape, dtype=bool)
+        values = {p: np.full(shape, np.nan) for p in params}
+        codes = {p: np.zeros(shape, dtype=int) for p in params}
+        # a gate without a value is given NaN (a python float)
+        dtypes = {p: [np.dtype(float)] for p in params}
+        for j, s in enumerate(scans):
+            for bm in s.beams:
+                b = bm.bmnum - low_bmnum
+                present[j, b] = True
+                # the first position of each gate in slist
+                gates, first = np.unique(np.asarray(bm.slist, dtype=int),
+                                         return_index=True)
+                gates += 1
+                found[j, b, gates] = True
+                for p in params:
+                    data = getattr(bm, p)
+                    if p == "gflg" and self.gflg_type >= 0 and \
+                       len(getattr(bm, "gsflg")[self.gflg_type]) > 0:
+                        data = getattr(bm, "gsflg")[self.gflg_type]
+                    data = np.asarray(data)
+                    has = first < len(data)
+                    if not has.any():
+                        continue
+                    if data.dtype not in dtypes[p]:
+                        dtypes[p].append(data.dtype)
+                    values[p][j, b, gates[has]] = data[first[has]]
+                    codes[p][j, b, gates[has]] = dtypes[p].index(data.dtype)
+        return {"present": present, "found": found, "values": values,
+                "codes": codes, "dtypes": dtypes, "low_bmnum": low_bmnum}
+
+    @staticmethod
+    def __weighted_median__(values, codes, weights, counts, dtypes):
+        """
+        Median of each row of values with each value repeated by its
+        weight, calculated like numpy.median of the repeated values
+
+        Parameters
+        ----------
+        values: np.ndarray
+            (cells x 27) float values
+        codes: np.ndarray
+            (cells x 27) index of the dtype of each value in dtypes
+        weights: np.ndarray
+            (cells x 27) integer weights, 0 for values not used
+        counts: np.ndarray
+            total weight of each cell
+        dtypes: list
+            dtypes of the values
+
+        Returns
+        -------
+        medians: np.ndarray
+            float64 array of the median of each cell
+        cell_codes: np.ndarray
+            bit mask of the dtypes of the values used by each cell
+        """
+        used = weights > 0
+        cell_codes = np.bitwise_or.reduce(np.where(used, 1 << codes, 0),
+                                          axis=1)
+        has_nan = (used & np.isnan(values)).any(axis=1)
+        order = np.argsort(values, axis=1)
+        sorted_values = np.take_along_axis(values, order, axis=1)
+        cumulative = np.cumsum(np.take_along_axis(weights, order, axis=1),
+                               axis=1)
+        # the middle (two middle for even counts) of the repeated values
+        lower = np.argmax(cumulative > ((counts - 1) // 2)[:, None], axis=1)
+        upper = np.argmax(cumulative > (counts // 2)[:, None], axis=1)
+        rows = np.arange(len(values))
+        lower = sorted_values[rows, lower]
+        upper = sorted_values[rows, upper]
+        medians = lower.copy()
+        even = counts % 2 == 0
+        # the mean of the two middle values is calculated in the dtype
+        # numpy.median would use for these values
+        for cell_code in np.unique(cell_codes[even]):
+            cells = even & (cell_codes == cell_code)
+            dtype = Boxcar.__mask_dtype__(cell_code, dtypes)
+            medians[cells] = \
+                (lower[cells].astype(dtype) + upper[cells].astype(dtype)) /\
+                dtype.type(2)
+        medians[has_nan] = np.nan
+        return medians, cell_codes
+
+    @staticmethod
+    def __mask_dtype__(cell_code, dtypes):
+        """
+        Returns the dtype numpy gives the values of the dtypes in the bit
+        mask cell_code
+        """
+        return np.result_type(*[dtype for i, dtype in enumerate(dtypes)
+                                if int(cell_code) >> i & 1])
+
+    @staticmethod
+    def __as_dtype__(values, cell_codes, dtypes):
+        """
+        Returns the values of a beam as the array numpy would make of the
+        list of each value in its own dtype
+        """
+        if len(values) == 0:
+            return np.array([])
+        cell_dtypes = [Boxcar.__mask_dtype__(code, dtypes)
+                       for code in np.unique(cell_codes)]
+        dtype = np.result_type(*cell_dtypes)
+        # cast through each cell's dtype so the values are rounded like
+        # the medians numpy would calculate
+        out = np.empty(len(values), dtype=dtype)
+        for code in np.unique(cell_codes):
+            cells = cell_codes == code
+            out[cells] = values[cells].astype(
+                Boxcar.__mask_dtype__(code, dtypes))
+        return out
+
+
+def _filter_scan_stacks(scan_stacks, settings):
+    """
+    Filters a chunk of scan stacks in a worker process of
+    Boxcar.run_filter
+
+    Parameters
+    ----------
+    scan_stacks: list
+        list of three consecutive Scan objects per stack
+    settings: tuple
+        thresh, w and gflg_type of the Boxcar filter
+
+    Returns
+    -------
+    scans: list
+        filtered Scan object of each stack
+    """
+    thresh, w, gflg_type = settings
+    boxcar = Boxcar(thresh=thresh, w=w, gflg_type=gflg_type)
+    return [boxcar.__do_filter__(scan_stack) for scan_stack in scan_stacks]
@@ -0,0 +1,361 @@
+# Copyright (C) 2026 SuperDARN Canada, University of Saskatchewan
+#
+# Disclaimer:
+# pyDARN is under the LGPL v3 license found in the root directory LICENSE.md
+# Everyone is permitted to copy and distribute verbatim copies of this license
+# document, but changing it is not allowed.
+#
+# This version of the GNU Lesser General Public License incorporates the terms
+# and conditions of version 3 of the GNU General Public License,
+# supplemented by the additional permissions listed below.
+#
+# Modifications:
+#
+"""
+This module contains a columnar store for SuperDARN records
+"""
+import datetime as dt
+import numpy as np
+
+from collections.abc import Mapping
+from typing import List
+
+# time fields of fitacf-like (time.*) and grid/map-like (start.*) records
+TIME_FIELDS = ['time.yr', 'time.mo', 'time.dy', 'time.hr', 'time.mt',
+               'time.sc', 'time.us', 'start.year', 'start.month',
+               'start.day', 'start.hour', 'start.minute', 'start.second']
+
+def time_fields2datetime64(time_fields: List[np.ndarray]) -> np.ndarray:
+    """
+    Converts arrays of the DMAP time fields into numpy datetime64[us]
+
+    Parameters
+    ----------
+    time_fields: List[np.ndarray]
+        arrays of the year, month, day, hour, minute, second and
+        (optional) microsecond of each record
+
+    Returns
+    -------
+    timestamps: np.ndarray
+        datetime64[us] array of the time stamps
+    """
+    year, month, day, hour, minute, second = \
+        [np.asarray(field).astype(int) for field in time_fields[:6]]
+    timestamps = ((year - 1970) * 12 + month - 1).astype('datetime64[M]')
+    timestamps = timestamps.astype('datetime64[D]') + (day - 1)
+    timestamps = timestamps.astype('datetime64[us]') +\
+        ((hour * 60 + minute) * 60 + second) * 1000000
+    if len(time_fields) == 7:
+        timestamps += np.asarray(time_fields[6]).astype(int)
+    return timestamps
+
+
+class FitacfFrame:
+    """
+    Columnar store of SuperDARN records (typically FITACF) read in by
+    pydarnio.
+
+    Scalar fields (bmnum, channel, tfreq, cp, time fields, ...) are held as
+    contiguous numpy arrays with one value per record. One dimensional array
+    fields (v, p_l, w_l, gflg, elv, ...) are held as ragged arrays: a flat
+    value buffer plus record offsets into it. Fields indexed by slist share
+    the slist offsets. Higher dimensional fields (ltab, acfd, ...) are held
+    as a list of per record arrays.
+
+    The frame is built once from the list of records and can be passed to
+    pyDARN in place of the list: indexing with an integer returns a read-only
+    mapping of that record, while indexing with a slice, index array or
+    boolean mask returns a new FitacfFrame of those records.
+
+    Attributes
+    ----------
+    scalars: dict
+        field name to numpy array of the value of each record
+    vectors: dict
+        field name to flat numpy array of all the records values
+    offsets: dict
+        field name to numpy array (number of records + 1) of the offsets of
+        each record in vectors
+    arrays: dict
+        field name to list of each record's array
+    present: dict
+        field name to boolean numpy array marking the records containing the
+        field
+
+    Methods
+    -------
+    cached
+    vector
+    select
+    to_records
+    """
+
+    def __init__(self, dmap_data: List[dict], fields: List[str] = None):
+        """
+        Builds the columns from a list of records
+
+        Parameters
+        ----------
+        dmap_data: List[dict]
+            list of records (dictionaries) representing dmap data
+        fields: List[str]
+            only store these fields
+            Default: None, store all fields found in the records
+        """
+        self.num_records = len(dmap_data)
+        self.scalars = {}
+        self.vectors = {}
+        self.offsets = {}
+        self.arrays = {}
+        self.present = {}
+        self._timestamps = None
+        self._echo_records = None
+        self._indices = {}
+
+        if fields is None:
+            # dictionaries keep insertion order, so this keeps the field
+            # order of the records
+            fields = list(dict.fromkeys(key for record in dmap_data
+                                        for key in record))
+        else:
+            fields = [field for field in fields
+                      if any(field in record for record in dmap_data)]
+        self.fields = fields
+
+        # slist is built first so the fields indexed by it can share
+        # its offsets
+        for field in sorted(fields, key=lambda field: field != 'slist'):
+            values = [record.get(field) for record in dmap_data]
+            present = np.array([value is not None for value in values],
+                               dtype=bool)
+            first = values[int(np.argmax(present))]
+            self.present[field] = present
+            if isinstance(first, np.ndarray) and first.ndim == 1:
+                lengths = np.array([0 if value is None else len(value)
+                                    for value in values], dtype=int)
+                if lengths.sum() > 0:
+                    flat = np.concatenate([value for value in values
+                                           if value is not None])
+                else:
+                    flat = np.array([], dtype=first.dtype)
+                if field != 'slist' and 'slist' in self.offsets and\
+                   np.array_equal(lengths, np.diff(self.offsets['slist'])):
+                    offsets = self.offsets['slist']
+                else:
+                    offsets = np.zeros(self.num_records + 1, dtype=int)
+                    np.cumsum(lengths, out=offsets[1:])
+                self.vectors[field] = flat
+                self.offsets[field] = offsets
+            elif isinstance(first, np.ndarray):
+                self.arrays[field] = values
+            else:
+                # missing scalars are filled with the default of the type
+                # e.g. 0 or '', present marks them as missing
+                fill = type(first)()
+                self.scalars[field] = np.array([fill if value is None
+                                                else value
+                                                for value in values])
+
+    def __len__(self):
+        return self.num_records
+
+    def __iter__(self):
+        for i in range(self.num_records):
+            yield _RecordView(self, i)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            if index < 0:
+                index += self.num_records
+            if not 0 <= index < self.num_records:
+                raise IndexError("record index {} is out of range for {}"
+                                 " records".format(index, self.num_records))
+            return _RecordView(self, int(index))
+        return self.__take(np.arange(self.num_records)[index])
+
+    def __repr__(self):
+        return "FitacfFrame({} records, {} fields)"\
+            "".format(self.num_records, len(self.fields))
+
+    @property
+    def echo_fields(self) -> List[str]:
+        """
+        Names of the fields indexed by slist
+        """
+        if 'slist' not in self.offsets:
+            return []
+        return [field for field, offsets in self.offsets.items()
+                if offsets is self.offsets['slist']]
+
+    @property
+    def echo_records(self) -> np.ndarray:
+        """
+        Record index of each value in the slist indexed fields
+        """
+        if self._echo_records is None:
+            lengths = np.diff(self.offsets['slist'])
+            self._echo_records = np.repeat(np.arange(self.num_records),
+                                           lengths)
+        return self._echo_records
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """
+        numpy datetime64[us] array of the time stamp of each record
+        """
+        if self._timestamps is None:
+            if 'time.yr' in self.scalars:
+                keys = TIME_FIELDS[:7]
+            else:
+                keys = TIME_FIELDS[7:]
+            self._timestamps = time_fields2datetime64(
+                [self.scalars[key] for key in keys])
+        return self._timestamps
+
+    def cached(self, name: str, compute):
+        """
+        Returns an index computed over all the records of the frame,
+        computing it on the first call
+
+        Parameters
+        ----------
+        name: str
+            name of the index
+        compute: callable
+            function of the frame that computes the index
+
+        Returns
+        -------
+        the cached or newly computed index
+        """
+        if name not in self._indices:
+            self._indices[name] = compute(self)
+        return self._indices[name]
+
+    def vector(self, field: str, index: int) -> np.ndarray:
+        """
+        Returns the array of a record's one dimensional field
+
+        Parameters
+        ----------
+        field: str
+            name of the field
+        index: int
+            record index
+
+        Returns
+        -------
+        np.ndarray view of the record's values in the flat buffer
+        """
+        offsets = self.offsets[field]
+        return self.vectors[field][offsets[index]:offsets[index+1]]
+
+    def select(self, beam_num: int = 'all', channel: int = 'all',
+               start_time: dt.datetime = None,
+               end_time: dt.datetime = None) -> np.ndarray:
+        """
+        Returns a boolean mask of the records matching the selection
+
+        Parameters
+        ----------
+        beam_num: int or str
+            beam number to select, or 'all'
+            Default: 'all'
+        channel: int or str
+            channel to select, or 'all'
+            Default: 'all'
+        start_time: datetime
+            select records at or after this time
+            Default: None
+        end_time: datetime
+            select records at or before this time
+            Default: None
+
+        Returns
+        -------
+        mask: np.ndarray
+            boolean array, True for the records matching the selection
+        """
+        mask = np.ones(self.num_records, dtype=bool)
+        if beam_num != 'all':
+            mask &= self.scalars['bmnum'] == beam_num
+        if channel != 'all':
+            mask &= self.scalars['channel'] == channel
+        if start_time is not None:
+            mask &= self.timestamps >= np.datetime64(start_time, 'us')
+        if end_time is not None:
+            mask &= self.timestamps <= np.datetime64(end_time, 'us')
+        return mask
+
+    def to_records(self) -> List[dict]:
+        """
+        Returns the records as a list of dictionaries, the array values
+        are views of the frame's buffers.
+        """
+        return [dict(record) for record in self]
+
+    def __take(self, indices: np.ndarray):
+        """
+        Returns a new FitacfFrame of the records at the given indices
+        """
+        frame = FitacfFrame([])
+        frame.num_records = len(indices)
+        frame.fields = list(self.fields)
+        frame.present = {field: present[indices]
+                         for field, present in self.present.items()}
+        frame.scalars = {field: values[indices]
+                         for field, values in self.scalars.items()}
+        frame.arrays = {field: [values[i] for i in indices]
+                        for field, values in self.arrays.items()}
+        if self._timestamps is not None:
+            frame._timestamps = self._timestamps[indices]
+        # fields sharing offsets keep sharing them
+        taken = {}
+        for field, offsets in self.offsets.items():
+            if id(offsets) not in taken:
+                lengths = np.diff(offsets)[indices]
+                new_offsets = np.zeros(len(indices) + 1, dtype=int)
+                np.cumsum(lengths, out=new_offsets[1:])
+                flat_index = np.repeat(offsets[:-1][indices] -
+                                       new_offsets[:-1], lengths) +\
+                    np.arange(new_offsets[-1])
+                taken[id(offsets)] = (new_offsets, flat_index)
+            new_offsets, flat_index = taken[id(offsets)]
+            frame.offsets[field] = new_offsets
+            frame.vectors[field] = self.vectors[field][flat_index]
+        return frame
+
+
+class _RecordView(Mapping):
+    """
+    Read-only mapping of a single record in a FitacfFrame
+    """
+
+    def __init__(self, frame: FitacfFrame, index: int):
+        self._frame = frame
+        self._index = index
+
+    def __getitem__(self, field):
+        frame = self._frame
+        try:
+            present = frame.present[field][self._index]
+        except KeyError:
+            raise KeyError(field)
+        if not present:
+            raise KeyError(field)
+        if field in frame.scalars:
+            return frame.scalars[field][self._index].item()
+        if field in frame.vectors:
+            return frame.vector(field, self._index)
+        return frame.arrays[field][self._index]
+
+    def __contains__(self, field):
+        present = self._frame.present.get(field)
+        return present is not None and bool(present[self._index])
+
+    def __iter__(self):
+        return (field for field in self._frame.fields if field in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
@@ -20,6 +20,8 @@
 #                extra keys are passed in from other functions
 # 2023-01-03 CJM added functions to calculate azimuth from XS and SC existing
 #                codebase, can be expanded and added to when required
+# 2026-10-16 geocentric_coordinates, cell_geocentric_coordinates and
+#            geodetic2geocentric accept numpy arrays
 # Disclaimer:
 # pyDARN is under the LGPL v3 license found in the root directory LICENSE.md
 # Everyone is permitted to copy and distribute verbatim copies of this license
@@ -45,17 +47,21 @@ def geocentric_coordinates(target_range: float, psi: float, boresight: float,
     Calculates the geocentric coordinates of gate cell  point,
     using either the standard or Chisham virtual height model.
 
+    target_range, psi and cell_height can be numpy arrays, they are
+    broadcast against each other and the coordinates of every cell are
+    calculated together.
+
     Parameters
     ----------
         radar_lat : float
             radars site latitude [rad]
         radar_lon : float
             radars site longitude [lon]
-        target_range: float
+        target_range: float or np.ndarray
             The range from the instrument to the target (echo) [km]
-        cell_height : float
+        cell_height : float or np.ndarray
             virtual height of the gate cell [km]
-        psi: int
+        psi: float or np.ndarray
             [rad]
         boresight: float
             boresight of the radar beam [rad]
@@ -65,9 +71,9 @@ def geocentric_coordinates(target_range: float, psi: float, boresight: float,
 
     Returns
     -------
-        cell_lat: float
+        cell_lat: float or np.ndarray
             latitude of the range gate in geographic coordinates [rad]
-        cell_lon: float
+        cell_lon: float or np.ndarray
             longitude of the range gate in geographic coordinates [rad]
 
     """
@@ -81,27 +87,36 @@ def geocentric_coordinates(target_range: float, psi: float, boresight: float,
     # calculate the radius over the earth underneath
     # the radar and range gate cell
     rlat, rlon, r_radar, delta = geodetic2geocentric(**kwargs)
-    r_cell = r_radar
+    target_range, psi, x_height, r_cell = \
+        np.broadcast_arrays(target_range, psi, x_height, r_radar)
+    r_cell = r_cell.astype(float)
+    cell_lat = np.zeros(r_cell.shape)
+    cell_lon = np.zeros(r_cell.shape)
 
     psi_cos_2 = np.cos(psi)**2
     psi_sin_2 = np.sin(psi)**2
 
-    while_flag = True
-    while while_flag:
+    # cells that have not converged yet, converged cells keep their
+    # coordinates so every cell gets the same result as on its own
+    active = np.ones(r_cell.shape, dtype=bool)
+    while active.any():
         # distance between the gate cell to the earth's centre [km]
         cell_rho = r_cell + x_height
         # elevation angle relative to local horizon [rad]
         rel_elv = np.arcsin(((cell_rho**2) - (r_radar**2) - target_range**2) /
                             (2.0 * r_radar * target_range))
         # estimate elevation for multi-hop propagation
-        if virtual_height_model == VHModels.CHISHAM and target_range > 2137.5:
-            gamma = np.arccos((r_radar**2 + cell_rho**2 - target_range**2) /
-                              (2.0 * r_radar * cell_rho))
-            beta = np.arcsin(r_radar * np.sin(gamma/3.0) /
-                             (target_range/3.0))
+        if virtual_height_model == VHModels.CHISHAM:
+            with np.errstate(invalid='ignore'):
+                gamma = np.arccos((r_radar**2 + cell_rho**2 -
+                                   target_range**2) /
+                                  (2.0 * r_radar * cell_rho))
+                beta = np.arcsin(r_radar * np.sin(gamma/3.0) /
+                                 (target_range/3.0))
             # Elevation angle used for estimating off-array normal
             # azimuth [rad]
-            xelv = (np.pi/2) - beta - (gamma/3.0)
+            xelv = np.where(target_range > 2137.5,
+                            (np.pi/2) - beta - (gamma/3.0), rel_elv)
         else:
             xelv = rel_elv
 
@@ -109,24 +124,21 @@ def geocentric_coordinates(target_range: float, psi: float, boresight: float,
         elv_sin_2 = np.sin(xelv)**2
 
         est_azimuth = psi_cos_2 - elv_sin_2
-        if est_azimuth < 0:
-            tan_azimuth = 1e32
-        else:
-            # in radians
-            tan_azimuth = np.sqrt(psi_sin_2 /
-                                  (psi_cos_2 - elv_sin_2))
+        # in radians
+        with np.errstate(invalid='ignore'):
+            tan_azimuth = np.where(est_azimuth < 0, 1e32,
+                                   np.sqrt(psi_sin_2 /
+                                           (psi_cos_2 - elv_sin_2)))
         # azimuth in [rad]
-        if psi > 0:
-            azimuth = np.arctan(tan_azimuth)
-        else:
-            azimuth = -np.arctan(tan_azimuth)
+        azimuth = np.where(psi > 0, np.arctan(tan_azimuth),
+                           -np.arctan(tan_azimuth))
 
         # azimuth of the gate cell [rad]
         cell_azimuth = azimuth + boresight
         flatten_azimuth = geocentric2flattening(delta=delta,
                                                 azimuth=cell_azimuth,
                                                 elv=xelv)
-        cell_rho, cell_lat, cell_lon = \
+        new_rho, new_lat, new_lon = \
             cell_geocentric_coordinates(lat=rlat, lon=rlon,
                                         rho=r_radar,
                                         azimuth=flatten_azimuth,
@@ -134,12 +146,16 @@ def geocentric_coordinates(target_range: float, psi: float, boresight: float,
                                         r=target_range)
 
         # recalculate the radius under the gate cell and centre of earth
-        r_cell = geocentric2geodetic(lat=cell_lat, lon=cell_lon)
-        cell_heightx = cell_rho - r_cell
+        new_r_cell = geocentric2geodetic(lat=new_lat, lon=new_lon)
+        cell_lat = np.where(active, new_lat, cell_lat)
+        cell_lon = np.where(active, new_lon, cell_lon)
+        r_cell = np.where(active, new_r_cell, r_cell)
+        cell_heightx = new_rho - new_r_cell
         # this ensures convergence on the cell point
-        while_flag = abs(cell_heightx - x_height) > 0.5
+        active &= np.abs(cell_heightx - x_height) > 0.5
 
-    return cell_lat, cell_lon
+    # [()] returns floats for scalar inputs
+    return cell_lat[()], cell_lon[()]
 
 
 # fldpnt
@@ -216,10 +232,8 @@ def cell_geocentric_coordinates(lat: float, lon: float, rho: float,
     # convert Cartesian back to spherical
     rho = np.sqrt(global_x**2 + global_y**2 + global_z**2)
     lat = np.pi/2 - np.arccos(global_z/rho)
-    if global_x == 0 and global_y == 0:
-        lon = 0
-    else:
-        lon = np.arctan2(global_y, global_x)
+    lon = np.where((global_x == 0) & (global_y == 0), 0,
+                   np.arctan2(global_y, global_x))[()]
 
     return rho, lat, lon
 
@@ -300,8 +314,7 @@ def geodetic2geocentric(lat: float, lon: float, **kwargs):
     # glon [rad]
     glon = lon
 
-    if glon > np.pi:
-        glon = glon - 2 * np.pi
+    glon = np.where(glon > np.pi, glon - 2 * np.pi, glon)[()]
     # grho is km?
     rho = EARTH_EQUATORIAL_RADIUS / np.sqrt(1 + e2 * np.sin(glat)**2)
     # delta in [rad]
@@ -21,9 +21,17 @@ import matplotlib.pyplot as plt
 import numpy as np
 import warnings
 
+from collections import OrderedDict
 from typing import List
 
 from pydarn import plot_exceptions
+from pydarn.utils.fitacf_frame import (FitacfFrame, TIME_FIELDS,
+                                       time_fields2datetime64)
+
+# record indices (time stamps, scans, ...) of the most recently used
+# lists of records
+_RECORD_CACHE_SIZE = 16
+_record_cache = OrderedDict()
 
 class MapParams(enum.Enum):
     """
@@ -65,7 +73,8 @@ class TimeSeriesParams(enum.Enum):
         POT = 'pot.pos'
         
 
-def find_record(dmap_data: List[dict], start_time: dt.datetime, time_delta:int = 1):
+def find_record(dmap_data: List[dict], start_time: dt.datetime,
+                time_delta: int = 1):
     """
     finds the record number that associates to the start time
 
@@ -89,15 +98,151 @@ def find_record(dmap_data: List[dict], start_time: dt.datetime, time_delta:int =
         NoDataFound
             raises if the start_time is not in the dmap_data list
     """
-    record_num = 0
-    for record in dmap_data:
-        date = time2datetime(record)
-        time_diff = date - start_time
-        if time_diff.seconds/60 <= time_delta:
-            return record_num
-        record_num += 1
+    timestamps = record_timestamps(dmap_data)
+    start = np.datetime64(start_time, 'us')
+    # whole seconds after the start time, within time_delta minutes
+    if _timestamps_sorted(dmap_data):
+        record_num = int(np.searchsorted(timestamps, start, side='left'))
+        if record_num < len(timestamps):
+            seconds = (timestamps[record_num] - start) //\
+                np.timedelta64(1, 's')
+            if seconds / 60 <= time_delta:
+                return record_num
+    else:
+        seconds = (timestamps - start) // np.timedelta64(1, 's')
+        matches = np.nonzero((seconds >= 0) & (seconds / 60 <= time_delta))[0]
+        if len(matches) > 0:
+            return int(matches[0])
     raise plot_exceptions.NoDataFoundError('N/A', start_time=start_time)
 
+
+def find_record_window(dmap_data: List[dict], start_time: dt.datetime,
+                       end_time: dt.datetime) -> np.ndarray:
+    """
+    finds the record numbers with a time stamp between the start and
+    end time (inclusive)
+
+    Parameter
+    ---------
+        dmap_data : List[dict]
+            the data to look over for the record numbers
+        start_time : datetime
+            start of the time window
+        end_time : datetime
+            end of the time window
+
+    Return
+    ------
+        record_nums : np.ndarray
+            the record numbers, in order, within the time window
+    """
+    timestamps = record_timestamps(dmap_data)
+    start = np.datetime64(start_time, 'us')
+    end = np.datetime64(end_time, 'us')
+    if _timestamps_sorted(dmap_data):
+        return np.arange(np.searchsorted(timestamps, start, side='left'),
+                         np.searchsorted(timestamps, end, side='right'))
+    return np.nonzero((timestamps >= start) & (timestamps <= end))[0]
+
+
+def record_timestamps(dmap_data: List[dict]) -> np.ndarray:
+    """
+    Returns the time stamps of all the records as a numpy datetime64[us]
+    array, computed from the DMAP time fields with array arithmetic.
+
+    The array is cached per list of records, see cached_record_index.
+
+    Parameter
+    ---------
+    dmap_data: List[dict] or FitacfFrame
+        list of records (dictionaries) representing dmap data
+
+    Returns
+    -------
+    timestamps: np.ndarray
+        datetime64[us] array of the time stamp of each record
+    """
+    if isinstance(dmap_data, FitacfFrame):
+        return dmap_data.timestamps
+    return cached_record_index(dmap_data, 'timestamps', _compute_timestamps)
+
+
+def cached_record_index(dmap_data: List[dict], name: str, compute):
+    """
+    Returns an index computed over all the records, e.g. the time stamps or
+    scan numbers, caching it so repeated calls on the same list of records
+    (or FitacfFrame) only compute it once.
+
+    The cache is checked against the records in the list, but not against
+    changes of the fields inside a record.
+
+    Parameter
+    ---------
+    dmap_data: List[dict] or FitacfFrame
+        list of records (dictionaries) representing dmap data
+    name: str
+        name of the index
+    compute: callable
+        function of dmap_data that computes the index
+
+    Returns
+    -------
+    the cached or newly computed index
+    """
+    if isinstance(dmap_data, FitacfFrame):
+        return dmap_data.cached(name, compute)
+    if len(dmap_data) == 0:
+        return compute(dmap_data)
+
+    record_ids = np.fromiter(map(id, dmap_data), dtype=np.uintp,
+                             count=len(dmap_data))
+    key = (id(dmap_data), name)
+    cached = _record_cache.get(key)
+    # A reference to the first record is kept with the cache so its
+    # id can not be reused by a different list of records
+    if cached is not None and cached[0] is dmap_data[0] and\
+       np.array_equal(cached[1], record_ids):
+        _record_cache.move_to_end(key)
+        return cached[2]
+
+    index = compute(dmap_data)
+    _record_cache[key] = (dmap_data[0], record_ids, index)
+    if len(_record_cache) > _RECORD_CACHE_SIZE:
+        _record_cache.popitem(last=False)
+    return index
+
+
+def _compute_timestamps(dmap_data: List[dict]) -> np.ndarray:
+    """
+    Computes the datetime64[us] time stamps of a list of records
+    """
+    if len(dmap_data) == 0:
+        return np.array([], dtype='datetime64[us]')
+    if 'time.yr' in dmap_data[0]:
+        keys = TIME_FIELDS[:7]
+    else:
+        keys = TIME_FIELDS[7:]
+    return time_fields2datetime64([[record[key] for record in dmap_data]
+                                   for key in keys])
+
+
+def _timestamps_sorted(dmap_data: List[dict]) -> bool:
+    """
+    Returns True if the time stamps of the records are in time order,
+    checked once and cached next to the time stamps
+    """
+    return cached_record_index(dmap_data, 'timestamps_sorted',
+                               _compute_timestamps_sorted)
+
+
+def _compute_timestamps_sorted(dmap_data: List[dict]) -> bool:
+    """
+    Checks if the time stamps of a list of records are in time order
+    """
+    timestamps = record_timestamps(dmap_data)
+    return bool(np.all(timestamps[1:] >= timestamps[:-1]))
+
+
 def check_data_type(dmap_data: List[dict], parameter: str,
                     expected_type: str, index: int):
     """
@@ -14,6 +14,7 @@
 # 2022-08-04 CJM added HALF_SLANT option and gate2halfslant method
 # 2023-09-14 CJM moved GSMR to GSMR_BRISTOW and used new GSMR alg
 # 2023-12-15 RAR added TIME_OF_FLIGHT option and gate2timeofflight method
+# 2026-10-16 gate2gs_bristow warns about non-finite ranges for array input
 
 import enum
 import numpy as np
@@ -122,7 +123,7 @@ def gate2gs_bristow(virtual_height: float = 250, **kwargs):
     # give user a warning if so, these values will be dealt with in
     # the individual plotting algs as we need to return the full array
     # of values for the complete beam*range gate array
-    if any(np.isfinite(ground_scatter_mapped_ranges)):
+    if np.any(~np.isfinite(ground_scatter_mapped_ranges)):
         warnings.warn("Warning: Be aware that the range estimation"
                       " you have chosen has calculated some infinite"
                       " values. These values will not be plotted."
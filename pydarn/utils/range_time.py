@@ -0,0 +1,287 @@
+# Copyright (C) 2026 SuperDARN Canada, University of Saskatchewan
+#
+# Disclaimer:
+# pyDARN is under the LGPL v3 license found in the root directory LICENSE.md
+# Everyone is permitted to copy and distribute verbatim copies of this license
+# document, but changing it is not allowed.
+#
+# This version of the GNU Lesser General Public License incorporates the terms
+# and conditions of version 3 of the GNU General Public License,
+# supplemented by the additional permissions listed below.
+#
+# Modifications:
+#
+"""
+This module builds the (time x range gate) grids used by the
+range-time style plots
+"""
+import datetime as dt
+import numpy as np
+import warnings
+
+from typing import List
+
+from pydarn.utils.fitacf_frame import FitacfFrame, TIME_FIELDS
+
+
+def build_range_time_grid(dmap_data: List[dict], parameter: str,
+                          beam_num: int = 0, channel: int = 'all',
+                          start_time: dt.datetime = None,
+                          end_time: dt.datetime = None,
+                          filter_settings: dict = None):
+    """
+    Grids a parameter of the dmap_data into a (time x range gate) array.
+
+    The time axis is sized once: every record of the beam and channel adds
+    a row and any gap longer than 2 minutes is padded with empty rows every
+    2 minutes. All the range gate data is then scattered into a single
+    preallocated array.
+
+    Parameters
+    ----------
+    dmap_data: List[dict] or FitacfFrame
+        list of records (dictionaries) representing dmap data
+    parameter: str
+        key name of the array parameter to grid
+    beam_num: int or str
+        beam number of the records to grid, or 'all'
+        Default: 0
+    channel: int or str
+        channel number of the records to grid, or 'all'
+        Default: 'all'
+    start_time: datetime
+        records before this time are not gridded
+        Default: time of the first record
+    end_time: datetime
+        records after this time are not gridded
+        Default: time of the last record
+    filter_settings: dict
+        dictionary of min_array_filter, max_array_filter,
+        min_scalar_filter, max_scalar_filter and equal_scalar_filter
+        dictionaries, see RTP.plot_range_time for details.
+        Values that do not pass the filters are left as NaN in z. Array
+        filters compare the filter field at the same range gate, a gate
+        without a value of the filter field does not pass.
+        Default: None, no filters
+
+    Returns
+    -------
+    times: List[datetime]
+        time of each row of z (records and gap padding)
+    gates: np.ndarray
+        range gate number of each column of z
+    z: np.ndarray
+        2D (time x range gate) array of the parameter values,
+        NaN where there is no data
+    gflg_mask: np.ndarray
+        2D (time x range gate) array of the ground scatter flags,
+        1 for ground scatter, 0 for ionospheric scatter and
+        NaN where there is no data
+    """
+    settings = {'min_array_filter': dict(),
+                'max_array_filter': dict(),
+                'min_scalar_filter': dict(),
+                'max_scalar_filter': dict(),
+                'equal_scalar_filter': dict()}
+    if filter_settings is not None:
+        settings.update(filter_settings)
+
+    if not isinstance(dmap_data, FitacfFrame):
+        # only the fields needed for the grid are gathered
+        fields = TIME_FIELDS + ['bmnum', 'channel', 'nrang', 'slist',
+                                'gflg', parameter]
+        for filters in settings.values():
+            fields += list(filters.keys())
+        dmap_data = FitacfFrame(dmap_data, fields=fields)
+    frame = dmap_data
+    rec_times = frame.timestamps.tolist()
+
+    if start_time is None:
+        start_time = rec_times[0]
+    if end_time is None:
+        end_time = rec_times[-1]
+
+    # because nrang can change based on mode we need to look
+    # for the largest value
+    nrang = frame.scalars['nrang']
+    y_max = int(np.max(nrang))
+
+    # First pass: build the time axis and note which row each of the
+    # selected records belongs to
+    selected = frame.select(beam_num=beam_num, channel=channel)
+    times = []
+    rows = np.full(len(frame), -1)
+    for i, rec_time in enumerate(rec_times):
+        if rec_time > end_time:
+            break
+        if times:
+            # Abs is used as some files have data out of order, this stops
+            # the plot from spanning a day of white space, but the user
+            # needs to be warned that the output may be incorrect
+            diff_time = abs(rec_time - times[-1]).seconds / 60.0
+            if rec_time < times[-1]:
+                warnings.warn("Please be aware that the data for"
+                              " timestamp {} contains a record that is not"
+                              " in time order. As such the plot of the"
+                              " data may not be correct, you can solve"
+                              " this by sorting the data stream by date"
+                              " before plotting.".format(rec_time))
+            # separation roughly 2 minutes, if there is a gap
+            # then fill it in with white space
+            if diff_time > 2.0:
+                for _ in range(int(np.floor(diff_time / 2.0))):
+                    times.append(times[-1] + dt.timedelta(0, 120))
+        if selected[i] and start_time <= rec_time:
+            rows[i] = len(times)
+            times.append(rec_time)
+
+    gates = np.arange(y_max)
+    z = np.full((max(len(times), 1), y_max), np.nan)
+    gflg_mask = np.full(z.shape, np.nan)
+
+    # Second pass: scatter the values of all the records into the grid
+    # in one go. Records missing any of the fields, e.g. when slist is not
+    # created due to bad quality data, are skipped.
+    used = rows >= 0
+    for field in ['slist', 'gflg', parameter] +\
+            [key for filters in settings.values() for key in filters]:
+        if field not in frame.present:
+            return times, gates, z, gflg_mask
+        used &= frame.present[field]
+
+    # record index and position within the record of every value
+    offsets = frame.offsets[parameter]
+    lengths = np.diff(offsets)
+    value_records = np.repeat(np.arange(len(frame)), lengths)
+    positions = np.arange(offsets[-1]) - offsets[value_records]
+    keep = used[value_records]
+    value_records = value_records[keep]
+    positions = positions[keep]
+    values = frame.vectors[parameter][keep].astype(float)
+
+    # parameters like pwr0 are given for every range gate, others
+    # are given for the slist gates
+    full = (lengths == nrang)[value_records]
+    value_gates = positions.copy()
+    value_gates[~full] = \
+        frame.vectors['slist'][_flat_index(frame, 'slist',
+                                           value_records[~full],
+                                           positions[~full])]
+    # position of each value's gate in the slist of its record, -1 for
+    # the gates of full length parameters that are not in slist
+    slist_positions = positions.copy()
+    slist_positions[full] = _slist_positions(frame, y_max,
+                                             value_records[full],
+                                             value_gates[full])
+    passed = _filter_data_check(frame, settings, value_records, value_gates,
+                                slist_positions)
+    value_rows = rows[value_records]
+    z[value_rows, value_gates] = np.where(passed, values, np.nan)
+
+    # the ground scatter flag is only known at the slist gates, any
+    # other gate of parameters like pwr0 is not ground scatter
+    gflg_mask[value_rows[full], value_gates[full]] = 0
+    echo_offsets = frame.offsets['slist']
+    echo_records = np.repeat(np.arange(len(frame)), np.diff(echo_offsets))
+    echo_positions = np.arange(echo_offsets[-1]) -\
+        echo_offsets[echo_records]
+    keep = used[echo_records]
+    echo_records = echo_records[keep]
+    echo_positions = echo_positions[keep]
+    gflg = frame.vectors['gflg'][_flat_index(frame, 'gflg', echo_records,
+                                             echo_positions)]
+    gflg_mask[rows[echo_records], frame.vectors['slist'][keep]] = gflg
+    return times, gates, z, gflg_mask
+
+
+def _flat_index(frame: FitacfFrame, field: str, records: np.ndarray,
+                positions: np.ndarray) -> np.ndarray:
+    """
+    Returns the index in the flat buffer of a field for the given
+    record indices and positions within those records
+    """
+    return frame.offsets[field][records] + positions
+
+
+def _slist_positions(frame: FitacfFrame, num_gates: int,
+                     records: np.ndarray, gates: np.ndarray) -> np.ndarray:
+    """
+    Returns the position in the slist of their record of the given record
+    indices and range gates, -1 where the gate is not in the slist
+    """
+    echo_records = frame.echo_records
+    echo_offsets = frame.offsets['slist']
+    echo_keys = echo_records * num_gates + frame.vectors['slist']
+    order = np.argsort(echo_keys, kind='stable')
+    sorted_keys = echo_keys[order]
+    keys = records * num_gates + gates
+    if len(sorted_keys) == 0:
+        return np.full(len(keys), -1)
+    found = np.minimum(np.searchsorted(sorted_keys, keys),
+                       len(sorted_keys) - 1)
+    flat = order[found]
+    return np.where(sorted_keys[found] == keys,
+                    flat - echo_offsets[echo_records[flat]], -1)
+
+
+def _array_filter_values(frame: FitacfFrame, key: str, records: np.ndarray,
+                         gates: np.ndarray, slist_positions: np.ndarray):
+    """
+    Returns the values of an array field at the given record indices and
+    range gates, and a mask of the values that exist. Fields given for
+    every range gate are indexed by the gate, the others by the gate's
+    position in slist.
+    """
+    lengths = np.diff(frame.offsets[key])[records]
+    full = lengths == frame.scalars['nrang'][records]
+    positions = np.where(full, gates, slist_positions)
+    exists = (positions >= 0) & (positions < lengths)
+    values = np.zeros(len(records), dtype=frame.vectors[key].dtype)
+    values[exists] = frame.vectors[key][
+        _flat_index(frame, key, records[exists], positions[exists])]
+    return values, exists
+
+
+def _filter_data_check(frame: FitacfFrame, settings: dict,
+                       records: np.ndarray, gates: np.ndarray,
+                       slist_positions: np.ndarray) -> np.ndarray:
+    """
+    checks for data that does not meet the criteria of the filter
+    settings
+
+    Parameters
+    ----------
+    frame : FitacfFrame
+        columns of the dmap records
+    settings : dict
+        dictionary of the settings list
+    records : np.ndarray
+        record index of each value to check
+    gates : np.ndarray
+        range gate of each value to check
+    slist_positions : np.ndarray
+        position of each value's range gate in the slist of its record,
+        -1 if the gate is not in slist
+
+    Returns
+    -------
+    pass_flg : np.ndarray
+        boolean array indicating which values pass all the filter checks
+    """
+    pass_flg = np.ones(len(records), dtype=bool)
+    for key, value in settings['min_array_filter'].items():
+        values, exists = _array_filter_values(frame, key, records, gates,
+                                              slist_positions)
+        pass_flg &= exists & ~(values < value)
+    for key, value in settings['max_array_filter'].items():
+        values, exists = _array_filter_values(frame, key, records, gates,
+                                              slist_positions)
+        pass_flg &= exists & ~(values > value)
+
+    for key, value in settings['min_scalar_filter'].items():
+        pass_flg &= ~(frame.scalars[key][records] < value)
+    for key, value in settings['max_scalar_filter'].items():
+        pass_flg &= ~(frame.scalars[key][records] > value)
+    for key, value in settings['equal_scalar_filter'].items():
+        pass_flg &= frame.scalars[key][records] == value
+    return pass_flg
@@ -19,13 +19,16 @@
 #
 # Modifications:
 # 20221221 - Bharat Kunduri: Updated to RST elevation code
+# 20261016 - vectorized over all the records and tdiff values
+# 20261016 - added calibrate_tdiff to evaluate candidate tdiff values
 
+import itertools
 import numpy as np
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import List
-from copy import deepcopy
 
-from pydarn import (SuperDARNRadars, C, RadarID)
+from pydarn import (SuperDARNRadars, C, RadarID, FitacfFrame)
 
 
 def recalculate_elevation(dmap_data: List[dict], tdiff: float,
@@ -34,15 +37,22 @@ def recalculate_elevation(dmap_data: List[dict], tdiff: float,
     """
     Recalculates elevation values for a given tdiff Value
 
+    The elevation of all the echoes of all the records are solved for at
+    once on flat arrays of the records' phi0 values.
+
     Parameters
     -----------
-    dmap_data: list of dictionaries
+    dmap_data: list of dictionaries or FitacfFrame
         fitacf data
-    tdiff: float
+    tdiff: float or array-like of floats
         propagation time from interferometer array to phasing matrix
         input minus propagation time from main array antenna, microseconds
+        An array of tdiff values evaluates all of them in one pass, e.g.
+        for calibration studies, and returns a list of the results of
+        each tdiff value.
     overwrite: bool
-        If true then return a new dmap_data with new elevation to plot with
+        If true then return a new dmap_data with new elevation to plot with,
+        the new records share all their fields but elv with dmap_data
         if false then return dictionary of new elevations for further use
     interferometer_offset: list
         select position of interferometer array wrt the main array
@@ -55,16 +65,71 @@ def recalculate_elevation(dmap_data: List[dict], tdiff: float,
     -------
     elv_amended: dictionary of lists
         amended elevation values for each record given
+        or a list of them if an array of tdiff values is given
     """
-    if not overwrite:
-        # Make phi1 output into dictionary
-        elv_amended = {}
-    else:
-        dmap_amended = deepcopy(dmap_data)
+    terms = elevation_terms(dmap_data, interferometer_offset)
+    if isinstance(dmap_data, FitacfFrame):
+        dmap_data = dmap_data.to_records()
+    for ind in terms['missing']:
+        print("No elevation data. 'phi0' parameter missing"
+              " from the record")
+
+    tdiffs = np.asarray(tdiff, dtype=float)
+    elevations = np.degrees(solve_elevation(terms, tdiffs.reshape(-1)))
+    results = []
+    for flat_elv in elevations:
+        # Records share the flat buffer of their new elevation values
+        record_elvs = np.split(flat_elv, terms['offsets'][1:-1])
+        if overwrite:
+            # Only the elv of the records is replaced, the other fields are
+            # not copied
+            dmap_amended = [dict(record) for record in dmap_data]
+            for ind, elv in zip(terms['records'], record_elvs):
+                dmap_amended[ind]['elv'] = elv
+            results.append(dmap_amended)
+        else:
+            # Make phi1 output into dictionary
+            elv_amended = {ind: [] for ind in terms['missing']}
+            elv_amended.update(zip(terms['records'].tolist(), record_elvs))
+            results.append(dict(sorted(elv_amended.items())))
+    if tdiffs.ndim == 0:
+        return results[0]
+    return results
+
+
+def elevation_terms(dmap_data: List[dict],
+                    interferometer_offset: list = None) -> dict:
+    """
+    Gathers the phi0 values of all the records into a flat array and
+    precomputes the terms of the elevation equation that do not depend
+    on tdiff, see solve_elevation
+
+    Parameters
+    -----------
+    dmap_data: list of dictionaries or FitacfFrame
+        fitacf data
+    interferometer_offset: list
+        select position of interferometer array wrt the main array
+        needs to be list of [X, Y, Z] e.g. [0.0, 100.0, 1.0]
+        Default: None, the interferometer offset of the radar's hardware
+
+    Returns
+    -------
+    terms: dict
+        records: indices of the records with phi0
+        missing: indices of the records without phi0
+        offsets: offsets of each record's values in the flat arrays
+        phi0: flat array of the phi0 values of the records
+        and the per value terms of the elevation equation
+    """
+    if not isinstance(dmap_data, FitacfFrame):
+        dmap_data = FitacfFrame(dmap_data,
+                                fields=['stid', 'bmnum', 'tfreq', 'phi0'])
+    frame = dmap_data
 
     # Hardware config for radar
     # Doesn't have to be in the loop, since we're accessing only the first rec
-    radar_hdw = SuperDARNRadars.radars[RadarID(dmap_data[0]['stid'])].hardware_info
+    radar_hdw = SuperDARNRadars.radars[RadarID(int(frame.scalars['stid'][0]))].hardware_info
     if interferometer_offset is not None:
         int_pos = interferometer_offset
     else:
@@ -78,65 +143,222 @@ def recalculate_elevation(dmap_data: List[dict], tdiff: float,
 
     boff = (radar_hdw.beams / 2.0) - 0.5
 
-    # For each record in data, recalculate the elevation
-    for ind in range(0, len(dmap_data)):
-        # If there is no elevation data, append empty list and skip
-        if 'phi0' not in dmap_data[ind]:
-            print("No elevation data. 'phi0' parameter missing"
-                  " from the record")
-            if not overwrite:
-                elv_amended[ind] = []
-            continue
-
-        # Beam direction off boresight in RADIANS
-        phi0 = np.radians(radar_hdw.beam_separation
-                          * (dmap_data[ind]['bmnum'] - boff))
-        # Cos and Sin of phi in shape of phi0
-        cp0 = np.cos(phi0)
-        sp0 = np.sin(phi0)
-
-        # Phase delay [radians] due to electrical path difference.
-        psi_ele = (-2.0 * np.pi * (dmap_data[ind]['tfreq'])
-                   * 1000.0 * tdiff * 1.0e-6)
-        # Elevation angle (a0) where psi (phase difference) is maximum
-        a0 = np.arcsin(sgn * int_pos[2] * cp0
-                       / np.sqrt(int_pos[1]**2 + int_pos[2]**2))
-        if a0 < 0:
-            a0 = 0
-        ca0 = np.cos(a0)
-        sa0 = np.sin(a0)
-
-        # maximum phase = psi_ele + psi_geo(a0)
-        psi_max = psi_ele + 2.0 * np.pi * (dmap_data[ind]['tfreq']) *\
-            (1e3 / C) * (int_pos[0] * sp0 + int_pos[1]
-                         * np.sqrt(ca0*ca0 - sp0*sp0) + int_pos[2] * sa0)
-
-        # compute the number of 2pi factors necessary to map to correct region
-        dpsi = (psi_max - dmap_data[ind]['phi0'])
-        if int_pos[1] > 0:
-            n2pi = np.floor(dpsi / (2.0 * np.pi))
-        else:
-            n2pi = np.ceil(dpsi / (2.0 * np.pi))
-        d2pi = n2pi * 2.0 * np.pi
-        # map observed phase to correct extended phase
-        psi_obs = dmap_data[ind]['phi0'] + d2pi
-        # solve for the elevation angle
-        E = (psi_obs / (2.0*np.pi*dmap_data[ind]['tfreq']*1.0e3)
-             + tdiff*1e-6) * C - int_pos[0] * sp0
-
-        alpha = np.arcsin((E*int_pos[2]
-                           + np.sqrt(E*E * int_pos[2]**2
-                           - (int_pos[1]**2 + int_pos[2]**2)
-                           * (E*E - int_pos[1]*int_pos[1]*cp0*cp0)))
-                          / (int_pos[1]*int_pos[1] + int_pos[2]*int_pos[2]))
-
-        # Convert theta back to degrees
-        if overwrite:
-            dmap_amended[ind].update({'elv': np.degrees(alpha)})
-        else:
-            elv_amended[ind] = np.degrees(alpha)
+    # If there is no elevation data the record is skipped
+    if 'phi0' in frame.present:
+        has_phi0 = frame.present['phi0']
+    else:
+        has_phi0 = np.zeros(len(frame), dtype=bool)
+    records = np.flatnonzero(has_phi0)
+    missing = np.flatnonzero(~has_phi0)
+    if len(records) > 0:
+        lengths = np.diff(frame.offsets['phi0'])[records]
+        phi0 = np.concatenate([frame.vector('phi0', ind) for ind in records])
+    else:
+        lengths = np.zeros(0, dtype=int)
+        phi0 = np.zeros(0)
+    offsets = np.zeros(len(records) + 1, dtype=int)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # The terms are computed once per record and spread to its values
+    bmnum = frame.scalars['bmnum'][records]
+    tfreq = frame.scalars['tfreq'][records]
+
+    # Beam direction off boresight in RADIANS
+    beam_phi0 = np.radians(radar_hdw.beam_separation * (bmnum - boff))
+    # Cos and Sin of phi in shape of phi0
+    cp0 = np.cos(beam_phi0)
+    sp0 = np.sin(beam_phi0)
+
+    # Elevation angle (a0) where psi (phase difference) is maximum
+    a0 = np.arcsin(sgn * int_pos[2] * cp0
+                   / np.sqrt(int_pos[1]**2 + int_pos[2]**2))
+    a0 = np.where(a0 < 0, 0, a0)
+    ca0 = np.cos(a0)
+    sa0 = np.sin(a0)
+
+    # geometric part of the maximum phase psi_geo(a0)
+    psi_geo = 2.0 * np.pi * tfreq *\
+        (1e3 / C) * (int_pos[0] * sp0 + int_pos[1]
+                     * np.sqrt(ca0*ca0 - sp0*sp0) + int_pos[2] * sa0)
+
+    value_records = np.repeat(np.arange(len(records)), lengths)
+    return {'records': records, 'missing': missing, 'offsets': offsets,
+            'phi0': phi0, 'int_pos': int_pos,
+            'tfreq': tfreq[value_records].astype(float),
+            'cp0': cp0[value_records], 'sp0': sp0[value_records],
+            'psi_geo': psi_geo[value_records]}
+
+
+def solve_elevation(terms: dict, tdiff) -> np.ndarray:
+    """
+    Solves the elevation equation for all the values gathered by
+    elevation_terms
+
+    Parameters
+    -----------
+    terms: dict
+        terms of the elevation equation, see elevation_terms
+    tdiff: float or np.ndarray
+        tdiff value(s) in microseconds
 
-    if overwrite:
-        return dmap_amended
+    Returns
+    -------
+    alpha: np.ndarray
+        elevation angles in radians, of shape tdiff's shape + (number of
+        values,)
+    """
+    int_pos = terms['int_pos']
+    tdiff = np.asarray(tdiff, dtype=float)[..., np.newaxis]
+    tfreq = terms['tfreq']
+    phi0 = terms['phi0']
+    cp0 = terms['cp0']
+
+    # Phase delay [radians] due to electrical path difference.
+    psi_ele = (-2.0 * np.pi * tfreq
+               * 1000.0 * tdiff * 1.0e-6)
+
+    # maximum phase = psi_ele + psi_geo(a0)
+    psi_max = psi_ele + terms['psi_geo']
+
+    # compute the number of 2pi factors necessary to map to correct region
+    dpsi = (psi_max - phi0)
+    if int_pos[1] > 0:
+        n2pi = np.floor(dpsi / (2.0 * np.pi))
     else:
-        return elv_amended
+        n2pi = np.ceil(dpsi / (2.0 * np.pi))
+    d2pi = n2pi * 2.0 * np.pi
+    # map observed phase to correct extended phase
+    psi_obs = phi0 + d2pi
+    # solve for the elevation angle
+    E = (psi_obs / (2.0*np.pi*tfreq*1.0e3)
+         + tdiff*1e-6) * C - int_pos[0] * terms['sp0']
+
+    alpha = np.arcsin((E*int_pos[2]
+                       + np.sqrt(E*E * int_pos[2]**2
+                       - (int_pos[1]**2 + int_pos[2]**2)
+                       * (E*E - int_pos[1]*int_pos[1]*cp0*cp0)))
+                      / (int_pos[1]*int_pos[1] + int_pos[2]*int_pos[2]))
+    return alpha
+
+
+def calibrate_tdiff(dmap_data: List[dict], tdiffs,
+                    interferometer_offset: list = None,
+                    elv_bins=None, metric=None, cpus: int = 1,
+                    chunk_size: int = None) -> dict:
+    """
+    Evaluates candidate tdiff values for the calibration of the
+    interferometer timing, returning the distribution of the recalculated
+    elevation angles of all the echoes and summary metrics for each
+    candidate.
+
+    The phi0 values are gathered and the terms of the elevation equation
+    that do not depend on tdiff are computed once and shared by all the
+    candidates, which are evaluated in chunks.
+
+    Parameters
+    -----------
+    dmap_data: list of dictionaries or FitacfFrame
+        fitacf data
+    tdiffs: array-like of floats
+        candidate tdiff values in microseconds
+    interferometer_offset: list
+        select position of interferometer array wrt the main array
+        needs to be list of [X, Y, Z] e.g. [0.0, 100.0, 1.0]
+        Default: None, the interferometer offset of the radar's hardware
+    elv_bins: array-like
+        edges of the elevation angle bins of the histograms in degrees
+        Default: None, 1 degree bins from 0 to 90 degrees
+    metric: callable
+        optional objective function given the array of elevation angles
+        (degrees, NaN where there is no solution) of all the echoes for a
+        candidate and returning a float. Has to be picklable when cpus > 1.
+        Default: None
+    cpus: int
+        Number of cpus available/desired to run in parallel,
+        more than 1 evaluates the chunks of candidates in a pool of cpus
+        processes
+        Default: 1
+    chunk_size: int
+        number of candidates evaluated at once
+        Default: None, sized to keep about 10 million elevation values
+        in memory per chunk
+
+    Returns
+    -------
+    calibration: dict
+        tdiff: the candidate tdiff values
+        bins: the elevation bin edges
+        histogram: (candidate x bin) counts of the elevation angles
+        valid_fraction: fraction of the echoes with an elevation solution
+        mean: mean elevation angle of each candidate
+        median: median elevation angle of each candidate
+        metric: value of metric for each candidate, if metric is given
+    """
+    terms = elevation_terms(dmap_data, interferometer_offset)
+    tdiffs = np.asarray(tdiffs, dtype=float).reshape(-1)
+    if elv_bins is None:
+        elv_bins = np.arange(0, 91)
+    elv_bins = np.asarray(elv_bins, dtype=float)
+
+    if chunk_size is None:
+        chunk_size = max(1, int(1e7 // max(len(terms['phi0']), 1)))
+    if cpus > 1:
+        # at least one chunk for each process
+        chunk_size = min(chunk_size, int(np.ceil(len(tdiffs) / cpus)))
+    chunk_size = max(1, chunk_size)
+    chunks = [tdiffs[i: i + chunk_size]
+              for i in range(0, len(tdiffs), chunk_size)]
+
+    settings = (terms, elv_bins, metric)
+    if cpus > 1:
+        with ProcessPoolExecutor(max_workers=cpus) as executor:
+            # map returns the results in the order of the chunks
+            statistics = list(executor.map(_tdiff_statistics, chunks,
+                                           itertools.repeat(settings)))
+    else:
+        statistics = [_tdiff_statistics(chunk, settings)
+                      for chunk in chunks]
+
+    calibration = {'tdiff': tdiffs, 'bins': elv_bins}
+    keys = ['histogram', 'valid_fraction', 'mean', 'median']
+    if metric is not None:
+        keys.append('metric')
+    for key in keys:
+        if statistics:
+            calibration[key] = np.concatenate([chunk_statistics[key]
+                                               for chunk_statistics
+                                               in statistics])
+        elif key == 'histogram':
+            calibration[key] = np.zeros((0, len(elv_bins) - 1), dtype=int)
+        else:
+            calibration[key] = np.zeros(0)
+    return calibration
+
+
+def _tdiff_statistics(tdiffs: np.ndarray, settings: tuple) -> dict:
+    """
+    Elevation statistics of a chunk of candidate tdiff values, see
+    calibrate_tdiff. Defined at module level so it can be sent to the
+    processes of a pool.
+    """
+    terms, elv_bins, metric = settings
+    with np.errstate(invalid='ignore'):
+        elevations = np.degrees(solve_elevation(terms, tdiffs))
+    valid = ~np.isnan(elevations)
+    counts = valid.sum(axis=1)
+    statistics = {
+        'histogram': np.array([np.histogram(elv[found], bins=elv_bins)[0]
+                               for elv, found in zip(elevations, valid)],
+                              dtype=int).reshape(len(tdiffs), -1),
+        'valid_fraction': counts / max(elevations.shape[1], 1),
+        'mean': np.full(len(tdiffs), np.nan),
+        'median': np.full(len(tdiffs), np.nan)}
+    has_values = counts > 0
+    statistics['mean'][has_values] = \
+        np.nansum(elevations[has_values], axis=1) / counts[has_values]
+    statistics['median'][has_values] = \
+        np.nanmedian(elevations[has_values], axis=1)
+    if metric is not None:
+        statistics['metric'] = np.array([metric(elv) for elv in elevations],
+                                        dtype=float)
+    return statistics
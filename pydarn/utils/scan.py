@@ -20,7 +20,8 @@ into scans
 import datetime
 import numpy as np
 from typing import List
-from pydarn import time2datetime
+from pydarn import record_timestamps
+from pydarn.utils.plotting import cached_record_index
 
 
 def build_scan(dmap_data: List[dict]):
@@ -28,6 +29,8 @@ def build_scan(dmap_data: List[dict]):
     Returns list of size equal to number of records in dmap_data,
     with scan number for each record
 
+    The scan numbers are computed once per list of records and cached.
+
     Parameters
     ----------
     dmap_data: List(dict)
@@ -38,30 +41,64 @@ def build_scan(dmap_data: List[dict]):
         list of size equal to number of records in dmap_data, with scan number
     for each record
     """
-    # Set up scans for easy locating
-    # Makes a list of size (number of records), with the scan number for each
-    scan_mark = [sub['scan'] for sub in dmap_data]
-    timestamps = [time2datetime(rec) for rec in dmap_data]
-    timestamps_seen = []
-    current_scan = 0
-    first_time = True
-    beam_scan = np.zeros((len(dmap_data)))
-    for i in range(len(dmap_data)):
-        # Check if this record is concurrent with another record
-        if timestamps[i] in timestamps_seen:
-            beam_scan[i] = current_scan
-        else:
-            timestamps_seen.append(timestamps[i])   # Record the timestamp from this file
-
-            # Absolute value used due to some scan flags set as "-1"
-            if abs(scan_mark[i]) == 1 and not first_time:
-                current_scan += 1
-            first_time = False
-            beam_scan[i] = current_scan
+    return cached_record_index(dmap_data, 'scan', _compute_scan).copy()
+
+
+def scan_offsets(dmap_data: List[dict]) -> np.ndarray:
+    """
+    Returns the record offsets of each scan in dmap_data, the records
+    of scan i are dmap_data[offsets[i]:offsets[i+1]]
+
+    Parameters
+    ----------
+    dmap_data: List(dict)
+        list of records (dictionaries) representing dmap data
+    Returns
+    ----------
+    offsets: np.ndarray
+        array of size number of scans + 1 with the first record of each scan
+        followed by the number of records
+    """
+    return cached_record_index(dmap_data, 'scan_offsets',
+                               _compute_scan_offsets)
+
 
+def _compute_scan(dmap_data: List[dict]) -> np.ndarray:
+    """
+    Computes the scan number of each record
+
+    A new scan starts at a record with the scan flag set (absolute value
+    used due to some scan flags set as "-1"), unless the record is
+    concurrent with an earlier record, i.e. its time stamp was already seen.
+    """
+    beam_scan = np.zeros((len(dmap_data)))
+    if len(dmap_data) == 0:
+        return beam_scan
+    scan_mark = np.array([sub['scan'] for sub in dmap_data])
+    timestamps = record_timestamps(dmap_data)
+    # first record with each time stamp
+    _, first_seen = np.unique(timestamps, return_index=True)
+    new_scan = np.zeros(len(dmap_data), dtype=bool)
+    new_scan[first_seen] = True
+    new_scan &= np.abs(scan_mark) == 1
+    # the first record starts scan 0
+    new_scan[0] = False
+    beam_scan[:] = np.cumsum(new_scan)
     return beam_scan
 
 
+def _compute_scan_offsets(dmap_data: List[dict]) -> np.ndarray:
+    """
+    Computes the record offsets of each scan
+    """
+    beam_scan = build_scan(dmap_data)
+    if len(beam_scan) == 0:
+        return np.zeros(1, dtype=int)
+    # scan numbers never decrease, so each scan is a contiguous
+    # run of records
+    return np.searchsorted(beam_scan, np.arange(beam_scan[-1] + 2))
+
+
 def find_records_by_datetime(dmap_data: List[dict], search: datetime.datetime,
                              tolerance: datetime.timedelta):
     """
@@ -80,8 +117,17 @@ def find_records_by_datetime(dmap_data: List[dict], search: datetime.datetime,
     recs: List(dict)
         list of records that are close enough in time to search value
     """
-    timestamps = np.array([time2datetime(rec) for rec in dmap_data])
-    matches = np.nonzero(np.abs(timestamps - search) < tolerance)[0]
+    timestamps = record_timestamps(dmap_data)
+    search = np.datetime64(search, 'us')
+    tolerance = np.timedelta64(tolerance, 'us')
+    if np.all(timestamps[1:] >= timestamps[:-1]):
+        # binary search the window for time ordered records
+        matches = np.arange(np.searchsorted(timestamps, search - tolerance,
+                                            side='right'),
+                            np.searchsorted(timestamps, search + tolerance,
+                                            side='left'))
+    else:
+        matches = np.nonzero(np.abs(timestamps - search) < tolerance)[0]
     return [dmap_data[match] for match in matches]
 
 
@@ -101,6 +147,8 @@ def find_records_by_scan(dmap_data: List[dict], scan_index: int):
     recs: List(dict)
         list of records that match the search criteria
     """
-    scan_indices = build_scan(dmap_data)
-    matches = np.nonzero(scan_indices == scan_index)[0]
-    return [dmap_data[match] for match in matches]
\ No newline at end of file
+    offsets = scan_offsets(dmap_data)
+    if scan_index < 0 or scan_index >= len(offsets) - 1:
+        return []
+    return [dmap_data[match] for match in range(offsets[scan_index],
+                                                offsets[scan_index + 1])]
@@ -15,15 +15,21 @@
 #            the hardware format
 # 2023-01-21 CJM Added ICE and ICW defaults and hdw link
 # 2024-01-24 CJM added NSSC radars and updated hdw link
+# 2026-10-16 SuperDARNRadars.radars reads the hardware files on first access
+#            and the hardware file rows can be cached in a JSON index
+# 2026-10-16 read_hdw_file binary searches the parsed hardware history
 """
 This module contains SuperDARN radar information
 """
+import bisect
 import glob
+import json
 import os
 import pydarn
 import shutil
 
-from typing import NamedTuple
+from collections.abc import Mapping
+from typing import List, NamedTuple
 from enum import Enum
 from datetime import datetime
 from urllib import request
@@ -82,6 +88,119 @@ def get_hdw_files(force: bool = True, version: str = None):
                 os.remove(zip_path)
             if os.path.exists(unzip_dir_path):
                 shutil.rmtree(unzip_dir_path, ignore_errors=True)
+        # the rows of the new files are indexed so they do not need to be
+        # split again, and the radars read from the old files are read again
+        try:
+            build_hdw_index()
+        except OSError:
+            pass
+        SuperDARNRadars.radars.clear_cache()
+
+
+# name of the JSON index of the hardware file rows in the hdw folder
+HDW_INDEX_FILE = 'hdw.index.json'
+# version of the index layout, indexes of other versions are not used
+_HDW_INDEX_VERSION = 3
+# the rows and parsed history of each hardware file read in this session
+_hdw_rows_cache = {}
+_hdw_history_cache = {}
+# hdw folder to the index read from it in this session
+_hdw_indexes = {}
+
+
+def build_hdw_index(hdw_path: str = None):
+    """
+    Writes a JSON index of the rows of all the hardware files in the hdw
+    folder. Each entry is kept with the modification time and size of its
+    hardware file, the index is used instead of reading and splitting the
+    text of a hardware file as long as the file has not changed since the
+    index was built.
+
+    Parameters
+    ----------
+        hdw_path: str
+            folder of the hardware files
+            default: None, the hdw folder of pyDARN
+
+    Returns
+    -------
+    index_file: str
+        path of the written index
+    """
+    if hdw_path is None:
+        hdw_path = os.path.join(os.path.dirname(__file__), 'hdw')
+    radars = {}
+    for hdw_file in sorted(glob.glob(os.path.join(hdw_path, 'hdw.dat.*'))):
+        abbrv = hdw_file.split('hdw.dat.')[-1]
+        with open(hdw_file, 'rb') as reader:
+            content = reader.read()
+        radars[abbrv] = [*_hdw_signature(hdw_file), _split_hdw_rows(content)]
+    index_file = os.path.join(hdw_path, HDW_INDEX_FILE)
+    with open(index_file, 'w') as writer:
+        json.dump({'version': _HDW_INDEX_VERSION, 'radars': radars}, writer)
+    _hdw_indexes.pop(os.path.normpath(hdw_path), None)
+    _hdw_rows_cache.clear()
+    _hdw_history_cache.clear()
+    return index_file
+
+
+def _hdw_signature(hdw_file: str) -> tuple:
+    """
+    Returns the (modification time, size) of a hardware file, used to
+    tell if it has changed
+    """
+    stat = os.stat(hdw_file)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _split_hdw_rows(content: bytes) -> List[List[str]]:
+    """
+    Splits the text of a hardware file into the rows of parameters,
+    comment and empty lines are skipped
+    """
+    return [line.split() for line in content.decode().splitlines(True)
+            if '#' not in line and len(line.split()) > 1]
+
+
+def _read_hdw_index(hdw_path: str) -> dict:
+    """
+    Reads the JSON index of the hardware file rows of a folder once per
+    session, returns an empty index if there is none or it can not be read
+    """
+    hdw_path = os.path.normpath(hdw_path)
+    if hdw_path not in _hdw_indexes:
+        _hdw_indexes[hdw_path] = {}
+        try:
+            with open(os.path.join(hdw_path, HDW_INDEX_FILE)) as reader:
+                index = json.load(reader)
+        except (OSError, ValueError):
+            return _hdw_indexes[hdw_path]
+        if isinstance(index, dict) and\
+           index.get('version') == _HDW_INDEX_VERSION:
+            _hdw_indexes[hdw_path] = index.get('radars', {})
+    return _hdw_indexes[hdw_path]
+
+
+def _hdw_rows(hdw_file: str, abbrv: str) -> List[List[str]]:
+    """
+    Returns the rows of parameters of a hardware file, from the rows read
+    in this session, the JSON index or by splitting the file. The file is
+    only read if it has changed since the rows were cached or indexed.
+    Raises FileNotFoundError if the hardware file does not exist.
+    """
+    signature = _hdw_signature(hdw_file)
+    cached = _hdw_rows_cache.get(abbrv)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    indexed = _read_hdw_index(os.path.dirname(hdw_file)).get(abbrv)
+    if indexed is not None and tuple(indexed[:2]) == signature:
+        rows = indexed[2]
+    else:
+        with open(hdw_file, 'rb') as reader:
+            rows = _split_hdw_rows(reader.read())
+    _hdw_rows_cache[abbrv] = (signature, rows)
+    return rows
+
 
 def read_hdw_file(abbrv, date: datetime = None, update: bool = False):
     """
@@ -107,155 +226,194 @@ def read_hdw_file(abbrv, date: datetime = None, update: bool = False):
     ------
     HardwareFileNotFoundError raised when there is no hardware file found for
     the given abbreviation
+
+    See Also
+    --------
+    read_hdw_history : all the hardware information of a radar
     """
     if date is None:
         date = datetime.now()
+    history = read_hdw_history(abbrv, update=update)
+    # the last entry valid at the date, dates before the first entry
+    # get the first entry
+    j = max(bisect.bisect_right(history.epochs, date) - 1, 0)
+    return history.hardware_info[j]
+
 
+def read_hdw_history(abbrv, update: bool = False):
+    """
+    Returns all the entries of the hardware file for the associated
+    abbreviation of the radar name, sorted by the date they are valid from.
+
+    The hardware file is parsed once per session (or when it changes),
+    so looking up the hardware information at many dates only needs
+    a binary search of the epochs.
+
+    Parameters
+    ----------
+        abbrv : str
+            Radars 3 letter assigned abbreviation
+        update: bool
+            If True this will update the hardware files again
+            without re-installing pydarn
+            default: False
+    Return
+    ------
+    _HdwHistory object of the sorted epochs and _HdwInfo object of each
+        entry
+
+    Raises
+    ------
+    HardwareFileNotFoundError raised when there is no hardware file found for
+    the given abbreviation
+    """
     hdw_path = os.path.dirname(__file__)+'/hdw/'
     hdw_file = "{path}/hdw.dat.{radar}".format(path=hdw_path, radar=abbrv)
-    hdw_data = []
-    hdw_lines_date = []
     # if the file does not exist then try
     # and download it
     if os.path.exists(hdw_file) is False:
         get_hdw_files(force=update)
     try:
-        with open(hdw_file, 'r') as reader:
-            lines = reader.readlines()
-            for i in range(len(lines)):
-                if '#' not in lines[i] and len(lines[i].split()) > 1:
-                    hdw_data.append(lines[i].split())
-                    """
-                    Hardware files give the year and seconds from the beginning
-                    of that year. Thus to check the date if it corresponds we
-                    need to convert to a datetime object and then compare.
-                    """
-                    j = len(hdw_data)-1
-                    hdw_lines_date.append(
-                        datetime(year=int(hdw_data[j][2][0:4]),
-                                 month=int(hdw_data[j][2][4:6]),
-                                 day=int(hdw_data[j][2][6:8]),
-                                 hour=int(hdw_data[j][3][0:2]),
-                                 minute=int(hdw_data[j][3][3:5]),
-                                 second=int(hdw_data[j][3][6:8])))
-                    if hdw_lines_date[j] > date:
-                        j = j-1
-                        break
-            """
-            Hardware data array positions definitions:
-                0: Station ID (unique numerical value).
-                1: Status code (1 operational, -1 offline).
-                2: First date that parameter string is valid
-                   (YYYYMMDD).
-                3: First time that parameter string is valid
-                   (HH:MM:SS).
-                4: Geographic latitude of radar site
-                   (Given in decimal degrees to 3
-                   decimal places. Southern hemisphere
-                   values are negative)
-                5: Geographic longitude of radar site
-                   (Given in decimal degrees to
-                   3 decimal places.
-                   West longitude values are negative)
-                6: Altitude of the radar site (meters)
-                7: Physical scanning boresight
-                   (Direction of the center beam, measured in
-                   degrees relative to geographic north.
-                   CCW rotations are negative.)
-                8: Electronic shift to radar scanning
-                   boresight (Degrees relative to
-                   physical antenna boresight.
-                   Normally 0.0 degrees)
-                9: Beam separation (Angular
-                   separation in degrees between adjacent
-                   beams. Normally 3.24 degrees)
-                10: Velocity sign (At the radar level,
-                    backscattered signals with
-                    frequencies above the transmitted
-                    frequency are assigned positive
-                    Doppler velocities while backscattered
-                    signals with frequencies below
-                    the transmitted frequency are assigned
-                    negative Doppler velocity. This
-                    convention can be reversed by changes
-                    in receiver design or in the
-                    data sampling rate. This parameter
-                    is set to +1 or -1 to maintain the
-                    convention.)
-                11: Phase sign (Cabling errors can
-                    lead to a 180 degree shift of the
-                    interferometry phase measurement.
-                    +1 indicates that the sign is
-                    correct, -1 indicates that it must be flipped.)
-                12: Tdiff [Channel A]
-                    (Propagation time from interferometer
-                    array antenna to phasing matrix input
-                    minus propagation time from main array antenna
-                    through transmitter to phasing matrix input.
-                    Units are decimal
-                    microseconds)
-                13: Tdiff [Channel B]
-                    (Propagation time from interferometer
-                    array antenna to phasing matrix input minus
-                    propagation time from main array antenna
-                    through transmitter to phasing matrix input.
-                    Units are decimal microseconds)
-                14: Interferometer X offset
-                    (Displacement of midpoint of interferometer
-                    array from midpoint of main array,
-                    along the line of antennas
-                    with +X toward higher antenna numbers.
-                    Units are meters)
-                15: Interferometer Y offset
-                    (Displacement of midpoint of
-                    interferometer array from midpoint of
-                    main array, along the array
-                    normal direction with +Y in the direction of
-                    the array normal. Units are meters)
-                16: Interferometer Z offset
-                    (Displacement of midpoint of
-                    interferometer array from midpoint of
-                    main array, in terms of altitude
-                    difference with +Z up. Units are meters)
-                17: Analog Rx rise time
-                    (Time given in microseconds. Time delays of
-                    less than ~10 microseconds can be ignored.
-                    If narrow-band filters are
-                    used in analog receivers or front-ends,
-                    the time delays should be
-                    specified.)
-                18: Analog Rx attenuator step (dB)
-                19: Analog attenuation stages (Number of stages.
-                    This is used for gain control of an analog
-                    receiver or front-end.)
-                20: Maximum of range gates used
-                21: Maximum number of beams
-            """
-            return _HdwInfo(stid=int(hdw_data[j][0]),
-                            status=Status(int(hdw_data[j][1])),
-                            abbrev=abbrv,
-                            date=hdw_lines_date[j],
-                            geographic=_Coord(float(hdw_data[j][4]),
-                                              float(hdw_data[j][5]),
-                                              float(hdw_data[j][6])),
-                            boresight=_Boresight(float(hdw_data[j][7]),
-                                                 float(hdw_data[j][8])),
-                            beam_separation=float(hdw_data[j][9]),
-                            velocity_sign=float(hdw_data[j][10]),
-                            phase_sign=float(hdw_data[j][11]),
-                            tdiff=_Tdiff(float(hdw_data[j][12]),
-                                         float(hdw_data[j][13])),
-                            interferometer_offset=_InterferometerOffset(
-                                float(hdw_data[j][14]),
-                                float(hdw_data[j][15]),
-                                float(hdw_data[j][16])),
-                            rx_rise_time=float(hdw_data[j][17]),
-                            rx_attenuator=float(hdw_data[j][18]),
-                            attenuation_stages=int(hdw_data[j][19]),
-                            gates=int(hdw_data[j][20]),
-                            beams=int(hdw_data[j][21]))
+        rows = _hdw_rows(hdw_file, abbrv)
     except FileNotFoundError:
         raise pydarn.radar_exceptions.HardwareFileNotFoundError(abbrv)
+    cached = _hdw_history_cache.get(abbrv)
+    if cached is not None and cached[0] is rows:
+        return cached[1]
+
+    entries = [_hdw_info(row, abbrv) for row in rows]
+    # stable sort so entries valid from the same date keep their order
+    entries.sort(key=lambda hdw_info: hdw_info.date)
+    history = _HdwHistory(epochs=[hdw_info.date for hdw_info in entries],
+                          hardware_info=entries)
+    _hdw_history_cache[abbrv] = (rows, history)
+    return history
+
+
+def _hdw_info(row: List[str], abbrv: str):
+    """
+    Converts a row of parameters of a hardware file to a _HdwInfo object
+
+    Hardware data array positions definitions:
+        0: Station ID (unique numerical value).
+        1: Status code (1 operational, -1 offline).
+        2: First date that parameter string is valid
+           (YYYYMMDD).
+        3: First time that parameter string is valid
+           (HH:MM:SS).
+        4: Geographic latitude of radar site
+           (Given in decimal degrees to 3
+           decimal places. Southern hemisphere
+           values are negative)
+        5: Geographic longitude of radar site
+           (Given in decimal degrees to
+           3 decimal places.
+           West longitude values are negative)
+        6: Altitude of the radar site (meters)
+        7: Physical scanning boresight
+           (Direction of the center beam, measured in
+           degrees relative to geographic north.
+           CCW rotations are negative.)
+        8: Electronic shift to radar scanning
+           boresight (Degrees relative to
+           physical antenna boresight.
+           Normally 0.0 degrees)
+        9: Beam separation (Angular
+           separation in degrees between adjacent
+           beams. Normally 3.24 degrees)
+        10: Velocity sign (At the radar level,
+            backscattered signals with
+            frequencies above the transmitted
+            frequency are assigned positive
+            Doppler velocities while backscattered
+            signals with frequencies below
+            the transmitted frequency are assigned
+            negative Doppler velocity. This
+            convention can be reversed by changes
+            in receiver design or in the
+            data sampling rate. This parameter
+            is set to +1 or -1 to maintain the
+            convention.)
+        11: Phase sign (Cabling errors can
+            lead to a 180 degree shift of the
+            interferometry phase measurement.
+            +1 indicates that the sign is
+            correct, -1 indicates that it must be flipped.)
+        12: Tdiff [Channel A]
+            (Propagation time from interferometer
+            array antenna to phasing matrix input
+            minus propagation time from main array antenna
+            through transmitter to phasing matrix input.
+            Units are decimal
+            microseconds)
+        13: Tdiff [Channel B]
+            (Propagation time from interferometer
+            array antenna to phasing matrix input minus
+            propagation time from main array antenna
+            through transmitter to phasing matrix input.
+            Units are decimal microseconds)
+        14: Interferometer X offset
+            (Displacement of midpoint of interferometer
+            array from midpoint of main array,
+            along the line of antennas
+            with +X toward higher antenna numbers.
+            Units are meters)
+        15: Interferometer Y offset
+            (Displacement of midpoint of
+            interferometer array from midpoint of
+            main array, along the array
+            normal direction with +Y in the direction of
+            the array normal. Units are meters)
+        16: Interferometer Z offset
+            (Displacement of midpoint of
+            interferometer array from midpoint of
+            main array, in terms of altitude
+            difference with +Z up. Units are meters)
+        17: Analog Rx rise time
+            (Time given in microseconds. Time delays of
+            less than ~10 microseconds can be ignored.
+            If narrow-band filters are
+            used in analog receivers or front-ends,
+            the time delays should be
+            specified.)
+        18: Analog Rx attenuator step (dB)
+        19: Analog attenuation stages (Number of stages.
+            This is used for gain control of an analog
+            receiver or front-end.)
+        20: Maximum of range gates used
+        21: Maximum number of beams
+    """
+    # Hardware files give the date and time that the row is valid from
+    epoch = datetime(year=int(row[2][0:4]),
+                     month=int(row[2][4:6]),
+                     day=int(row[2][6:8]),
+                     hour=int(row[3][0:2]),
+                     minute=int(row[3][3:5]),
+                     second=int(row[3][6:8]))
+    return _HdwInfo(stid=int(row[0]),
+                    status=Status(int(row[1])),
+                    abbrev=abbrv,
+                    date=epoch,
+                    geographic=_Coord(float(row[4]),
+                                      float(row[5]),
+                                      float(row[6])),
+                    boresight=_Boresight(float(row[7]),
+                                         float(row[8])),
+                    beam_separation=float(row[9]),
+                    velocity_sign=float(row[10]),
+                    phase_sign=float(row[11]),
+                    tdiff=_Tdiff(float(row[12]),
+                                 float(row[13])),
+                    interferometer_offset=_InterferometerOffset(
+                        float(row[14]),
+                        float(row[15]),
+                        float(row[16])),
+                    rx_rise_time=float(row[17]),
+                    rx_attenuator=float(row[18]),
+                    attenuation_stages=int(row[19]),
+                    gates=int(row[20]),
+                    beams=int(row[21]))
+
 
 class Hemisphere(Enum):
     """
@@ -437,6 +595,21 @@ class _HdwInfo(NamedTuple):
     beams: int
 
 
+class _HdwHistory(NamedTuple):
+    """
+    Class used to store all the entries of a hardware file
+
+    Attributes
+    ----------
+    epochs : List[datetime]
+        sorted dates that each entry is valid from
+    hardware_info : List[_HdwInfo]
+        hardware information of each entry
+    """
+    epochs: List[datetime]
+    hardware_info: List[_HdwInfo]
+
+
 class _Radar(NamedTuple):
     """
     Class used to combine all Radar information
@@ -520,6 +693,46 @@ class RadarID(Enum):
     ZHO = 19
 
 
+class _RadarsMapping(Mapping):
+    """
+    Read-only mapping of RadarID to _Radar objects that reads the hardware
+    file of a radar the first time the radar is accessed
+
+    Parameters
+    ----------
+        radars: dict
+            dictionary of RadarID to a tuple of the _Radar fields with the
+            radar abbreviation in place of the hardware information
+    """
+
+    def __init__(self, radars: dict):
+        self._entries = radars
+        self._radars = {}
+
+    def __getitem__(self, stid: RadarID):
+        if stid not in self._radars:
+            entry = self._entries[stid]
+            self._radars[stid] = _Radar(*entry[:-1],
+                                        hardware_info=read_hdw_file(entry[-1]))
+        return self._radars[stid]
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, stid):
+        return stid in self._entries
+
+    def clear_cache(self):
+        """
+        Forgets the hardware information read so far, it is read again
+        on the next access, e.g. after updating the hardware files
+        """
+        self._radars.clear()
+
+
 class SuperDARNRadars():
     """
     Class containing a dictionary of Nested Named Tuples with information
@@ -527,161 +740,162 @@ class SuperDARNRadars():
 
     Attributes
     ----------
-        radars: dict
-            dictionary of each SuperDARN radar with key being STID value and
+        radars: Mapping
+            mapping of each SuperDARN radar with key being STID value and
             a _Radar object containing the name, institutional and hardware
-            information of the radar
+            information of the radar. The hardware file of a radar is only
+            read the first time the radar is accessed.
 
     See Also
     --------
         _Radar : radar object containing radar information
         read_hdw_file : function to read hardware information for a given radar
     """
-    radars = {RadarID.ADE: _Radar('Adak Island East',
+    radars = _RadarsMapping({RadarID.ADE: ('Adak Island East',
                           'Penn State University', Hemisphere.North,
-                                  75, [47, -172], [42, -106], read_hdw_file('ade')),
-              RadarID.ADW: _Radar('Adak Island West', 'Penn State University',
+                                  75, [47, -172], [42, -106], 'ade'),
+              RadarID.ADW: ('Adak Island West', 'Penn State University',
                                   Hemisphere.North, 75, [47, 178], [42, -116],
-                                  read_hdw_file('adw')),
-              RadarID.BKS: _Radar('Blackstone', 'Virginia Tech', Hemisphere.North,
-                                  100, [32, -78], [44, -5], read_hdw_file('bks')),
-              RadarID.CVE: _Radar('Christmas Valley East', 'Dartmouth College',
+                                  'adw'),
+              RadarID.BKS: ('Blackstone', 'Virginia Tech', Hemisphere.North,
+                                  100, [32, -78], [44, -5], 'bks'),
+              RadarID.CVE: ('Christmas Valley East', 'Dartmouth College',
                                   Hemisphere.North, 100, [38, -115], [48, -53],
-                                  read_hdw_file('cve')),
-              RadarID.CVW: _Radar('Christmas Valley West', 'Dartmouth College',
+                                  'cve'),
+              RadarID.CVW: ('Christmas Valley West', 'Dartmouth College',
                                   Hemisphere.North, 100, [38, -125], [48, -63],
-                                  read_hdw_file('cvw')),
-              RadarID.CLY: _Radar('Clyde River', 'University of Saskatchewan',
+                                  'cvw'),
+              RadarID.CLY: ('Clyde River', 'University of Saskatchewan',
                                   Hemisphere.North, 100, [65, -68], [72, 17],
-                                  read_hdw_file('cly')),
-              RadarID.FHE: _Radar('Fort Hays East', 'Virginia Tech', Hemisphere.North,
-                                  100, [34, -94], [45, -25], read_hdw_file('fhe')),
-              RadarID.FHW: _Radar('Fort Hays West', 'Virginia Tech', Hemisphere.North,
-                                  100, [34, -104], [45, -35], read_hdw_file('fhw')),
-              RadarID.GBR: _Radar('Goose Bay', 'Virginia Tech', Hemisphere.North,
-                                  100, [48, -60], [54, 23], read_hdw_file('gbr')),
-              RadarID.HAN: _Radar('Hankasalmi', 'University of Leicester',
+                                  'cly'),
+              RadarID.FHE: ('Fort Hays East', 'Virginia Tech', Hemisphere.North,
+                                  100, [34, -94], [45, -25], 'fhe'),
+              RadarID.FHW: ('Fort Hays West', 'Virginia Tech', Hemisphere.North,
+                                  100, [34, -104], [45, -35], 'fhw'),
+              RadarID.GBR: ('Goose Bay', 'Virginia Tech', Hemisphere.North,
+                                  100, [48, -60], [54, 23], 'gbr'),
+              RadarID.HAN: ('Hankasalmi', 'University of Leicester',
                                   Hemisphere.North, 70, [57, 27], [54, 102],
-                                  read_hdw_file('han')),
-              RadarID.HJE: _Radar('Hejing East',
+                                  'han'),
+              RadarID.HJE: ('Hejing East',
                          'National Space Science Center,'
                          'Chinese Academy of Sciences',
                                   Hemisphere.North, 100, [40, 87], [36, 163],
-                                  read_hdw_file('hje')),
-              RadarID.HJW: _Radar('Hejing West',
+                                  'hje'),
+              RadarID.HJW: ('Hejing West',
                          'National Space Science Center,'
                          'Chinese Academy of Sciences',
                                   Hemisphere.North, 100, [40, 81], [36, 153],
-                                  read_hdw_file('hjw')),
-              RadarID.HOK: _Radar('Hokkaido East', 'Nagoya University',
+                                  'hjw'),
+              RadarID.HOK: ('Hokkaido East', 'Nagoya University',
                                   Hemisphere.North, 110, [39, 149], [35, -139],
-                                  read_hdw_file('hok')),
-              RadarID.HKW: _Radar('Hokkaido West', 'Nagoya University',
+                                  'hok'),
+              RadarID.HKW: ('Hokkaido West', 'Nagoya University',
                                   Hemisphere.North, 110, [39, 139], [35, -149],
-                                  read_hdw_file('hkw')),
-              RadarID.ICE: _Radar('Iceland East', 'Dartmouth College',
+                                  'hkw'),
+              RadarID.ICE: ('Iceland East', 'Dartmouth College',
                                   Hemisphere.North, 100, [61, -16], [60, 70],
-                                  read_hdw_file('ice')),
-              RadarID.ICW: _Radar('Iceland West', 'Dartmouth College',
+                                  'ice'),
+              RadarID.ICW: ('Iceland West', 'Dartmouth College',
                                   Hemisphere.North, 100, [61, -26], [60, 60],
-                                  read_hdw_file('icw')),
-              RadarID.INV: _Radar('Inuvik', 'University of Saskatchewan',
+                                  'icw'),
+              RadarID.INV: ('Inuvik', 'University of Saskatchewan',
                                   Hemisphere.North, 75, [63, -134], [66, -80],
-                                  read_hdw_file('inv')),
-              RadarID.JME: _Radar('Jiamusi East',
+                                  'inv'),
+              RadarID.JME: ('Jiamusi East',
                          'National Space Science Center,'
                          'Chinese Academy of Sciences',
                                   Hemisphere.North, 100, [42, 130], [37, -155],
-                                  read_hdw_file('jme')),
-              RadarID.KAP: _Radar('Kapuskasing', 'Virginia Tech', Hemisphere.North,
-                                  75, [44, -82], [54, -7], read_hdw_file('kap')),
-              RadarID.KSR: _Radar('King Salmon',
+                                  'jme'),
+              RadarID.KAP: ('Kapuskasing', 'Virginia Tech', Hemisphere.North,
+                                  75, [44, -82], [54, -7], 'kap'),
+              RadarID.KSR: ('King Salmon',
                                   'Penn State University', Hemisphere.North,
-                                  75, [54, -162], [52, -99], read_hdw_file('ksr')),
-              RadarID.KOD: _Radar('Kodiak', 'Penn State University',
+                                  75, [54, -162], [52, -99], 'ksr'),
+              RadarID.KOD: ('Kodiak', 'Penn State University',
                                   Hemisphere.North, 110, [53, -152], [52, -92],
-                                  read_hdw_file('kod')),
-              RadarID.LJE: _Radar('Longjing East',
+                                  'kod'),
+              RadarID.LJE: ('Longjing East',
                          'National Space Science Center,'
                          'Chinese Academy of Sciences',
                                   Hemisphere.North, 100, [39, 132], [32, -151],
-                                  read_hdw_file('lje')),
-              RadarID.LJW: _Radar('Longjing West',
+                                  'lje'),
+              RadarID.LJW: ('Longjing West',
                          'National Space Science Center,'
                          'Chinese Academy of Sciences',
                                   Hemisphere.North, 100, [39, 126], [42, -161],
-                                  read_hdw_file('ljw')),
-              RadarID.LYR: _Radar('Longyearbyen', 'University of Centre in Svalbard',
+                                  'ljw'),
+              RadarID.LYR: ('Longyearbyen', 'University of Centre in Svalbard',
                                   Hemisphere.North, 70, [73, 16], [71, 108],
-                                  read_hdw_file('lyr')),
-              RadarID.PYK: _Radar('Pykkvibaer', 'University of Leicester',
+                                  'lyr'),
+              RadarID.PYK: ('Pykkvibaer', 'University of Leicester',
                                   Hemisphere.North, 70, [58, -19], [56, 75],
-                                  read_hdw_file('pyk')),
-              RadarID.PGR: _Radar('Prince George', 'University of Saskatchewan',
+                                  'pyk'),
+              RadarID.PGR: ('Prince George', 'University of Saskatchewan',
                                   Hemisphere.North, 75, [49, -123], [55, -61],
-                                  read_hdw_file('pgr')),
-              RadarID.RKN: _Radar('Rankin Inlet', 'University of Saskatchewan',
+                                  'pgr'),
+              RadarID.RKN: ('Rankin Inlet', 'University of Saskatchewan',
                                   Hemisphere.North, 75, [58, -92], [66, -21],
-                                  read_hdw_file('rkn')),
-              RadarID.SAS: _Radar('Saskatoon', 'University of Saskatchewan',
+                                  'rkn'),
+              RadarID.SAS: ('Saskatoon', 'University of Saskatchewan',
                                   Hemisphere.North, 75, [47, -107], [56, -41],
-                                  read_hdw_file('sas')),
-              RadarID.SCH: _Radar('Schefferville', 'CNRS/LPCE', Hemisphere.North,
-                                  75, [50, -67], [60, 14], read_hdw_file('sch')),
-              RadarID.SZE: _Radar('Siziwang East',
+                                  'sas'),
+              RadarID.SCH: ('Schefferville', 'CNRS/LPCE', Hemisphere.North,
+                                  75, [50, -67], [60, 14], 'sch'),
+              RadarID.SZE: ('Siziwang East',
                          'National Space Science Center,'
                          'Chinese Academy of Sciences',
                                   Hemisphere.North, 100, [38, 115], [37, -169],
-                                  read_hdw_file('sze')),
-              RadarID.SZW: _Radar('Siziwang West',
+                                  'sze'),
+              RadarID.SZW: ('Siziwang West',
                          'National Space Science Center,'
                          'Chinese Academy of Sciences',
                                   Hemisphere.North, 100, [38, 109], [37, -179],
-                                  read_hdw_file('szw')),
-              RadarID.STO: _Radar('Stokkseyri', 'Lancaster University',
+                                  'szw'),
+              RadarID.STO: ('Stokkseyri', 'Lancaster University',
                                   Hemisphere.North, 75, [58, -29], [56, 65],
-                                  read_hdw_file('sto')),
-              RadarID.WAL: _Radar('Wallops Island', 'JHU Applied Physics Laboratory',
+                                  'sto'),
+              RadarID.WAL: ('Wallops Island', 'JHU Applied Physics Laboratory',
                                   Hemisphere.North, 100, [33, -75], [44, 5],
-                                  read_hdw_file('wal')),
-              RadarID.BPK: _Radar('Buckland Park', 'La Trobe University',
+                                  'wal'),
+              RadarID.BPK: ('Buckland Park', 'La Trobe University',
                                   Hemisphere.South, 75, [-30, 138], [-40, -146],
-                                  read_hdw_file('bpk')),
-              RadarID.DCE: _Radar('Dome C East',
+                                  'bpk'),
+              RadarID.DCE: ('Dome C East',
                          'Institute for Space Astrophysics and Planetology',
                                   Hemisphere.South, 75, [-80, 130], [-83, 0],
-                                  read_hdw_file('dce')),
-              RadarID.DCN: _Radar('Dome C North',
+                                  'dce'),
+              RadarID.DCN: ('Dome C North',
                          'Institute for Space Astrophysics and Planetology',
                                   Hemisphere.South, 75, [-75, 112], [-85, 90],
-                                  read_hdw_file('dcn')),
-              RadarID.FIR: _Radar('Falkland Islands', 'British Antarctic Survey',
+                                  'dcn'),
+              RadarID.FIR: ('Falkland Islands', 'British Antarctic Survey',
                                   Hemisphere.South, 110, [-47, -59], [-35, 10],
-                                  read_hdw_file('fir')),
-              RadarID.HAL: _Radar('Halley', 'British Antarctic Survey',
+                                  'fir'),
+              RadarID.HAL: ('Halley', 'British Antarctic Survey',
                                   Hemisphere.South, 100, [-71, -27], [-58, 30],
-                                  read_hdw_file('hal')),
-              RadarID.KER: _Radar('Kerguelen', 'IRAP/CNRS/IPEV', Hemisphere.South,
-                                  75, [-44, 70], [-53, 124], read_hdw_file('ker')),
-              RadarID.MCM: _Radar('McMurdo', 'Penn State University',
+                                  'hal'),
+              RadarID.KER: ('Kerguelen', 'IRAP/CNRS/IPEV', Hemisphere.South,
+                                  75, [-44, 70], [-53, 124], 'ker'),
+              RadarID.MCM: ('McMurdo', 'Penn State University',
                                   Hemisphere.South, 75, [-78, 187], [-75, -36],
-                                  read_hdw_file('mcm')),
-              RadarID.SAN: _Radar('SANAE', 'South African National Space Agency',
+                                  'mcm'),
+              RadarID.SAN: ('SANAE', 'South African National Space Agency',
                                   Hemisphere.South, 110, [-67, -3], [-60, 45],
-                                  read_hdw_file('san')),
-              RadarID.SPS: _Radar('South Pole Station',
+                                  'san'),
+              RadarID.SPS: ('South Pole Station',
                          'Penn State University', Hemisphere.South,
-                                  75, [-87, 12], [-74, 25], read_hdw_file('sps')),
-              RadarID.SYE: _Radar('Syowa East', 'National Institute of Polar Research',
+                                  75, [-87, 12], [-74, 25], 'sps'),
+              RadarID.SYE: ('Syowa East', 'National Institute of Polar Research',
                                   Hemisphere.South, 75, [-64, 45], [-62, 82],
-                                  read_hdw_file('sye')),
-              RadarID.SYS: _Radar('Syowa South', 'National Institute of Polar Research',
+                                  'sye'),
+              RadarID.SYS: ('Syowa South', 'National Institute of Polar Research',
                                   Hemisphere.South, 80, [-66, 30], [-62, 68],
-                                  read_hdw_file('sys')),
-              RadarID.TIG: _Radar('Tiger', 'La Trobe University', Hemisphere.South,
-                                  75, [-38, 147], [-49, -133], read_hdw_file('tig')),
-              RadarID.UNW: _Radar('Unwin', 'La Trobe University', Hemisphere.South,
-                                  75, [-42, 168], [-49, -105], read_hdw_file('unw')),
-              RadarID.ZHO: _Radar('Zhongshan', 'Polar Research Institute of China',
+                                  'sys'),
+              RadarID.TIG: ('Tiger', 'La Trobe University', Hemisphere.South,
+                                  75, [-38, 147], [-49, -133], 'tig'),
+              RadarID.UNW: ('Unwin', 'La Trobe University', Hemisphere.South,
+                                  75, [-42, 168], [-49, -105], 'unw'),
+              RadarID.ZHO: ('Zhongshan', 'Polar Research Institute of China',
                                   Hemisphere.South, 70, [-67, 64], [-70, 99],
-                                  read_hdw_file('zho'))}
+                                  'zho')})
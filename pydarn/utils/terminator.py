@@ -14,7 +14,7 @@
 # is converted from Carley Martin's JavaScript terminator.js code
 #
 # Modification:
-# 
+# 2026-10-16 added antisolar_positions and night_mask for arrays of times
 
 import numpy as np
 import datetime as dt
@@ -150,8 +150,7 @@ def solar_geometric_mean_longitude(centuries):
     # Corrections from J.Meeus Astronomical Algorithms book
     el = (280.46646 + centuries * (36000.76983 + centuries * 0.0003032)) % 360
     # Give value between 0 and 360
-    if el < 0:
-        el = el + 360
+    el = np.where(el < 0, el + 360, el)
     mean_long = np.radians(el)
     return mean_long
 
@@ -299,3 +298,72 @@ def terminator(date, height):
     
     return antisolar_point, arc_length, arc_angle
 
+
+def antisolar_positions(dates):
+    """
+    antisolar positions calculates the latitude and longitude of the
+    anti-sub-solar position on Earth for an array of date times in one go
+
+    Parameters
+    ----------
+    dates : list of datetime objects or np.ndarray of datetime64
+            date times of interest
+
+    Returns
+    -------
+    lons: np.ndarray
+        longitudes of the anti-sub-solar position of each date time
+    lats: np.ndarray
+        latitudes of the anti-sub-solar position of each date time
+    """
+    dates = np.asarray(dates, dtype='datetime64[us]')
+    # Convert Greg date to Julian date (given in partial centuries)
+    centuries = (dates - np.datetime64('2000-01-01T12:00')) /\
+        np.timedelta64(1, 'D') / 36525
+    # Fraction of the day passed since midnight
+    day_fraction = (dates - dates.astype('datetime64[D]')) /\
+        np.timedelta64(1, 'D')
+    longitude = -day_fraction * 360 - 180
+    # Sub-solar position in degrees
+    lons = longitude - np.degrees(equation_of_time(centuries))
+    lats = np.degrees(solar_declination(centuries))
+    # antipode of the sub-solar position
+    return lons + 180, -lats
+
+
+def night_mask(dates, lats, lons, height):
+    """
+    night mask determines which positions are in the Earth's shadow at a
+    given height for an array of date times. The great circle distances from
+    all the positions to the anti-sub-solar points of all the date times are
+    broadcast in a single haversine calculation.
+
+    Parameters
+    ----------
+    dates : list of datetime objects or np.ndarray of datetime64
+            date times of interest
+    lats : np.ndarray
+            geographic latitudes of the positions [deg]
+    lons : np.ndarray
+            geographic longitudes of the positions [deg]
+    height : float
+            height in the ionosphere [km]
+
+    Returns
+    -------
+    is_night: np.ndarray
+        (date times x positions) boolean array, True where the position is
+        in darkness at that date time
+    """
+    antisolar_lons, antisolar_lats = antisolar_positions(dates)
+    # Calculate the size of the great circle (radius from anti-sub-solar point)
+    arc_angle = np.radians(90 - np.degrees(np.arccos(Re / (Re + height))))
+
+    lat1 = np.radians(antisolar_lats)[:, np.newaxis]
+    lon1 = np.radians(antisolar_lons)[:, np.newaxis]
+    lat2 = np.radians(np.ravel(lats))[np.newaxis, :]
+    lon2 = np.radians(np.ravel(lons))[np.newaxis, :]
+    haversine = np.sin((lat2 - lat1) / 2)**2 + np.cos(lat1) * np.cos(lat2) *\
+        np.sin((lon2 - lon1) / 2)**2
+    angle = 2 * np.arcsin(np.sqrt(np.clip(haversine, 0, 1)))
+    return angle < arc_angle
@@ -16,8 +16,10 @@
 #  2021-09-15 Francis Tholley moved the chisham and standard virtual
 #  height models to separate file for better encapsulation/modularity
 #  2022-03-04 Marina Schmidt add the VH_Types class to the bottom
+#  2026-10-16 models accept numpy arrays of target ranges
 """ virtual_heights.py comprises of different of virtual height models"""
 import enum
+import numpy as np
 
 def chisham(target_range: float, **kwargs):
     """
@@ -41,18 +43,18 @@ def chisham(target_range: float, **kwargs):
     B_const = (0.0191271, -0.178640, -0.354557)
     C_const = (6.68283e-5, 1.81405e-4, 9.39961e-5)
 
+    target_range = np.asarray(target_range, dtype=float)
     # determine which region of ionosphere the gate
-    if target_range < 115:
-        return (target_range / 115.0) * 112.0
-    elif target_range < 787.5:
-        return A_const[0] + B_const[0] * target_range + C_const[0] *\
-                 target_range**2
-    elif target_range <= 2137.5:
-        return A_const[1] + B_const[1] * target_range + C_const[1] *\
-                 target_range**2
-    else:
-        return A_const[2] + B_const[2] * target_range + C_const[2] *\
-                 target_range**2
+    return np.select([target_range < 115,
+                      target_range < 787.5,
+                      target_range <= 2137.5],
+                     [(target_range / 115.0) * 112.0,
+                      A_const[0] + B_const[0] * target_range + C_const[0] *
+                      target_range**2,
+                      A_const[1] + B_const[1] * target_range + C_const[1] *
+                      target_range**2],
+                     A_const[2] + B_const[2] * target_range + C_const[2] *
+                     target_range**2)[()]
 
 
 def standard_virtual_height(target_range: float, cell_height: int = 300,
@@ -83,20 +85,22 @@ def standard_virtual_height(target_range: float, cell_height: int = 300,
     -------
     altered target_range (slant range) [km]
     """
+    target_range = np.asarray(target_range, dtype=float)
+    cell_height = np.asarray(cell_height, dtype=float)
     # TODO: why 115?
-    # map everything into the E region
-    if cell_height <= 150 and target_range > 150:
-        return cell_height
-    # virtual height equation (1) from the above paper
-    elif target_range < 150:
-        return (target_range / 150.0) * 115
-    elif target_range >= 150 and target_range <= 600:
-        return 115
-    elif target_range > 600 and target_range < 800:
-        return (target_range - 600) / 200 * (cell_height - 115) + 115
-    # higher than 800 km
-    else:
-        return cell_height
+    return np.select([
+        # map everything into the E region
+        (cell_height <= 150) & (target_range > 150),
+        # virtual height equation (1) from the above paper
+        target_range < 150,
+        (target_range >= 150) & (target_range <= 600),
+        (target_range > 600) & (target_range < 800)],
+        [cell_height,
+         (target_range / 150.0) * 115,
+         115,
+         (target_range - 600) / 200 * (cell_height - 115) + 115],
+        # higher than 800 km
+        cell_height)[()]
 
 
 class VHModels(enum.Enum):
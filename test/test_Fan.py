@@ -14,9 +14,13 @@
 
 import datetime as dt
 import matplotlib.pyplot as plt
+import numpy as np
 import pytest
 import warnings
 
+from matplotlib import colors
+from matplotlib.collections import LineCollection, PathCollection
+
 import pydarn
 
 data, _ = pydarn.read_fitacf('test/data/test.fitacf.bz2')
@@ -29,6 +33,41 @@ class TestFan_defaults:
         with warnings.catch_warnings(record=True):
             pydarn.Fan.plot_fan(data)
 
+    def test_fan_ball_and_stick(self):
+        """ the sticks of all the echoes are a single line collection """
+        with warnings.catch_warnings(record=True):
+            fan_rtn = pydarn.Fan.plot_fan(data, parameter='v',
+                                          ball_and_stick=True)
+        collections = [collection for collection in fan_rtn['ax'].collections
+                       if isinstance(collection, LineCollection)]
+        assert len(collections) == 1
+        num_echoes = np.count_nonzero(fan_rtn['data']['scan_data'])
+        assert len(collections[0].get_segments()) == num_echoes
+        plt.close('all')
+
+    def test_fan_ball_and_stick_groundscatter(self):
+        """ each ground scatter ball follows the ball of its own gate """
+        with warnings.catch_warnings(record=True):
+            fan_rtn = pydarn.Fan.plot_fan(data, parameter='p_l',
+                                          ball_and_stick=True,
+                                          groundscatter=True)
+        balls = [collection for collection in fan_rtn['ax'].collections
+                 if isinstance(collection, PathCollection) and
+                 collection.get_zorder() == 3.0]
+        assert len(balls) == 1
+        scan = fan_rtn['data']['scan_data']
+        ground = fan_rtn['data']['ground_scatter'] != 0
+        cells = (scan != 0).astype(int) + ground
+        assert len(balls[0].get_offsets()) == cells.sum()
+        # the colours in gate order, grey after the ball of a ground gate
+        grey = np.all(balls[0].get_facecolors() ==
+                      colors.to_rgba('grey'), axis=1)
+        expected = np.concatenate([[False] * int(echo) + [True] * int(gs)
+                                   for echo, gs in zip((scan != 0).ravel(),
+                                                       ground.ravel())])
+        assert np.array_equal(grey, expected)
+        plt.close('all')
+
     def test_fov_series(self):
         """ """
         with warnings.catch_warnings(record=True):
@@ -12,10 +12,14 @@
 # and conditions of version 3 of the GNU General Public License,
 # supplemented by the additional permissions listed below.
 
+import aacgmv2
 import matplotlib.pyplot as plt
+import numpy as np
 import pytest
 import warnings
 
+from matplotlib.collections import LineCollection
+
 import pydarn
 
 
@@ -60,3 +64,138 @@ class TestMap:
                                   imf_dial=imf_dial,
                                   reference_vector=reference_vector)
         plt.close('all')
+
+
+class TestMap_potentials:
+
+    def test_potentials_pos(self):
+        """ array, list and single positions give the same potentials """
+        record = data[0]
+        hemisphere = pydarn.Hemisphere(record['hemisphere'])
+        mlats = [75.0, 70.0, 80.5, 62.0, 85.0, 66.0, 71.0, 78.0, 89.0]
+        mlons = [30.0, 40.0, -100.0, 359.0, 0.0, 120.0, 200.0, 250.0, 10.0]
+        args = (record['N+2'], record['latmin'], 0, 0,
+                record['fit.order'], hemisphere)
+        v_list = pydarn.Maps.calculate_potentials_pos(mlats, mlons, *args)
+        v_array = pydarn.Maps.calculate_potentials_pos(np.array(mlats),
+                                                       np.array(mlons),
+                                                       *args)
+        assert v_array.shape == (len(mlats),)
+        assert np.allclose(v_list, v_array)
+        for i in range(len(mlats)):
+            v = pydarn.Maps.calculate_potentials_pos(mlats[i], mlons[i],
+                                                     *args)
+            assert np.allclose(v, v_list[i])
+
+    def test_potentials_grid(self):
+        """ the grid potentials match the potentials at those positions """
+        record = data[0]
+        mlat, mlon, pot = pydarn.Maps.calculate_potentials(
+            record['N+2'], record['latmin'], fit_order=record['fit.order'])
+        theta = np.radians(90.0 - mlat)
+        theta_max = np.radians(90.0 - record['latmin'])
+        basis = pydarn.Maps.potential_basis(theta, np.radians(mlon),
+                                            theta_max, record['fit.order'])
+        v = pydarn.Maps.evaluate_potential(basis, record['N+2']) / 1000.0
+        v = v.reshape(pot.shape)
+        above = mlat >= record['latmin']
+        assert np.allclose(pot[above], v[above])
+        assert np.all(pot[~above] == 0)
+
+    def test_potential_basis_cache(self):
+        """ records sharing the grid, fit order and latmin share the basis """
+        record = data[0]
+        pydarn.Maps.clear_basis_cache()
+        theta = np.radians(90.0 - np.arange(60.0, 90.0))
+        phi = np.radians(np.arange(0.0, 360.0, 12.0))
+        theta_max = np.radians(90.0 - record['latmin'])
+        basis = pydarn.Maps.cached_potential_basis(theta, phi, theta_max,
+                                                   record['fit.order'])
+        assert not basis.flags.writeable
+        assert pydarn.Maps.cached_potential_basis(
+            theta.copy(), phi.copy(), theta_max,
+            record['fit.order']) is basis
+        assert pydarn.Maps.cached_potential_basis(
+            theta, phi, -theta_max, record['fit.order']) is not basis
+        assert np.array_equal(basis, pydarn.Maps.potential_basis(
+            theta, phi, theta_max, record['fit.order']))
+
+        _, _, pot = pydarn.Maps.calculate_potentials(
+            record['N+2'], record['latmin'], fit_order=record['fit.order'])
+        pydarn.Maps.clear_basis_cache()
+        _, _, pot_new = pydarn.Maps.calculate_potentials(
+            record['N+2'], record['latmin'], fit_order=record['fit.order'])
+        assert np.array_equal(pot, pot_new)
+
+    def test_fitted_velocities(self):
+        """ the fitted velocities are the E x B drift of the potential """
+        record = data[0]
+        fit_order = record['fit.order']
+        lat_min = record['latmin']
+        mlats = np.array([62.0, 70.5, 75.0, 80.0, 85.0, 88.0])
+        mlons = np.radians([10.0, 100.0, 200.0, 300.0, 45.0, 135.0])
+        velocity, azm = pydarn.Maps.calculated_fitted_velocities(
+            mlats, mlons, record['N+2'], pydarn.Hemisphere.North,
+            fit_order, lat_min)
+        assert velocity.shape == mlats.shape
+        assert azm.shape == mlats.shape
+
+        # E = -grad(potential) from finite differences of the potential
+        theta = np.radians(90.0 - mlats)
+        theta_max = np.radians(90.0 - lat_min)
+        step = 1e-6
+
+        def potential(theta, phi):
+            basis = pydarn.Maps.potential_basis(theta, phi, theta_max,
+                                                fit_order)
+            return pydarn.Maps.evaluate_potential(basis, record['N+2'])
+
+        Re_meters = pydarn.Re * 1000.0
+        e_theta = -(potential(theta + step, mlons) -
+                    potential(theta - step, mlons)) / (2 * step) / Re_meters
+        e_phi = -(potential(theta, mlons + step) -
+                  potential(theta, mlons - step)) / (2 * step) /\
+            (Re_meters * np.sin(theta))
+        ratio = np.hypot(e_theta, e_phi) / velocity
+        # |v| = |E| / |B|, so the ratio is the field strength at each point
+        b_field = 0.62e-4 * (1.0 - 3.0 * 300.0e3 / Re_meters) *\
+            np.sqrt(3.0 * np.cos(theta)**2 + 1.0) / 2
+        assert np.allclose(ratio, b_field, rtol=1e-5)
+
+    def test_efield_operator(self):
+        """ the operator is built once per fit order """
+        operator = pydarn.Maps.efield_operator(4)
+        assert operator.shape == (3, 25, 25)
+        assert not operator.flags.writeable
+        assert pydarn.Maps.efield_operator(4) is operator
+
+
+class TestMap_vectors:
+
+    def test_hmb_lat_limits(self):
+        """ each position gets the HMB latitude closest in longitude """
+        record = data[0]
+        date = pydarn.time2datetime(record)
+        mlons = np.radians(np.arange(0.0, 360.0, 7.5))
+        lat_limit = pydarn.Maps.hmb_lat_limits(record['boundary.mlat'],
+                                               record['boundary.mlon'],
+                                               mlons, date)
+        assert lat_limit.shape == mlons.shape
+        hmb_mlons = np.asarray(record['boundary.mlon'], dtype=float)
+        shifted_mlts = hmb_mlons[0] - \
+            aacgmv2.convert_mlt(hmb_mlons[0], date) * 15
+        hmb_mlons = (hmb_mlons - shifted_mlts) % 360
+        for mlon, limit in zip(mlons, lat_limit):
+            ind = np.abs(hmb_mlons - np.degrees(mlon) % 360).argmin()
+            assert limit == record['boundary.mlat'][ind]
+
+    def test_vector_collection(self):
+        """ the vectors are drawn as a single line collection """
+        with warnings.catch_warnings(record=True):
+            pydarn.Maps.plot_mapdata(data, reference_vector=0)
+        collections = [collection for collection in plt.gca().collections
+                       if isinstance(collection, LineCollection)]
+        assert len(collections) == 1
+        assert 0 < len(collections[0].get_segments()) <=\
+            len(data[0]['vector.mlat'])
+        plt.close('all')
@@ -12,16 +12,36 @@
 # and conditions of version 3 of the GNU General Public License,
 # supplemented by the additional permissions listed below.
 
+import cartopy.geodesic
 import datetime as dt
+import json
+import numpy as np
+import os
 import pytest
+import shutil
 import warnings
 
+from scipy.signal import savgol_filter
+
 import pydarn
 
 
 data, _ = pydarn.read_fitacf('test/data/test.fitacf.bz2')
 
 
+def assert_records_equal(records, other_records):
+    """Asserts two lists of records hold the same fields and values"""
+    assert len(records) == len(other_records)
+    for record, other_record in zip(records, other_records):
+        assert record.keys() == other_record.keys()
+        for key, value in record.items():
+            if isinstance(value, np.ndarray):
+                assert np.array_equal(value, other_record[key],
+                                      equal_nan=value.dtype.kind == 'f')
+            else:
+                assert value == other_record[key]
+
+
 class TestUtils_citations:
     def test_citations(self):
         with warnings.catch_warnings(record=True):
@@ -37,6 +57,143 @@ class TestUtils_filters:
             bx = pydarn.Boxcar(thresh=0.7, w=None)
             bx.run_filter(data)
 
+    def test_boxcar_cpus(self):
+        with warnings.catch_warnings(record=True):
+            bx = pydarn.Boxcar(thresh=0.7, w=None)
+            filtered = bx.run_filter(data, cpus=1)
+            parallel = bx.run_filter(data, cpus=2)
+            assert_records_equal(filtered, parallel)
+            # the filter changed some of the values
+            assert any(not np.array_equal(record['v'], filtered_record['v'])
+                       for record, filtered_record in zip(data, filtered)
+                       if 'v' in record and 'v' in filtered_record)
+
+    def test_boxcar_stream(self):
+        with warnings.catch_warnings(record=True):
+            bx = pydarn.Boxcar(thresh=0.7, w=None)
+            filtered = bx.run_filter(data)
+            streamed = list(bx.stream_filter(iter(data)))
+            assert_records_equal(filtered, streamed)
+
+    def test_boxcar_stream_partial_scan(self):
+        # the stream ends part way through a scan, the records of the last
+        # scans are yielded once the stream is exhausted
+        offsets = pydarn.scan_offsets(data)
+        records = data[:offsets[2] + 16]
+        with warnings.catch_warnings(record=True):
+            bx = pydarn.Boxcar(thresh=0.7, w=None)
+            filtered = bx.run_filter(records)
+            streamed = list(bx.stream_filter(iter(records)))
+        assert len(streamed[offsets[2]:]) == 16
+        assert_records_equal(filtered, streamed)
+
+    def test_boxcar_filtered_only(self):
+        with warnings.catch_warnings(record=True):
+            bx = pydarn.Boxcar(thresh=0.7, w=None)
+            filtered = bx.run_filter(data, filtered_only=True)
+            streamed = list(bx.stream_filter(data, filtered_only=True))
+            assert 0 < len(filtered) <= len(data)
+            assert len(streamed) == len(filtered)
+
+    def test_beam(self):
+        fd = pydarn.utils.filters.FetchData(data)
+        fd.parse_data()
+        beam = fd.beams[0]
+        assert not hasattr(beam, '__dict__')
+        assert beam.bmnum == data[0]['bmnum']
+        assert getattr(beam, 'noise.sky') == data[0]['noise.sky']
+        names = [name for name, _ in beam.items()]
+        assert names == fd.s_params + fd.v_params + ['time']
+        # the beams of a FetchData share the positions of their parameters
+        assert fd.beams[1]._fields is beam._fields
+        copied = pydarn.utils.filters.Beam()
+        copied.copy(beam)
+        copied.slist = []
+        copied.new_param = 1
+        assert len(beam.slist) == len(data[0]['slist'])
+        assert not hasattr(beam, 'new_param')
+        # parameters are not added to the class at run time
+        assert 'new_param' not in vars(pydarn.utils.filters.Beam)
+        assert 'noise.sky' not in vars(pydarn.utils.filters.Beam)
+
+    def test_gate(self):
+        fd = pydarn.utils.filters.FetchData(data)
+        fd.parse_data()
+        beam = fd.beams[0]
+        gate = pydarn.utils.filters.Gate(beam, 2)
+        assert not hasattr(gate, '__dict__')
+        assert gate.v == beam.v[2]
+        assert gate.elv == beam.elv[2]
+        assert [name for name, _ in gate.items()] == \
+            ['v', 'w_l', 'gflg', 'p_l', 'v_e', 'elv']
+
+
+class TestUtils_detrend:
+    @pytest.mark.parametrize('detrend_type', ['mean', 'savgol'])
+    def test_detrend_fitacf(self, detrend_type):
+        with warnings.catch_warnings(record=True):
+            detrended = pydarn.Detrend.detrend_fitacf(
+                data, window_length=400, detrend_type=detrend_type,
+                polyorder=1, mode='nearest')
+        assert len(detrended) == len(data)
+        for record, detrended_record in zip(data, detrended):
+            if 'slist' in record:
+                assert len(detrended_record['v']) == len(record['slist'])
+                assert len(detrended_record['p_l']) == len(record['slist'])
+
+    @pytest.mark.parametrize('detrend_type', ['mean', 'savgol'])
+    def test_detrend_gate_series(self, detrend_type):
+        # range gate 46 of the camping beam 9 has data in every record
+        records = [record for record in data if record['bmnum'] == 9]
+        series = np.array([record['v'][list(record['slist']).index(46)]
+                           for record in records], dtype=float)
+        with warnings.catch_warnings(record=True):
+            detrended = pydarn.Detrend.detrend_fitacf(
+                records, parameter='v', window_length=30,
+                detrend_type=detrend_type, polyorder=1, mode='nearest')
+        detrended_series = np.array(
+            [record['v'][list(records[i]['slist']).index(46)]
+             for i, record in enumerate(detrended)])
+        if detrend_type == 'mean':
+            # mean of the records within 15 s either side of each record
+            seconds = np.array([(pydarn.time2datetime(record) -
+                                 pydarn.time2datetime(records[0]))
+                                .total_seconds() for record in records])
+            expected = np.array([
+                value - series[np.abs(seconds - second) <= 15].mean()
+                for value, second in zip(series, seconds)])
+        else:
+            # 30 s is 9 records at the ~3 s sampling interval of the beam
+            expected = series - savgol_filter(series, window_length=9,
+                                              polyorder=1, mode='nearest')
+        assert np.allclose(detrended_series, expected, atol=1e-3)
+
+    def test_detrend_irregular(self):
+        # a single camping beam, sampled irregularly
+        beam_data = [record for record in data if record['bmnum'] == 9]
+        detrended = pydarn.Detrend.detrend_fitacf(beam_data, parameter='v',
+                                                  window_length=300)
+        for record, detrended_record in zip(beam_data, detrended):
+            if 'slist' in record:
+                assert len(detrended_record['v']) == len(record['slist'])
+                assert np.array_equal(detrended_record['p_l'],
+                                      record['p_l'])
+
+        # three records 10 s and 90 s apart: with a 30 s window the first two
+        # records are averaged together and the last one is on its own
+        records = []
+        for seconds, v in [(0, 1.0), (10, 3.0), (100, 10.0)]:
+            record = dict(beam_data[0])
+            record['time.mt'] = 10 + seconds // 60
+            record['time.sc'] = seconds % 60
+            record['time.us'] = 0
+            record['slist'] = np.array([5])
+            record['v'] = np.array([v], dtype=np.float32)
+            records.append(record)
+        detrended = pydarn.Detrend.detrend_fitacf(records, parameter='v',
+                                                  window_length=30)
+        assert [record['v'][0] for record in detrended] == [-1.0, 1.0, 0.0]
+
 
 class TestUtils_general:
     def test_greatcircle(self):
@@ -59,12 +216,320 @@ class TestUtils_tdiff:
                                          interferometer_offset=
                                          interferometer_offset)
 
+    def test_recalcelv_sweep(self, tdiff, overwrite, interferometer_offset):
+        with warnings.catch_warnings(record=True):
+            tdiffs = [tdiff, 2 * tdiff, 0.0]
+            sweep = pydarn.recalculate_elevation(data, tdiff=tdiffs,
+                                                 overwrite=overwrite,
+                                                 interferometer_offset=
+                                                 interferometer_offset)
+            assert len(sweep) == len(tdiffs)
+            single = pydarn.recalculate_elevation(data, tdiff=tdiffs[1],
+                                                  overwrite=overwrite,
+                                                  interferometer_offset=
+                                                  interferometer_offset)
+            if overwrite:
+                elvs = [(record.get('elv'), sweep_record.get('elv'))
+                        for record, sweep_record in zip(single, sweep[1])]
+            else:
+                elvs = [(single[ind], sweep[1][ind]) for ind in single]
+            for elv, sweep_elv in elvs:
+                assert np.array_equal(elv, sweep_elv, equal_nan=True)
+
+
+class TestUtils_tdiff_calibration:
+    def test_calibrate_tdiff(self):
+        tdiffs = np.linspace(-0.01, 0.01, 5)
+        with warnings.catch_warnings(record=True):
+            calibration = pydarn.calibrate_tdiff(data, tdiffs,
+                                                 metric=np.nanstd)
+            parallel = pydarn.calibrate_tdiff(data, tdiffs,
+                                              metric=np.nanstd, cpus=2)
+            elv = pydarn.recalculate_elevation(data, tdiffs[1])
+        assert calibration['histogram'].shape == (5, 90)
+        assert len(calibration['metric']) == 5
+        elv = np.concatenate([np.asarray(values, dtype=float)
+                              for values in elv.values()])
+        assert np.isclose(calibration['median'][1], np.nanmedian(elv))
+        for key in calibration:
+            assert np.array_equal(calibration[key], parallel[key],
+                                  equal_nan=True)
+
+
+class TestUtils_frame:
+    def test_fitacf_frame(self):
+        frame = pydarn.FitacfFrame(data)
+        assert len(frame) == len(data)
+        assert frame[5]['bmnum'] == data[5]['bmnum']
+        assert (frame[3]['v'] == data[3]['v']).all()
+        selected = frame[frame.select(beam_num=7)]
+        assert all(record['bmnum'] == 7 for record in selected)
+        assert frame.to_records()[-1].keys() == data[-1].keys()
+
+
+class TestUtils_timestamps:
+    def test_record_timestamps(self):
+        timestamps = pydarn.record_timestamps(data)
+        assert timestamps[10].tolist() == pydarn.time2datetime(data[10])
+        assert pydarn.record_timestamps(data) is timestamps
+        start_time = pydarn.time2datetime(data[20])
+        assert pydarn.find_record(data, start_time) == 20
+        window = pydarn.find_record_window(data, start_time,
+                                           pydarn.time2datetime(data[30]))
+        assert window[0] == 20 and window[-1] == 31
+
+    def test_timestamps_sorted_cached(self, monkeypatch):
+        plotting = pydarn.utils.plotting
+        records = list(data)
+        calls = []
+        compute = plotting._compute_timestamps_sorted
+        monkeypatch.setattr(plotting, '_compute_timestamps_sorted',
+                            lambda dmap_data: calls.append(1) or
+                            compute(dmap_data))
+        start_time = pydarn.time2datetime(records[20])
+        end_time = pydarn.time2datetime(records[30])
+        for _ in range(3):
+            assert pydarn.find_record(records, start_time) == 20
+            window = pydarn.find_record_window(records, start_time, end_time)
+            assert window[0] == 20 and window[-1] == 31
+        # the time order is checked once for the list of records
+        assert len(calls) == 1
+
+
+class TestUtils_scan:
+    def test_scan_offsets(self):
+        offsets = pydarn.scan_offsets(data)
+        beam_scan = pydarn.utils.scan.build_scan(data)
+        assert offsets[-1] == len(data)
+        assert (beam_scan[offsets[1]:offsets[2]] == 1).all()
+        assert len(pydarn.find_records_by_scan(data, 1)) ==\
+            offsets[2] - offsets[1]
+
+
+class TestUtils_range_time:
+    def test_build_range_time_grid(self):
+        with warnings.catch_warnings(record=True):
+            times, gates, z, gflg = \
+                pydarn.build_range_time_grid(data, 'v', beam_num=7)
+            assert z.shape == (len(times), len(gates))
+            assert gflg.shape == z.shape
+            records = [record for record in data if record['bmnum'] == 7]
+            # the beam 7 records are a minute apart, so there is no padding
+            assert times == [pydarn.time2datetime(record)
+                             for record in records]
+            for row, record in enumerate(records):
+                slist = record['slist']
+                assert np.array_equal(z[row, slist], record['v'])
+                assert np.array_equal(gflg[row, slist], record['gflg'])
+                others = np.setdiff1d(gates, slist)
+                assert np.isnan(z[row, others]).all()
+                assert np.isnan(gflg[row, others]).all()
+
+            # values not passing a filter are left as NaN
+            _, _, filtered_z, _ = pydarn.build_range_time_grid(
+                data, 'v', beam_num=7,
+                filter_settings={'min_array_filter': {'p_l': 3}})
+            for row, record in enumerate(records):
+                slist = record['slist']
+                low_power = record['p_l'] < 3
+                assert low_power.any()
+                assert np.isnan(filtered_z[row, slist[low_power]]).all()
+                assert np.array_equal(filtered_z[row, slist[~low_power]],
+                                      record['v'][~low_power])
+
+            # array filters on slist fields compare the same gate of full
+            # length parameters, gates without a value do not pass
+            _, _, filtered_z, _ = pydarn.build_range_time_grid(
+                data, 'pwr0', beam_num=7,
+                filter_settings={'min_array_filter': {'v': 0}})
+            for row, record in enumerate(records):
+                assert len(record['pwr0']) == record['nrang']
+                expected = np.full(len(gates), np.nan)
+                slist = record['slist'][record['v'] >= 0]
+                expected[slist] = record['pwr0'][slist]
+                assert np.array_equal(filtered_z[row], expected,
+                                      equal_nan=True)
+
+
+class TestUtils_radars:
+    def test_radars_mapping(self):
+        radars = pydarn.SuperDARNRadars.radars
+        assert len(radars) == len(pydarn.RadarID)
+        assert pydarn.RadarID.SAS in radars
+        radar = radars[pydarn.RadarID.SAS]
+        assert radar.hardware_info.abbrev == 'sas'
+        assert radars[pydarn.RadarID.SAS] is radar
+
+
+class TestUtils_hdw_history:
+    def test_read_hdw_history(self):
+        history = pydarn.read_hdw_history('sas')
+        assert history.epochs == sorted(history.epochs)
+        assert len(history.epochs) == len(history.hardware_info)
+        date = history.epochs[-1] + dt.timedelta(days=1)
+        assert pydarn.read_hdw_file('sas', date) == \
+            history.hardware_info[-1]
+
+    def test_hdw_index(self, tmp_path, monkeypatch):
+        radars = pydarn.utils.superdarn_radars
+        hdw_file = os.path.join(os.path.dirname(radars.__file__), 'hdw',
+                                'hdw.dat.sas')
+        tmp_file = str(tmp_path / 'hdw.dat.sas')
+        shutil.copy(hdw_file, tmp_file)
+        with open(hdw_file, 'rb') as reader:
+            rows = radars._split_hdw_rows(reader.read())
+        monkeypatch.setattr(radars, '_hdw_rows_cache', {})
+        monkeypatch.setattr(radars, '_hdw_history_cache', {})
+        monkeypatch.setattr(radars, '_hdw_indexes', {})
+        index_file = pydarn.build_hdw_index(str(tmp_path))
+        assert index_file == str(tmp_path / radars.HDW_INDEX_FILE)
+        # the index is plain JSON
+        with open(index_file) as reader:
+            index = json.load(reader)
+        assert index['radars']['sas'][2] == rows
+
+        # the rows come from the index, the file is not split
+        def split(content):
+            raise AssertionError("the hardware file was split")
+        monkeypatch.setattr(radars, '_split_hdw_rows', split)
+        assert radars._hdw_rows(tmp_file, 'sas') == rows
+
+        # a hardware file changed since the index was built is split
+        monkeypatch.undo()
+        monkeypatch.setattr(radars, '_hdw_rows_cache', {})
+        monkeypatch.setattr(radars, '_hdw_indexes', {})
+        with open(tmp_file, 'a') as writer:
+            writer.write('# comment added after the index was built\n')
+        monkeypatch.setattr(radars, '_split_hdw_rows',
+                            lambda content: 'split')
+        assert radars._hdw_rows(tmp_file, 'sas') == 'split'
+
+
+class TestUtils_fov_cache:
+    def test_fov_cache(self):
+        with warnings.catch_warnings(record=True):
+            kwargs = {'stid': pydarn.RadarID.SAS, 'rsep': 45, 'frang': 180,
+                      'date': dt.datetime(2023, 10, 10, 1, 30)}
+            pydarn.FOVCache.clear()
+            lats, lons = pydarn.Coords.AACGM(**kwargs)
+            assert len(pydarn.FOVCache._tables) == 1
+            cached_lats, cached_lons = pydarn.Coords.AACGM(**kwargs)
+            assert len(pydarn.FOVCache._tables) == 1
+            assert (lats == cached_lats).all()
+            assert (lons == cached_lons).all()
+
+            # the second call is served from the cache
+            key = next(iter(pydarn.FOVCache._tables))
+            pydarn.FOVCache._tables[key] = (lats + 1, lons)
+            cached_lats, _ = pydarn.Coords.AACGM(**kwargs)
+            assert (cached_lats == lats + 1).all()
+
+            # the returned arrays are copies of the cached tables
+            cached_lats[:] = 0
+            cached_lats, _ = pydarn.Coords.AACGM(**kwargs)
+            assert (cached_lats == lats + 1).all()
+            pydarn.FOVCache.clear()
+
+    def test_fov_cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(pydarn.FOVCache, 'cache_dir', str(tmp_path))
+        with warnings.catch_warnings(record=True):
+            kwargs = {'stid': pydarn.RadarID.SAS, 'rsep': 45, 'frang': 180,
+                      'date': dt.datetime(2023, 10, 10, 1, 30)}
+            pydarn.FOVCache.clear()
+            lats, lons = pydarn.Coords.AACGM(**kwargs)
+            filenames = list(tmp_path.glob('fov_*.npz'))
+            assert len(filenames) == 1
+            with np.load(filenames[0]) as tables:
+                assert (tables['lats'] == lats).all()
+                assert (tables['lons'] == lons).all()
+
+            # after clearing the memory the table is reloaded from the file
+            np.savez(filenames[0], lats=lats + 1, lons=lons)
+            pydarn.FOVCache.clear()
+            loaded_lats, loaded_lons = pydarn.Coords.AACGM(**kwargs)
+            assert (loaded_lats == lats + 1).all()
+            assert (loaded_lons == lons).all()
+            pydarn.FOVCache.clear()
+
+    def test_gate_azimuths(self):
+        with warnings.catch_warnings(record=True):
+            kwargs = {'stid': pydarn.RadarID.SAS, 'rsep': 45, 'frang': 180,
+                      'date': dt.datetime(2023, 10, 10, 1, 30)}
+            lats, lons = pydarn.Coords.GEOGRAPHIC(**kwargs)
+            gate_azms = pydarn.FOVCache.gate_azimuths(
+                pydarn.Coords.GEOGRAPHIC, **kwargs)
+            assert gate_azms.shape == (lats.shape[0] - 1, lats.shape[1] - 1)
+            center_lat = lats[10:12, 3:5].mean()
+            center_lon = lons[10:12, 3:5].mean()
+            azm = pydarn.Fan.get_gate_azm(center_lon, center_lat,
+                                          kwargs['stid'],
+                                          pydarn.Coords.GEOGRAPHIC,
+                                          kwargs['date'])
+            assert np.isclose(gate_azms[10, 3], azm)
+            # MLT rotates the gates and the radar together
+            assert np.array_equal(
+                pydarn.FOVCache.gate_azimuths(pydarn.Coords.AACGM_MLT,
+                                              **kwargs),
+                pydarn.FOVCache.gate_azimuths(pydarn.Coords.AACGM,
+                                              **kwargs))
+
+
+class TestUtils_gate2geographic:
+    def test_gate2geographic_location_arrays(self):
+        with warnings.catch_warnings(record=True):
+            location = pydarn.utils.coordinates.gate2geographic_location
+            lats, lons = location(stid=pydarn.RadarID.SAS,
+                                  beam=np.arange(16)[np.newaxis, :],
+                                  range_gate=np.arange(75)[:, np.newaxis],
+                                  height=300, rsep=45, frang=180)
+            lat, lon = location(stid=pydarn.RadarID.SAS, beam=3,
+                                range_gate=10, height=300, rsep=45,
+                                frang=180)
+            assert lats.shape == (75, 16)
+            assert np.isclose(lats[10, 3], lat)
+            assert np.isclose(lons[10, 3], lon)
+
 
 class TestUtils_terminator:
     def test_terminator(self):
         with warnings.catch_warnings(record=True):
             pydarn.terminator(dt.datetime(2023,10,10,1,30), 300)
 
+    def test_night_mask(self):
+        dates = [dt.datetime(2023, 10, 10) + dt.timedelta(minutes=i)
+                 for i in range(0, 1440, 30)]
+        antisolar_lons, antisolar_lats = pydarn.antisolar_positions(dates)
+        for i, date in enumerate(dates):
+            antisolar_point, _, arc_angle = pydarn.terminator(date, 300)
+            assert np.isclose(antisolar_lons[i], antisolar_point[0])
+            assert np.isclose(antisolar_lats[i], antisolar_point[1])
+            # points along the meridian of the antisolar point, towards
+            # the equator, just inside and just outside the terminator
+            direction = -1 if antisolar_point[1] > 0 else 1
+            lats = antisolar_point[1] + direction *\
+                np.array([0, arc_angle - 0.5, arc_angle + 0.5])
+            lons = np.full(3, antisolar_point[0])
+            is_night = pydarn.night_mask([date], lats, lons, 300)
+            assert is_night.tolist() == [[True, True, False]]
+
+        # matches the great circle distances on the WGS84 ellipsoid away
+        # from the terminator
+        lats, lons = pydarn.utils.coordinates.gate2geographic_location(
+            pydarn.RadarID.SAS, 7, 300, center=True,
+            range_gate=np.arange(75))
+        is_night = pydarn.night_mask(dates, lats, lons, 300)
+        assert is_night.shape == (len(dates), len(lats))
+        geodesic = cartopy.geodesic.Geodesic()
+        points = np.stack([lons, lats], axis=1)
+        for i, date in enumerate(dates):
+            antisolar_point, arc_length, _ = pydarn.terminator(date, 300)
+            distances = geodesic.inverse(antisolar_point, points)[:, 0] /\
+                1000.0
+            away = np.abs(distances - arc_length) > 50
+            assert np.array_equal(is_night[i, away],
+                                  (distances < arc_length)[away])
+        assert is_night.any() and not is_night.all()
+
 
 class TestUtils_calcazi:
     def test_calculateazimuth(self):